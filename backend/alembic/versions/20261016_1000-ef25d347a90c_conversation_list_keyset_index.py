@@ -0,0 +1,25 @@
+"""Conversation list keyset index
+
+Revision ID: ef25d347a90c
+Revises: c4dd28c88e3e
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ef25d347a90c'
+down_revision = 'c4dd28c88e3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the sidebar listing: WHERE user_id = ? ORDER BY updated_at DESC, id DESC
+    op.create_index('ix_conversations_user_updated_id', 'conversations', ['user_id', 'updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conversations_user_updated_id', table_name='conversations')
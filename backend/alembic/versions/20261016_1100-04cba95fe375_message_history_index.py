@@ -0,0 +1,25 @@
+"""Message history window index
+
+Revision ID: 04cba95fe375
+Revises: ef25d347a90c
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '04cba95fe375'
+down_revision = 'ef25d347a90c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the per-turn history query: WHERE conversation_id = ? ORDER BY created_at DESC LIMIT N
+    op.create_index('ix_messages_conversation_created', 'messages', ['conversation_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_created', table_name='messages')
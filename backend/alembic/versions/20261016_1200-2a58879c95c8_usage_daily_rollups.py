@@ -0,0 +1,98 @@
+"""Daily usage rollups
+
+Revision ID: 2a58879c95c8
+Revises: 04cba95fe375
+Create Date: 2026-10-16 12:00:00.000000
+
+Adds token_usage_log.configuration_id and the usage_daily_rollups table,
+then backfills both from existing token_usage_log rows. Replies saved before
+this revision were only logged when the upstream reported usage, so older
+days may undercount messages.
+"""
+from uuid import UUID, uuid5
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a58879c95c8'
+down_revision = '04cba95fe375'
+branch_labels = None
+depends_on = None
+
+# Same key as app.services.usage.rollup_id (frozen here)
+ROLLUP_NAMESPACE = UUID("6f1c2a7e-4b5d-4e8a-9c3f-0d2b7a1e5c94")
+
+
+def _rollup_id(day, user_id, service_type, configuration_id, model_name) -> UUID:
+    return uuid5(ROLLUP_NAMESPACE, f"{day.isoformat()}|{user_id}|{service_type}|{configuration_id or ''}|{model_name}")
+
+
+def upgrade() -> None:
+    op.add_column('token_usage_log', sa.Column('configuration_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'fk_token_usage_log_configuration_id', 'token_usage_log', 'configurations', ['configuration_id'], ['id']
+    )
+
+    rollups = op.create_table('usage_daily_rollups',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('service_type', sa.String(length=20), nullable=False),
+    sa.Column('configuration_id', sa.UUID(), nullable=True),
+    sa.Column('model_name', sa.String(length=100), nullable=False),
+    sa.Column('conversation_count', sa.Integer(), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+    sa.Column('completion_tokens', sa.Integer(), nullable=False),
+    sa.Column('total_tokens', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['configuration_id'], ['configurations.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_usage_daily_rollups_day'), 'usage_daily_rollups', ['day'], unique=False)
+    op.create_index(op.f('ix_usage_daily_rollups_user_id'), 'usage_daily_rollups', ['user_id'], unique=False)
+
+    # Backfill: AskDocs configuration from the conversation, then one rollup per key
+    conn = op.get_bind()
+    conn.execute(sa.text("""
+        UPDATE token_usage_log
+        SET configuration_id = conversations.configuration_id
+        FROM conversations
+        WHERE conversations.id = token_usage_log.conversation_id
+          AND conversations.configuration_id IS NOT NULL
+    """))
+
+    result = conn.execute(sa.text("""
+        SELECT CAST(t.created_at AS DATE) AS day, t.user_id, t.service_type, t.configuration_id, t.model_name,
+               COUNT(DISTINCT c.id) FILTER (WHERE CAST(c.created_at AS DATE) = CAST(t.created_at AS DATE))
+                   AS conversation_count,
+               2 * COUNT(*) AS message_count,
+               COALESCE(SUM(t.prompt_tokens), 0) AS prompt_tokens,
+               COALESCE(SUM(t.completion_tokens), 0) AS completion_tokens,
+               COALESCE(SUM(t.total_tokens), 0) AS total_tokens,
+               MAX(t.created_at) AS updated_at
+        FROM token_usage_log t
+        JOIN conversations c ON c.id = t.conversation_id
+        GROUP BY 1, 2, 3, 4, 5
+    """))
+
+    rows = [
+        {
+            "id": _rollup_id(row.day, row.user_id, row.service_type, row.configuration_id, row.model_name),
+            **row._asdict(),
+        }
+        for row in result
+    ]
+    if rows:
+        op.bulk_insert(rollups, rows)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_usage_daily_rollups_user_id'), table_name='usage_daily_rollups')
+    op.drop_index(op.f('ix_usage_daily_rollups_day'), table_name='usage_daily_rollups')
+    op.drop_table('usage_daily_rollups')
+    op.drop_constraint('fk_token_usage_log_configuration_id', 'token_usage_log', type_='foreignkey')
+    op.drop_column('token_usage_log', 'configuration_id')
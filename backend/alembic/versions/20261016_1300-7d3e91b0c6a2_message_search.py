@@ -0,0 +1,38 @@
+"""Full-text search columns
+
+Revision ID: 7d3e91b0c6a2
+Revises: 2a58879c95c8
+Create Date: 2026-10-16 13:00:00.000000
+
+Adds generated tsvector columns on messages.content and conversations.title
+with GIN indexes. Adding a stored generated column rewrites the table, so
+run this revision in a maintenance window on large databases.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3e91b0c6a2'
+down_revision = '2a58879c95c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE messages ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+    )
+    op.execute("CREATE INDEX ix_messages_search_vector ON messages USING gin (search_vector)")
+    op.execute(
+        "ALTER TABLE conversations ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(title, ''))) STORED"
+    )
+    op.execute("CREATE INDEX ix_conversations_search_vector ON conversations USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conversations_search_vector', table_name='conversations')
+    op.drop_column('conversations', 'search_vector')
+    op.drop_index('ix_messages_search_vector', table_name='messages')
+    op.drop_column('messages', 'search_vector')
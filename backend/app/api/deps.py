@@ -2,21 +2,21 @@
 FastAPI dependencies for database sessions, authentication, and authorization.
 """
 from typing import AsyncGenerator, Optional
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import async_session_factory
 from app.core.security import decode_access_token
 from app.core.exceptions import AuthenticationError
-from app.models.user import User
+from app.core.principal import Principal, principal_cache
 from app.models import current_user_roles  # ContextVar for role-based filtering
 
 
-# HTTP Bearer token security scheme
-security = HTTPBearer()
+# HTTP Bearer token security scheme (missing credentials are a 401, raised below)
+security = HTTPBearer(auto_error=False)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -39,61 +39,67 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Dependency that validates JWT token and returns current user.
 
     This extracts the Bearer token from the Authorization header,
-    validates it, and retrieves the corresponding user from the database.
+    validates it, and resolves the user through the principal cache
+    (one column-only query on a miss, no ORM objects).
 
     Args:
         credentials: HTTP Bearer credentials from request header
         db: Database session
 
     Returns:
-        User: The authenticated user
+        Principal: The authenticated user (id, profile fields, role names)
 
     Raises:
-        AuthenticationError: If token is invalid or user not found
+        AuthenticationError: If the token is missing or invalid, or user not found
 
     Usage:
         @app.get("/protected")
-        async def protected_route(current_user: User = Depends(get_current_user)):
+        async def protected_route(current_user: Principal = Depends(get_current_user)):
             return {"user_id": current_user.id}
     """
+    if credentials is None:
+        raise AuthenticationError("Not authenticated")
+
     token = credentials.credentials
 
     try:
         # Decode JWT token
         payload = decode_access_token(token)
-        user_id: str = payload.get("sub")
+        subject: Optional[str] = payload.get("sub")
 
-        if user_id is None:
+        if subject is None:
             raise AuthenticationError("Invalid token payload")
 
+        user_id = UUID(str(subject))
+
     except JWTError as e:
         raise AuthenticationError(f"Token validation failed: {str(e)}")
+    except ValueError:
+        raise AuthenticationError("Invalid token payload")
 
-    # Retrieve user from database
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    # Retrieve user (cached for PRINCIPAL_CACHE_TTL_SECONDS)
+    principal = await principal_cache.get(db, user_id)
 
-    if user is None:
+    if principal is None:
         raise AuthenticationError("User not found")
 
-    if not user.is_active:
+    if not principal.is_active:
         raise AuthenticationError("User account is inactive")
 
-    return user
+    return principal
 
 
 async def get_current_user_with_context(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     """
     Dependency that validates JWT token, returns current user, AND sets role context.
 
@@ -109,26 +115,23 @@ async def get_current_user_with_context(
         db: Database session
 
     Returns:
-        User: The authenticated user (with roles loaded)
+        Principal: The authenticated user (with role names)
 
     Raises:
         AuthenticationError: If token is invalid or user not found
 
     Usage:
         @app.get("/configurations")
-        async def list_configs(current_user: User = Depends(get_current_user_with_context)):
+        async def list_configs(current_user: Principal = Depends(get_current_user_with_context)):
             # Configuration queries will be automatically filtered by user's roles
             ...
     """
     # Get the current user (same as get_current_user)
     user = await get_current_user(credentials, db)
 
-    # Extract role names from user.roles (relationship is lazy="selectin" so already loaded)
-    role_names = [role.name for role in user.roles]
-
     # Set the ContextVar for role-based filtering
     # This will be used by the SQLAlchemy event listener in app.models.__init__.py
-    current_user_roles.set(role_names)
+    current_user_roles.set(set(user.roles))
 
     return user
 
@@ -149,17 +152,15 @@ def require_role(*required_roles: str):
     Usage:
         @app.post("/admin/users")
         async def create_user(
-            current_user: User = Depends(get_current_user),
+            current_user: Principal = Depends(get_current_user),
             _: None = Depends(require_role("ADMIN"))
         ):
             # Only users with ADMIN role can access this endpoint
             ...
     """
-    async def role_checker(current_user: User = Depends(get_current_user)) -> None:
-        user_roles = {role.name for role in current_user.roles}
-
+    async def role_checker(current_user: Principal = Depends(get_current_user)) -> None:
         # Check if user has any of the required roles
-        if not any(role in user_roles for role in required_roles):
+        if not current_user.has_role(*required_roles):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Required role(s): {', '.join(required_roles)}"
@@ -176,7 +177,7 @@ def require_admin():
         @app.delete("/admin/users/{user_id}")
         async def delete_user(
             user_id: UUID,
-            current_user: User = Depends(get_current_user),
+            current_user: Principal = Depends(get_current_user),
             _: None = Depends(require_admin())
         ):
             ...
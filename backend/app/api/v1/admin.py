@@ -1,13 +1,17 @@
 """
 Admin API endpoints for managing users, roles, domains, and configurations.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from uuid import UUID
 from typing import Optional
 
 from app.api.deps import get_db, get_current_user, require_admin
+from app.core.principal import Principal, principal_cache
+from app.core.access_index import configuration_access
+from app.services.configuration_catalog import configuration_catalog
 from app.schemas.admin import (
     RoleResponse,
     RoleCreateRequest,
@@ -22,10 +26,10 @@ from app.schemas.auth import UserResponse
 from app.schemas.chat import ConfigurationResponse, DomainResponse
 from app.models.user import User, Role
 from app.models.domain import Domain, Configuration
-from app.models.conversation import Conversation, Message
-from app.models.feedback import TokenUsageLog
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
+from app.services.usage import get_usage_totals
+from app.services.export import EXPORT_FORMATS, build_export_query, export_filename, stream_export
 from app.services.askdocs_config import fetch_configurations_by_domain, fetch_configurations_by_domain_mock
 from app.config import settings
 
@@ -36,7 +40,7 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 async def list_users(
     limit: int = 100,
     offset: int = 0,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -78,7 +82,7 @@ async def list_users(
 async def assign_user_roles(
     user_id: UUID,
     request: UserRoleAssignment,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -111,7 +115,10 @@ async def assign_user_roles(
     user.roles = roles
 
     await db.commit()
-    await db.refresh(user)
+
+    # Drop the cached principal and catalogs so the new roles apply on the next request
+    principal_cache.invalidate(user.id)
+    configuration_catalog.invalidate()
 
     return UserResponse(
         id=user.id,
@@ -126,7 +133,7 @@ async def assign_user_roles(
 
 @router.get("/roles", response_model=list[RoleResponse])
 async def list_roles(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -154,7 +161,7 @@ async def list_roles(
 @router.post("/roles", response_model=RoleResponse, status_code=status.HTTP_201_CREATED)
 async def create_role(
     request: RoleCreateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -196,7 +203,7 @@ async def create_role(
 
 @router.get("/domains", response_model=list[DomainResponse])
 async def list_domains(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -224,7 +231,7 @@ async def list_domains(
 @router.post("/domains", response_model=DomainResponse, status_code=status.HTTP_201_CREATED)
 async def create_domain(
     request: DomainCreateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -258,6 +265,9 @@ async def create_domain(
     await db.commit()
     await db.refresh(domain)
 
+    # Catalogs embed domain details
+    configuration_catalog.invalidate()
+
     return DomainResponse(
         id=domain.id,
         domain_key=domain.domain_key,
@@ -268,7 +278,7 @@ async def create_domain(
 
 @router.get("/configurations", response_model=list[ConfigurationResponse])
 async def list_all_configurations(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -309,7 +319,7 @@ async def list_all_configurations(
 @router.post("/configurations", response_model=ConfigurationResponse, status_code=status.HTTP_201_CREATED)
 async def create_configuration(
     request: ConfigurationCreateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -366,17 +376,16 @@ async def create_configuration(
         is_active=request.is_active
     )
 
-    # Assign roles
+    # Assign roles and the domain loaded above (used for the response, no reload needed)
     config.roles = roles
+    config.domain = domain
 
     db.add(config)
     await db.commit()
-    await db.refresh(config)
 
-    # Load domain for response
-    stmt = select(Configuration).where(Configuration.id == config.id).options(selectinload(Configuration.domain))
-    result = await db.execute(stmt)
-    config = result.scalar_one()
+    # Rebuild the role -> configuration index and catalogs so the new access applies immediately
+    configuration_access.invalidate()
+    configuration_catalog.invalidate()
 
     return ConfigurationResponse(
         id=config.id,
@@ -398,7 +407,7 @@ async def create_configuration(
 @router.get("/stats/usage", response_model=UsageStatsResponse)
 async def get_usage_statistics(
     days: int = 30,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin()),
     db: AsyncSession = Depends(get_db)
 ):
@@ -409,52 +418,65 @@ async def get_usage_statistics(
     - `days`: Number of days to look back (default 30)
 
     **Returns:**
-    - Aggregated usage statistics
+    - Aggregated usage statistics from the daily usage rollups
     """
-    period_start = datetime.utcnow() - timedelta(days=days)
+    period_end = datetime.utcnow()
+    period_start = period_end - timedelta(days=days)
 
-    # Count conversations
-    conv_stmt = select(func.count()).select_from(Conversation).where(
-        Conversation.created_at >= period_start
-    )
-    conv_result = await db.execute(conv_stmt)
-    total_conversations = conv_result.scalar()
+    # Sum the daily rollups (whole UTC days, including the first partial one)
+    totals = await get_usage_totals(db, since=period_start.date())
 
-    # Count messages
-    msg_stmt = select(func.count()).select_from(Message).where(
-        Message.created_at >= period_start
+    return UsageStatsResponse(
+        total_conversations=totals["conversation_count"],
+        total_messages=totals["message_count"],
+        total_tokens=totals["total_tokens"],
+        total_prompt_tokens=totals["prompt_tokens"],
+        total_completion_tokens=totals["completion_tokens"],
+        period_start=period_start,
+        period_end=period_end
     )
-    msg_result = await db.execute(msg_stmt)
-    total_messages = msg_result.scalar()
 
-    # Sum token usage from messages
-    token_stmt = select(func.sum(Message.token_usage)).where(
-        Message.created_at >= period_start,
-        Message.token_usage.isnot(None)
-    )
-    token_result = await db.execute(token_stmt)
 
-    # Calculate token totals (this is a simplified version)
-    # In production, you'd parse the JSONB token_usage field
-    total_tokens = 0
-    total_prompt_tokens = 0
-    total_completion_tokens = 0
+@router.get("/export/{dataset}", response_class=StreamingResponse)
+async def export_data(
+    dataset: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    service_type: Optional[str] = Query(None, pattern="^(askatt|askdocs)$"),
+    user_id: Optional[UUID] = None,
+    current_user: Principal = Depends(get_current_user),
+    _: None = Depends(require_admin()),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Export history for compliance and analytics as a streamed NDJSON or CSV file (Admin only).
 
-    return UsageStatsResponse(
-        total_conversations=total_conversations or 0,
-        total_messages=total_messages or 0,
-        total_tokens=total_tokens,
-        total_prompt_tokens=total_prompt_tokens,
-        total_completion_tokens=total_completion_tokens,
-        period_start=period_start,
-        period_end=datetime.utcnow()
+    **Path Parameters:**
+    - `dataset`: "conversations", "messages", "feedback" or "token_usage"
+
+    **Query Parameters:**
+    - `format`: "ndjson" (default) or "csv"
+    - `since` / `until`: Created-at range (ISO 8601, `until` exclusive)
+    - `service_type`: "askatt" or "askdocs"
+    - `user_id`: Only this user's rows
+
+    **Returns:**
+    - File download, streamed in batches from a server-side cursor
+    """
+    stmt = build_export_query(dataset, user_id=user_id, since=since, until=until, service_type=service_type)
+
+    return StreamingResponse(
+        stream_export(db, stmt, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(dataset, export_format)}"'}
     )
 
 
 @router.post("/configurations/fetch-by-domain", response_model=FetchConfigurationsResponse)
 async def fetch_configurations_for_domain(
     request: FetchConfigurationsRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     _: None = Depends(require_admin())
 ):
     """
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, get_current_user
 from app.schemas.auth import SignupRequest, LoginRequest, LoginResponse, UserResponse
 from app.services.auth import create_user, login_user
-from app.models.user import User
+from app.core.principal import Principal
 from app.core.exceptions import ValidationError, AuthenticationError
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -122,7 +122,7 @@ async def login(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get current authenticated user's profile.
@@ -148,5 +148,5 @@ async def get_current_user_profile(
         full_name=current_user.display_name,
         is_active=current_user.is_active,
         created_at=current_user.created_at,
-        roles=[role.name for role in current_user.roles]
+        roles=sorted(current_user.roles)
     )
@@ -1,26 +1,25 @@
 """
 Chat API endpoints with Server-Sent Events (SSE) streaming support.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
-import json
 
 from app.api.deps import get_db, get_current_user, get_current_user_with_context
 from app.schemas.chat import (
     ChatRequest,
     ConversationResponse,
     ConversationListItem,
-    MessageResponse,
     FeedbackRequest,
     FeedbackResponse,
     ConfigurationResponse,
-    DomainResponse,
+    SearchResult,
 )
-from app.models.user import User
+from app.core.principal import Principal
+from app.core.access_index import configuration_access
 from app.models.conversation import Conversation, Message
 from app.models.feedback import Feedback
 from app.models.domain import Configuration, Domain
@@ -28,6 +27,7 @@ from app.services.conversation import (
     create_conversation,
     get_conversation,
     list_user_conversations,
+    encode_conversation_cursor,
     add_message,
     delete_conversation,
     generate_conversation_title,
@@ -36,8 +36,24 @@ from app.services.askatt_mock import stream_askatt_chat as stream_askatt_chat_mo
 from app.services.askatt import stream_askatt_chat as stream_askatt_chat_real
 from app.services.askdocs_mock import stream_askdocs_chat as stream_askdocs_chat_mock
 from app.services.askdocs import stream_askdocs_chat as stream_askdocs_chat_real
+from app.services.streaming import coalesce_if_enabled
+from app.services.persistence import PendingMessage, persist_message
+from app.services.history import load_conversation_history
+from app.services.answer_cache import CACHED_USAGE, answer_cache, normalize_question, replay_answer
+from app.services.single_flight import askdocs_flights
+from app.services.configuration_catalog import configuration_catalog, etag_matches
+from app.services.search import search_history
+from app.services.conversation_detail import load_message_page, stream_conversation_detail
+from app.services.export import EXPORT_FORMATS, build_export_query, export_filename, stream_export
+from app.services.stream_events import (
+    ConversationIdEvent,
+    ErrorEvent,
+    MessageAccumulator,
+    serialize_stream,
+)
 from app.core.exceptions import ResourceNotFoundError, PermissionDeniedError, ValidationError
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from app.config import settings
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
@@ -46,7 +62,7 @@ router = APIRouter(prefix="/chat", tags=["Chat"])
 @router.post("/askatt", response_class=StreamingResponse)
 async def chat_askatt(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -57,7 +73,8 @@ async def chat_askatt(
     - `conversation_id`: Optional existing conversation ID
 
     **Response:**
-    - Streams token-by-token response using SSE format
+    - Streams the response using SSE format (consecutive tokens are coalesced
+      into larger `token` events, see SSE_COALESCE_* settings)
     - Event types: `token`, `usage`, `end`
 
     **Example:**
@@ -71,8 +88,8 @@ async def chat_askatt(
 
     **SSE Event Format:**
     ```
-    data: {"type": "token", "content": "H"}
-    data: {"type": "token", "content": "e"}
+    data: {"type": "token", "content": "Hello! I'm"}
+    data: {"type": "token", "content": " doing well"}
     ...
     data: {"type": "usage", "usage": {"prompt_tokens": 10, "completion_tokens": 50, "total_tokens": 60}}
     data: {"type": "end"}
@@ -85,10 +102,13 @@ async def chat_askatt(
         if conversation_id:
             # Verify conversation exists and user owns it
             try:
-                conversation = await get_conversation(db, conversation_id, current_user.id)
+                conversation = await get_conversation(db, conversation_id, current_user.id, load_messages=False)
             except (ResourceNotFoundError, PermissionDeniedError) as e:
-                yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+                yield ErrorEvent(str(e))
                 return
+
+            # Recent history for context (loaded before the new user message is saved)
+            conversation_history = await load_conversation_history(db, conversation, "askatt")
         else:
             # Create new conversation
             conversation = await create_conversation(
@@ -97,9 +117,10 @@ async def chat_askatt(
                 service_type="askatt"
             )
             conversation_id = conversation.id
+            conversation_history = []
 
             # Send conversation_id to client
-            yield f"data: {json.dumps({'type': 'conversation_id', 'conversation_id': str(conversation_id)})}\n\n"
+            yield ConversationIdEvent(str(conversation_id))
 
         # Save user message
         await add_message(
@@ -113,54 +134,39 @@ async def chat_askatt(
         if not conversation.title:
             await generate_conversation_title(db, conversation_id, request.message)
 
-        # Get conversation history for context
-        conversation_data = await get_conversation(db, conversation_id, current_user.id)
-        conversation_history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in conversation_data.messages[:-1]  # Exclude the just-added user message
-        ]
-
         # Stream AI response (use real or mock based on settings)
-        assistant_message = ""
-        usage_data = None
+        accumulator = MessageAccumulator()
 
         stream_func = stream_askatt_chat_mock if settings.USE_MOCK_ASKATT else stream_askatt_chat_real
 
-        async for chunk in stream_func(
+        async for event in coalesce_if_enabled(stream_func(
             message=request.message,
             conversation_history=conversation_history,
             environment="production"
-        ):
-            # Forward chunk to client
-            yield chunk
-
-            # Parse chunk to build assistant message
-            if chunk.startswith("data: "):
-                try:
-                    data = json.loads(chunk[6:])
-                    if data["type"] == "token":
-                        assistant_message += data["content"]
-                    elif data["type"] == "usage":
-                        usage_data = data["usage"]
-                except json.JSONDecodeError:
-                    pass
-
-        # Save assistant message
-        await add_message(
-            db=db,
+        )):
+            # Build the assistant message and forward the event to the client
+            accumulator.add(event)
+            yield event
+
+        # Save assistant message (batched by the write-behind queue)
+        await persist_message(db, PendingMessage(
             conversation_id=conversation_id,
             role="assistant",
-            content=assistant_message,
-            token_usage=usage_data
-        )
+            content=accumulator.content,
+            user_id=current_user.id,
+            service_type="askatt",
+            model_name=settings.ASKATT_MODEL_NAME,
+            token_usage=accumulator.usage,
+            new_conversation=request.conversation_id is None
+        ))
 
-    return StreamingResponse(stream_response(), media_type="text/event-stream")
+    return StreamingResponse(serialize_stream(stream_response(), "askatt"), media_type="text/event-stream")
 
 
 @router.post("/askdocs", response_class=StreamingResponse)
 async def chat_askdocs(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user_with_context),  # CRITICAL: use context version
+    current_user: Principal = Depends(get_current_user_with_context),  # CRITICAL: use context version
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -174,7 +180,7 @@ async def chat_askdocs(
     - `conversation_id`: Optional existing conversation ID
 
     **Response:**
-    - Streams token-by-token response using SSE format
+    - Streams the response using SSE format (coalesced `token` events)
     - Event types: `token`, `sources`, `usage`, `end`
 
     **Example:**
@@ -194,14 +200,24 @@ async def chat_askdocs(
         )
 
     async def stream_response():
-        # Verify configuration exists and user has access
-        # (automatic filtering via role-based event listener)
-        stmt = select(Configuration).where(Configuration.id == request.configuration_id)
+        # Verify access with the in-memory role index (set lookup); if the index
+        # is unavailable the role-based event listener filters the query instead
+        stmt = (
+            select(Configuration)
+            .where(Configuration.id == request.configuration_id)
+            .options(selectinload(Configuration.domain))  # Upstream payload needs domain_key
+        )
+        if await configuration_access.ensure_fresh(db):
+            if not configuration_access.can_access(current_user.roles, request.configuration_id):
+                yield ErrorEvent("Configuration not found or access denied")
+                return
+            stmt = stmt.execution_options(skip_role_filter=True)
+
         result = await db.execute(stmt)
         config = result.scalar_one_or_none()
 
         if not config:
-            yield f"data: {json.dumps({'type': 'error', 'content': 'Configuration not found or access denied'})}\n\n"
+            yield ErrorEvent("Configuration not found or access denied")
             return
 
         # Get or create conversation
@@ -209,14 +225,17 @@ async def chat_askdocs(
 
         if conversation_id:
             try:
-                conversation = await get_conversation(db, conversation_id, current_user.id)
+                conversation = await get_conversation(db, conversation_id, current_user.id, load_messages=False)
                 # Verify conversation matches configuration
                 if conversation.configuration_id != request.configuration_id:
-                    yield f"data: {json.dumps({'type': 'error', 'content': 'Conversation configuration mismatch'})}\n\n"
+                    yield ErrorEvent("Conversation configuration mismatch")
                     return
             except (ResourceNotFoundError, PermissionDeniedError) as e:
-                yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+                yield ErrorEvent(str(e))
                 return
+
+            # Recent history for context (loaded before the new user message is saved)
+            conversation_history = await load_conversation_history(db, conversation, "askdocs")
         else:
             # Create new conversation
             conversation = await create_conversation(
@@ -226,9 +245,10 @@ async def chat_askdocs(
                 configuration_id=request.configuration_id
             )
             conversation_id = conversation.id
+            conversation_history = []
 
             # Send conversation_id to client
-            yield f"data: {json.dumps({'type': 'conversation_id', 'conversation_id': str(conversation_id)})}\n\n"
+            yield ConversationIdEvent(str(conversation_id))
 
         # Save user message
         await add_message(
@@ -242,62 +262,69 @@ async def chat_askdocs(
         if not conversation.title:
             await generate_conversation_title(db, conversation_id, request.message)
 
-        # Get conversation history
-        conversation_data = await get_conversation(db, conversation_id, current_user.id)
-        conversation_history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in conversation_data.messages[:-1]
-        ]
+        # Standalone questions may be answered from the cache or share an in-flight
+        # upstream call (follow-ups depend on history)
+        standalone = not conversation_history
+        cache_hit = answer_cache.get(config.id, request.message) if standalone else None
+        cache_metadata = cache_hit.metadata() if cache_hit else None
 
         # Stream AI response with RAG (use real or mock based on settings)
-        assistant_message = ""
-        usage_data = None
-        sources_data = None
+        accumulator = MessageAccumulator()
 
-        stream_func = stream_askdocs_chat_mock if settings.USE_MOCK_ASKDOCS else stream_askdocs_chat_real
-
-        async for chunk in stream_func(
-            configuration_id=request.configuration_id,
-            message=request.message,
-            conversation_history=conversation_history,
-            environment=config.environment,
-            db=db
-        ):
-            # Forward chunk to client
-            yield chunk
-
-            # Parse chunk
-            if chunk.startswith("data: "):
-                try:
-                    data = json.loads(chunk[6:])
-                    if data["type"] == "token":
-                        assistant_message += data["content"]
-                    elif data["type"] == "usage":
-                        usage_data = data["usage"]
-                    elif data["type"] == "sources":
-                        sources_data = data["sources"]
-                except json.JSONDecodeError:
-                    pass
-
-        # Save assistant message with sources
-        await add_message(
-            db=db,
+        if cache_hit:
+            events = replay_answer(cache_hit)
+        else:
+            stream_func = stream_askdocs_chat_mock if settings.USE_MOCK_ASKDOCS else stream_askdocs_chat_real
+
+            def start_upstream():
+                events = stream_func(
+                    config=config,
+                    message=request.message,
+                    conversation_history=conversation_history,
+                    environment=config.environment
+                )
+                return answer_cache.record(config.id, request.message, events) if standalone else events
+
+            if standalone and settings.ASKDOCS_COALESCE_ENABLED:
+                subscription = askdocs_flights.join((config.id, normalize_question(request.message)), start_upstream)
+                if not subscription.leader:
+                    cache_metadata = {"hit": True, "match": "in_flight"}
+                events = subscription.events()
+            else:
+                events = start_upstream()
+
+        async for event in coalesce_if_enabled(events):
+            # Build the assistant message and forward the event to the client
+            accumulator.add(event)
+            yield event
+
+        # Save assistant message with sources (batched by the write-behind queue)
+        await persist_message(db, PendingMessage(
             conversation_id=conversation_id,
             role="assistant",
-            content=assistant_message,
-            token_usage=usage_data,
-            sources=sources_data
-        )
+            content=accumulator.content,
+            user_id=current_user.id,
+            service_type="askdocs",
+            configuration_id=config.id,
+            model_name=config.config_key,
+            # Only the request that made the upstream call is charged its tokens
+            token_usage=dict(CACHED_USAGE) if cache_metadata else accumulator.usage,
+            sources=accumulator.sources,
+            cache=cache_metadata,
+            new_conversation=request.conversation_id is None
+        ))
 
-    return StreamingResponse(stream_response(), media_type="text/event-stream")
+    return StreamingResponse(serialize_stream(stream_response(), "askdocs"), media_type="text/event-stream")
 
 
 @router.get("/conversations", response_model=list[ConversationListItem])
 async def list_conversations(
+    response: Response,
     service_type: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -306,19 +333,26 @@ async def list_conversations(
     **Query Parameters:**
     - `service_type`: Filter by "askatt" or "askdocs"
     - `limit`: Max conversations to return (default 50)
-    - `offset`: Pagination offset (default 0)
+    - `offset`: Pagination offset (default 0, ignored when `cursor` is set)
+    - `cursor`: Keyset cursor from a previous page's `X-Next-Cursor` header
 
     **Returns:**
-    - List of conversation summaries with message counts
+    - List of conversation summaries with message counts, newest first
+    - `X-Next-Cursor` header when a full page was returned
     """
     conversations_data = await list_user_conversations(
         db=db,
         user_id=current_user.id,
         service_type=service_type,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
 
+    if conversations_data and len(conversations_data) == limit:
+        last, _ = conversations_data[-1]
+        response.headers["X-Next-Cursor"] = encode_conversation_cursor(last.updated_at, last.id)
+
     return [
         ConversationListItem(
             id=conv.id,
@@ -333,49 +367,92 @@ async def list_conversations(
     ]
 
 
+@router.get("/search", response_model=list[SearchResult])
+async def search_conversations(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500),
+    service_type: Optional[str] = Query(None, pattern="^(askatt|askdocs)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over the current user's messages and conversation titles.
+
+    **Query Parameters:**
+    - `q`: Search text ("quoted phrases", `or` and `-word` are supported on PostgreSQL)
+    - `service_type`: Filter by "askatt" or "askdocs"
+    - `limit`: Max hits to return (default 20)
+    - `cursor`: Keyset cursor from a previous page's `X-Next-Cursor` header
+
+    **Returns:**
+    - Hits ordered by relevance, each with a snippet where matches are wrapped in `<mark>`
+    - `X-Next-Cursor` header when more hits are available
+    """
+    hits, next_cursor = await search_history(
+        db=db,
+        user_id=current_user.id,
+        query=q,
+        service_type=service_type,
+        limit=limit,
+        cursor=cursor
+    )
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return [SearchResult.model_validate(hit) for hit in hits]
+
+
 @router.get("/conversations/{conversation_id}", response_model=ConversationResponse)
 async def get_conversation_detail(
     conversation_id: UUID,
-    current_user: User = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get conversation with full message history.
+    Get conversation with its message history.
+
+    **Query Parameters:**
+    - `limit`: Max messages to return, oldest first (default: all messages)
+    - `cursor`: Keyset cursor from a previous page's `X-Next-Cursor` header
 
     **Returns:**
-    - Conversation with all messages
+    - Conversation with messages, streamed as they are read
+    - `X-Next-Cursor` header when `limit` is set and a full page was returned
 
     **Errors:**
     - `404`: Conversation not found
     - `403`: No access to this conversation
+    - `422`: Invalid cursor
     """
     try:
-        conversation = await get_conversation(db, conversation_id, current_user.id)
-
-        return ConversationResponse(
-            id=conversation.id,
-            user_id=conversation.user_id,
-            service_type=conversation.service_type,
-            configuration_id=conversation.configuration_id,
-            title=conversation.title,
-            created_at=conversation.created_at,
-            updated_at=conversation.updated_at,
-            messages=[
-                MessageResponse.from_orm(msg)
-                for msg in conversation.messages
-            ]
-        )
-
+        conversation = await get_conversation(db, conversation_id, current_user.id, load_messages=False)
     except ResourceNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except PermissionDeniedError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
+    rows, headers = None, {}
+    if limit is not None or cursor:
+        rows, next_cursor = await load_message_page(db, conversation.id, limit or 1000, cursor)
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+
+    return StreamingResponse(
+        stream_conversation_detail(db, conversation, rows),
+        media_type="application/json",
+        headers=headers
+    )
+
 
 @router.delete("/conversations/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation_endpoint(
     conversation_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -393,10 +470,54 @@ async def delete_conversation_endpoint(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
 
+# Token usage is backend-only; users export their own conversations, messages and feedback
+USER_EXPORT_DATASETS = ["conversations", "messages", "feedback"]
+
+
+@router.get("/export/{dataset}", response_class=StreamingResponse)
+async def export_my_data(
+    dataset: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    service_type: Optional[str] = Query(None, pattern="^(askatt|askdocs)$"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Export the current user's history as a streamed NDJSON or CSV file.
+
+    **Path Parameters:**
+    - `dataset`: "conversations", "messages" or "feedback"
+
+    **Query Parameters:**
+    - `format`: "ndjson" (default) or "csv"
+    - `since` / `until`: Created-at range (ISO 8601, `until` exclusive)
+    - `service_type`: "askatt" or "askdocs"
+
+    **Returns:**
+    - File download, streamed in batches from a server-side cursor
+    """
+    if dataset not in USER_EXPORT_DATASETS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"dataset must be one of: {', '.join(USER_EXPORT_DATASETS)}"
+        )
+
+    stmt = build_export_query(dataset, user_id=current_user.id, since=since, until=until, service_type=service_type)
+
+    return StreamingResponse(
+        stream_export(db, stmt, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(dataset, export_format)}"'}
+    )
+
+
 @router.get("/configurations", response_model=list[ConfigurationResponse])
 async def list_configurations(
     environment: Optional[str] = None,
-    current_user: User = Depends(get_current_user_with_context),  # CRITICAL: use context version
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_user_with_context),  # CRITICAL: use context version
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -404,49 +525,29 @@ async def list_configurations(
 
     **IMPORTANT:** Only returns configurations the user has role-based access to.
 
+    The response is cached per role set and carries an `ETag`; send it back in
+    `If-None-Match` to get `304 Not Modified` while the catalog is unchanged.
+
     **Query Parameters:**
     - `environment`: Filter by "stage" or "production"
 
     **Returns:**
     - List of configurations with domain information
     """
-    stmt = (
-        select(Configuration)
-        .where(Configuration.is_active == True)
-        .options(selectinload(Configuration.domain))
-    )
+    catalog = await configuration_catalog.get(db, current_user.roles, environment)
+    headers = {"ETag": catalog.etag, "Cache-Control": "private, no-cache"}
 
-    if environment:
-        stmt = stmt.where(Configuration.environment == environment)
-
-    result = await db.execute(stmt)
-    configurations = result.scalars().all()
+    if etag_matches(if_none_match, catalog.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return [
-        ConfigurationResponse(
-            id=config.id,
-            domain_id=config.domain_id,
-            config_key=config.config_key,
-            display_name=config.display_name,
-            description=config.description,
-            environment=config.environment,
-            is_active=config.is_active,
-            domain=DomainResponse(
-                id=config.domain.id,
-                domain_key=config.domain.domain_key,
-                display_name=config.domain.display_name,
-                description=config.domain.description
-            )
-        )
-        for config in configurations
-    ]
+    return Response(content=catalog.body, media_type="application/json", headers=headers)
 
 
 @router.post("/messages/{message_id}/feedback", response_model=FeedbackResponse)
 async def submit_message_feedback(
     message_id: UUID,
     request: FeedbackRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -17,6 +17,24 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 8
 
+    # Password hashing (bcrypt runs in a bounded thread pool, see app/core/passwords.py)
+    BCRYPT_ROUNDS: int = 12  # Cost factor; stored hashes with another cost are rehashed on login
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 256  # Waiting callers before new ones get 503
+
+    # Authenticated principal cache (user id -> active flag, role names)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0  # A deactivated user or a role change lags on other workers by up to this much
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Role -> configuration access index (rebuilt on admin changes and on this interval)
+    CONFIG_ACCESS_REFRESH_SECONDS: float = 60.0  # Revoked configuration grants lapse on every worker within this interval
+
+    # Serialized configuration catalog per role set (invalidated on admin changes)
+    CONFIG_CATALOG_TTL_SECONDS: float = 60.0  # Renamed or removed configurations can stay listed until entries expire
+
+    # Streaming exports (rows fetched and serialized per batch)
+    EXPORT_BATCH_SIZE: int = 1000
+
     # MOCK Services (for local development)
     USE_MOCK_ASKATT: bool = True
     USE_MOCK_ASKDOCS: bool = True
@@ -37,6 +55,11 @@ class Settings(BaseSettings):
     # Note: Client credential flows require /.default suffix (per Azure AD error AADSTS1002012)
     AZURE_SCOPE_ASKATT_DOMAIN: str
 
+    # Azure AD token cache (per scope)
+    AZURE_TOKEN_REFRESH_MARGIN_SECONDS: int = 300  # Refresh in background this long before expiry
+    AZURE_TOKEN_EXPIRY_SKEW_SECONDS: int = 30  # Treat tokens as expired this much early
+    AZURE_TOKEN_DEFAULT_EXPIRES_IN: int = 3600  # Used when the response omits expires_in
+
     # AskAT&T API Configuration
     # Internal API URLs - these should come from .env file
     ASKATT_API_BASE_URL_STAGE: str
@@ -44,6 +67,7 @@ class Settings(BaseSettings):
     ASKATT_DOMAIN_NAME: str = "GenerativeAI"
     ASKATT_MODEL_NAME: str = "gpt-4o"
     ASKATT_MAX_TOKENS: int = 800
+    ASKATT_STREAMING: bool = True  # Forward upstream deltas as they arrive (falls back to buffered)
 
     # AskDocs API (optional when using MOCK)
     # These URLs should come from .env file to allow different environments
@@ -54,6 +78,92 @@ class Settings(BaseSettings):
     ASKDOCS_CONFIG_API_STAGE: str
     ASKDOCS_CONFIG_API_PRODUCTION: str
 
+    # Upstream HTTP client pools (shared by AskAT&T, AskDocs and Azure AD calls)
+    UPSTREAM_HTTP2: bool = True
+    UPSTREAM_VERIFY_SSL: bool = False
+    UPSTREAM_MAX_CONNECTIONS: int = 100  # Per upstream host
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 20  # Idle connections kept warm per host
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 60.0  # Seconds an idle connection is kept
+    UPSTREAM_CONNECT_TIMEOUT: float = 10.0
+    UPSTREAM_POOL_TIMEOUT: float = 10.0  # Max wait for a free pooled connection
+    UPSTREAM_DEFAULT_TIMEOUT: float = 30.0
+
+    # Per-upstream read timeouts (seconds)
+    ASKATT_TIMEOUT: float = 60.0
+    ASKDOCS_TIMEOUT: float = 120.0
+    ASKDOCS_CONFIG_TIMEOUT: float = 30.0
+    AZURE_AD_TIMEOUT: float = 30.0
+
+    # Adaptive per-upstream concurrency limits (see app/core/concurrency.py)
+    UPSTREAM_LIMIT_ENABLED: bool = True
+    UPSTREAM_LIMIT_INITIAL: int = 20  # Concurrent calls per upstream before adapting
+    UPSTREAM_LIMIT_MIN: int = 2
+    UPSTREAM_LIMIT_MAX: int = 100
+    UPSTREAM_LIMIT_BACKOFF: float = 0.7  # Multiplier on 429/5xx, timeouts or slow calls
+    UPSTREAM_MAX_QUEUE: int = 200  # Waiting requests before failing fast
+    UPSTREAM_QUEUE_TIMEOUT_MS: float = 2000.0  # Max wait for a slot
+    ASKATT_LATENCY_TARGET_SECONDS: float = 15.0  # Time to response headers
+    ASKDOCS_LATENCY_TARGET_SECONDS: float = 45.0  # Full RAG answer
+
+    # Upstream retries, hedging and circuit breaker (see app/core/resilience.py)
+    UPSTREAM_MAX_RETRIES: int = 2  # Connection failures and 502/503/504, before the first token
+    UPSTREAM_RETRY_BACKOFF_MS: float = 200.0  # Full jitter; doubles per retry
+    UPSTREAM_RETRY_BACKOFF_MAX_MS: float = 2000.0
+    UPSTREAM_HEDGING_ENABLED: bool = False  # Send a second request when the first exceeds p95 latency
+    UPSTREAM_HEDGE_MIN_SAMPLES: int = 20  # Latencies needed before hedging starts
+    UPSTREAM_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failed attempts that open the circuit
+    UPSTREAM_CIRCUIT_OPEN_SECONDS: float = 30.0  # Fail fast this long, then probe
+
+    # SSE token frame coalescing (flush by size or time window, whichever first)
+    SSE_COALESCE_ENABLED: bool = True
+    SSE_COALESCE_MAX_BYTES: int = 256
+    SSE_COALESCE_WINDOW_MS: float = 16.0
+    SSE_COALESCE_QUEUE_SIZE: int = 1024  # Chunks read ahead from the service before it is paused
+
+    # Conversation history sent upstream per turn (newest messages within both limits)
+    ASKATT_HISTORY_MAX_MESSAGES: int = 20
+    ASKATT_HISTORY_MAX_TOKENS: int = 4000  # Estimated at ~4 characters per token
+    ASKDOCS_HISTORY_MAX_MESSAGES: int = 10
+    ASKDOCS_HISTORY_MAX_TOKENS: int = 2000
+    HISTORY_SUMMARIZE_OLDER: bool = False  # Condense older turns into one system message
+    HISTORY_SUMMARY_MESSAGES: int = 20  # Older messages considered for the summary
+    HISTORY_SUMMARY_MAX_TOKENS: int = 300
+
+    # AskDocs answer cache for standalone questions (see app/services/answer_cache.py)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+    ANSWER_CACHE_MAX_ENTRIES: int = 5000  # Per worker, least recently used evicted first
+    ANSWER_CACHE_NEAR_DUPLICATES: bool = False  # Also match reworded questions by SimHash
+    ANSWER_CACHE_MAX_DISTANCE: int = 3  # Max differing fingerprint bits (of 64) for a near match
+
+    # Concurrent identical standalone AskDocs questions share one upstream call
+    ASKDOCS_COALESCE_ENABLED: bool = True
+
+    # Recent-history cache for active conversations (see app/services/history_cache.py)
+    HISTORY_CACHE_ENABLED: bool = True
+    HISTORY_CACHE_BACKEND: str = "memory"  # memory (per worker) or redis (shared)
+    HISTORY_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    HISTORY_CACHE_MAX_MESSAGES: int = 50  # Newest messages kept per conversation
+    HISTORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Memory backend budget
+    HISTORY_CACHE_TTL_SECONDS: float = 900.0
+
+    # Write-behind message persistence (see app/services/persistence.py)
+    PERSIST_WRITE_BEHIND_ENABLED: bool = True
+    PERSIST_QUEUE_MAXSIZE: int = 10000  # Messages held in memory before enqueue applies backpressure
+    PERSIST_BATCH_SIZE: int = 200
+    PERSIST_FLUSH_INTERVAL_MS: float = 200.0  # Max time a queued message waits for its batch
+    PERSIST_ENQUEUE_TIMEOUT_MS: float = 100.0  # Wait for queue space, then write synchronously
+    PERSIST_MAX_RETRIES: int = 3
+    PERSIST_DRAIN_TIMEOUT_SECONDS: float = 30.0
+
+    # Prometheus metrics at GET /metrics (see app/core/metrics.py)
+    METRICS_ENABLED: bool = True
+
+    # SQL statement profiling (see app/core/query_profiler.py)
+    DB_QUERY_HEADERS_ENABLED: bool = True  # X-DB-Query-Count / X-DB-Query-Time response headers
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # Log statements at least this slow (0 = off)
+    DB_QUERY_COUNT_WARN: int = 50  # Log requests running more statements than this (0 = off)
+
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
 
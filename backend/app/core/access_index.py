@@ -0,0 +1,169 @@
+"""
+In-memory role -> configuration access index.
+
+AskDocs authorization and configuration listing only need to know which
+configuration ids each role may use. The index loads role_configuration_access
+once (one join over roles) into role name -> frozenset of configuration ids,
+so an access check is a set lookup and listing is a primary-key IN query.
+
+The index is rebuilt when an admin changes configuration roles
+(configuration_access.invalidate()) and at least every
+CONFIG_ACCESS_REFRESH_SECONDS, which bounds staleness across workers. If it
+cannot be built, callers leave their queries to the role-based loader
+criteria in app.models (the fallback).
+
+Queries already restricted through the index pass the execution option
+`skip_role_filter=True` so the loader criteria does not add its EXISTS
+subquery on top.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from uuid import UUID
+import asyncio
+import logging
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.user import Role
+from app.models.domain import role_configuration_access
+
+logger = logging.getLogger(__name__)
+
+# Roles that see every configuration (matches the loader criteria bypass)
+UNRESTRICTED_ROLES = frozenset({"ADMIN"})
+
+
+@dataclass(frozen=True, slots=True)
+class AccessSnapshot:
+    """Role name -> accessible configuration ids at one point in time."""
+    by_role: dict[str, frozenset[UUID]]
+    generation: int
+    built_at: float
+
+
+class ConfigurationAccessIndex:
+    """Per-process access index, rebuilt on invalidation and on a timer."""
+
+    def __init__(self):
+        self._snapshot: Optional[AccessSnapshot] = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._stats = {"checks": 0, "rebuilds": 0, "invalidations": 0, "errors": 0}
+
+    def _is_fresh(self) -> bool:
+        snapshot = self._snapshot
+        return (
+            snapshot is not None
+            and snapshot.generation == self._generation
+            and time.monotonic() - snapshot.built_at < settings.CONFIG_ACCESS_REFRESH_SECONDS
+        )
+
+    async def ensure_fresh(self, db: AsyncSession) -> bool:
+        """
+        Rebuild the index if it was invalidated or is older than the refresh interval.
+
+        Args:
+            db: Database session (used only for a rebuild)
+
+        Returns:
+            True if the index can be used, False to fall back to query filtering
+        """
+        if self._is_fresh():
+            return True
+
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            if self._is_fresh():
+                return True
+
+            generation = self._generation
+            try:
+                stmt = (
+                    select(Role.name, role_configuration_access.c.configuration_id)
+                    .join(role_configuration_access, role_configuration_access.c.role_id == Role.id)
+                    .execution_options(skip_role_filter=True)
+                )
+                result = await db.execute(stmt)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Configuration access index rebuild failed, using query filtering: {e}")
+                return False
+
+            by_role: dict[str, set[UUID]] = {}
+            for role_name, configuration_id in result.all():
+                by_role.setdefault(role_name, set()).add(configuration_id)
+
+            # An invalidation during the rebuild leaves the new snapshot stale
+            self._snapshot = AccessSnapshot(
+                by_role={name: frozenset(ids) for name, ids in by_role.items()},
+                generation=generation,
+                built_at=time.monotonic(),
+            )
+            self._stats["rebuilds"] += 1
+            logger.debug(f"Configuration access index rebuilt: {len(by_role)} roles")
+
+            return self._snapshot.generation == self._generation
+
+    def allowed_ids(self, roles: Iterable[str]) -> Optional[frozenset[UUID]]:
+        """
+        Configuration ids accessible to any of the given roles.
+
+        Call after ensure_fresh() returned True.
+
+        Args:
+            roles: Role names of the current user
+
+        Returns:
+            Accessible ids, or None if the roles are unrestricted (ADMIN)
+        """
+        roles = frozenset(roles)
+        if roles & UNRESTRICTED_ROLES:
+            return None
+
+        by_role = self._snapshot.by_role if self._snapshot else {}
+        allowed: frozenset[UUID] = frozenset()
+        for role in roles:
+            allowed = allowed | by_role.get(role, frozenset())
+        return allowed
+
+    def can_access(self, roles: Iterable[str], configuration_id: UUID) -> bool:
+        """
+        Check whether any of the roles grants access to a configuration.
+
+        Call after ensure_fresh() returned True.
+
+        Args:
+            roles: Role names of the current user
+            configuration_id: Configuration UUID
+
+        Returns:
+            True if access is allowed
+        """
+        self._stats["checks"] += 1
+        roles = frozenset(roles)
+        if roles & UNRESTRICTED_ROLES:
+            return True
+
+        by_role = self._snapshot.by_role if self._snapshot else {}
+        return any(configuration_id in by_role.get(role, ()) for role in roles)
+
+    def invalidate(self) -> None:
+        """Force a rebuild on next use (call after changing configuration roles)."""
+        self._generation += 1
+        self._stats["invalidations"] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get index counters.
+
+        Returns:
+            Dict with checks, rebuilds, invalidations, errors and indexed roles
+        """
+        return {**self._stats, "roles": len(self._snapshot.by_role) if self._snapshot else 0}
+
+
+# Global access index instance
+configuration_access = ConfigurationAccessIndex()
@@ -0,0 +1,194 @@
+"""
+Adaptive concurrency limits for upstream AI services.
+
+Each upstream (AskAT&T, AskDocs) gets a limiter that bounds the calls in
+flight. The limit adapts AIMD-style to what the upstream reports back:
+
+- a call that succeeds within the latency target while the limiter is full
+  raises the limit by 1/limit (about +1 per limit's worth of calls)
+- a 429 or 5xx status, a timeout, a connection failure or a call slower than
+  the target multiplies the limit by UPSTREAM_LIMIT_BACKOFF, at most once per
+  observed round trip so one burst of failures is not counted many times
+
+Requests over the limit wait in a FIFO queue for up to
+UPSTREAM_QUEUE_TIMEOUT_MS. When the queue is full or the wait times out the
+limiter raises UpstreamSaturatedError with a retry-after estimate, so the
+client gets a fast error event instead of waiting out the upstream's
+60s/120s timeout behind a throttled gateway.
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import logging
+import math
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the upstream (or gateway in front of it) is overloaded
+OVERLOAD_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class UpstreamSaturatedError(Exception):
+    """The limiter's queue is full or the wait for a slot timed out."""
+
+    def __init__(self, name: str, retry_after: int):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} is at its concurrency limit; retry after {retry_after}s")
+
+
+class LimiterSlot:
+    """One admitted upstream call; record the upstream's answer on it."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.status_code: Optional[int] = None
+        self.latency: Optional[float] = None
+
+    def record(self, status_code: int) -> None:
+        """
+        Record the upstream response status (call once headers arrive).
+
+        Args:
+            status_code: HTTP status of the upstream response
+        """
+        if self.status_code is None:
+            self.status_code = status_code
+            self.latency = time.monotonic() - self.started_at
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with a bounded wait queue."""
+
+    def __init__(self, name: str, latency_target: float):
+        self.name = name
+        self.latency_target = latency_target
+        self.limit = float(settings.UPSTREAM_LIMIT_INITIAL)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._latency: Optional[float] = None  # Moving average, seconds
+        self._last_decrease = 0.0
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "increases": 0, "decreases": 0}
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[LimiterSlot]:
+        """
+        Hold a slot for one upstream call.
+
+        Yields:
+            LimiterSlot; call slot.record(status_code) when the response arrives
+
+        Raises:
+            UpstreamSaturatedError: If no slot frees up in time
+        """
+        await self._acquire()
+        slot = LimiterSlot()
+        try:
+            yield slot
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away; says nothing about the upstream
+            raise
+        except Exception:
+            # Timeouts and connection failures count as overload
+            if slot.status_code is None:
+                self._observe(time.monotonic() - slot.started_at, overloaded=True)
+            else:
+                self._observe(slot.latency, overloaded=slot.status_code in OVERLOAD_STATUS_CODES)
+            raise
+        else:
+            if slot.status_code is not None:
+                self._observe(slot.latency, overloaded=slot.status_code in OVERLOAD_STATUS_CODES)
+        finally:
+            self.in_flight -= 1
+            self._wake()
+
+    async def _acquire(self) -> None:
+        if not settings.UPSTREAM_LIMIT_ENABLED or (not self._waiters and self.in_flight < int(self.limit)):
+            self.in_flight += 1
+            self._stats["admitted"] += 1
+            return
+
+        if len(self._waiters) >= settings.UPSTREAM_MAX_QUEUE:
+            self._reject()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+
+        try:
+            await asyncio.wait_for(waiter, settings.UPSTREAM_QUEUE_TIMEOUT_MS / 1000)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self._reject()
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.in_flight -= 1
+                self._wake()
+            self._discard(waiter)
+            raise
+
+        self._stats["admitted"] += 1
+
+    def _reject(self) -> None:
+        self._stats["rejected"] += 1
+        raise UpstreamSaturatedError(self.name, self.retry_after())
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _wake(self) -> None:
+        """Hand free slots to queued requests, oldest first."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _observe(self, latency: float, overloaded: bool) -> None:
+        self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+
+        if overloaded or latency > self.latency_target:
+            now = time.monotonic()
+            if now - self._last_decrease >= min(self._latency, self.latency_target):
+                self._last_decrease = now
+                self.limit = max(float(settings.UPSTREAM_LIMIT_MIN), self.limit * settings.UPSTREAM_LIMIT_BACKOFF)
+                self._stats["decreases"] += 1
+                logger.warning(f"{self.name} concurrency limit lowered to {int(self.limit)}")
+
+        elif self.in_flight >= int(self.limit):
+            # Only grow while the limit is actually the bottleneck
+            self.limit = min(float(settings.UPSTREAM_LIMIT_MAX), self.limit + 1 / self.limit)
+            self._stats["increases"] += 1
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to be free (about one round trip)."""
+        return max(1, min(60, math.ceil(self._latency or 1)))
+
+    def get_stats(self) -> dict:
+        """
+        Get limiter counters.
+
+        Returns:
+            Dict with the current limit, in-flight and queued calls, latency and counters
+        """
+        return {
+            **self._stats,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "latency_seconds": round(self._latency, 3) if self._latency is not None else None,
+        }
+
+
+# Global upstream limiter instances
+askatt_limiter = AdaptiveLimiter("AskAT&T", settings.ASKATT_LATENCY_TARGET_SECONDS)
+askdocs_limiter = AdaptiveLimiter("AskDocs", settings.ASKDOCS_LATENCY_TARGET_SECONDS)
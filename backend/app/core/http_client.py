@@ -0,0 +1,132 @@
+"""
+Shared upstream HTTP client registry.
+
+Keeps one pooled httpx.AsyncClient per upstream host (APIM gateway, Azure AD,
+AskDocs configuration API) so chat turns reuse warm TCP/TLS connections
+instead of paying a new handshake on every call.
+
+Created in main.lifespan and closed on shutdown. Clients are also created
+lazily on first use so scripts and tests that bypass the lifespan still work.
+"""
+from typing import Optional
+from urllib.parse import urlsplit
+import logging
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional "h2" package (installed via httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    HTTP2_AVAILABLE = False
+
+
+def upstream_timeout(total: float) -> httpx.Timeout:
+    """
+    Build a per-request timeout for an upstream call.
+
+    Args:
+        total: Read/write timeout in seconds for this call
+
+    Returns:
+        httpx.Timeout with the shared connect and pool timeouts
+    """
+    return httpx.Timeout(
+        total,
+        connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+        pool=settings.UPSTREAM_POOL_TIMEOUT,
+    )
+
+
+def _origin(url: str) -> str:
+    """Return scheme://host:port for a URL (the pool key)."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+class UpstreamClientRegistry:
+    """Registry of pooled httpx.AsyncClient instances, one per upstream host."""
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create a client with the configured pool limits and keep-alive."""
+        http2 = settings.UPSTREAM_HTTP2 and HTTP2_AVAILABLE
+        if settings.UPSTREAM_HTTP2 and not HTTP2_AVAILABLE:
+            logger.warning("UPSTREAM_HTTP2 is enabled but 'h2' is not installed; using HTTP/1.1")
+
+        limits = httpx.Limits(
+            max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+        )
+
+        return httpx.AsyncClient(
+            http2=http2,
+            verify=settings.UPSTREAM_VERIFY_SSL,
+            limits=limits,
+            timeout=upstream_timeout(settings.UPSTREAM_DEFAULT_TIMEOUT),
+        )
+
+    def open(self, urls: Optional[list[str]] = None) -> None:
+        """
+        Create clients for the given upstream URLs ahead of the first request.
+
+        Args:
+            urls: Upstream URLs to prepare pools for (duplicates share a pool)
+        """
+        for url in urls or []:
+            if url:
+                self.get_client(url)
+        logger.info(f"Upstream HTTP client pools ready: {sorted(self._clients)}")
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """
+        Get the pooled client for the host of the given URL.
+
+        Args:
+            url: Full request URL
+
+        Returns:
+            Shared httpx.AsyncClient for that host
+        """
+        key = _origin(url)
+        client = self._clients.get(key)
+
+        if client is None or client.is_closed:
+            client = self._build_client()
+            self._clients[key] = client
+
+        return client
+
+    async def aclose(self) -> None:
+        """Close all pooled clients and their connections."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+
+        for client in clients:
+            await client.aclose()
+
+
+# Global registry instance
+upstream_clients = UpstreamClientRegistry()
+
+
+def get_upstream_client(url: str) -> httpx.AsyncClient:
+    """
+    Get the shared pooled client for an upstream URL.
+
+    Args:
+        url: Full request URL
+
+    Returns:
+        Shared httpx.AsyncClient (do not close it; the registry owns it)
+    """
+    return upstream_clients.get_client(url)
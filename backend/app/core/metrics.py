@@ -0,0 +1,273 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Collectors are kept deliberately small so they can sit on hot paths:
+
+- Histogram buckets are preallocated per label set; observe() is a bisect
+  and three integer/float updates, with no allocation
+- label children are created once and cached; hot callers may keep the
+  child returned by labels() instead of looking it up per observation
+- values that already exist elsewhere (cache counters, pool sizes,
+  concurrency limits) are read by callbacks at scrape time, so they cost
+  nothing between scrapes
+
+SQL statement timing is collected by app.core.query_profiler.
+
+GET /metrics renders every registered collector. Metrics are per worker
+process; Prometheus aggregates across workers by the instance label.
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable
+import math
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; request, upstream and stream timings span ms to the 120s upstream timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def route_label(scope: dict) -> str:
+    """
+    Route template for a request scope, for bounded-cardinality labels.
+
+    Args:
+        scope: ASGI scope; FastAPI sets scope["route"] once a route matches
+
+    Returns:
+        The route path (e.g. /api/v1/chat/conversations/{conversation_id}),
+        or "unmatched" before routing or for 404s
+    """
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _Collector(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        ...
+
+
+class _Metric(_Collector):
+    """Collector with one child per label combination, updated by the application."""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._children: dict[tuple, object] = {}
+
+    def labels(self, *values):
+        """Get (creating once) the child for a label combination."""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        ...
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    @abstractmethod
+    def _render_child(self, values: tuple, child) -> list[str]:
+        ...
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float, *label_values) -> None:
+        self.labels(*label_values).observe(value)
+
+    def _render_child(self, values: tuple, child: _HistogramChild) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), child.counts):
+            cumulative += count
+            le = _labels(self.label_names, values, f'le="{_number(bound)}"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        labels = _labels(self.label_names, values)
+        lines.append(f"{self.name}_sum{labels} {_number(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0, *label_values) -> None:
+        self.labels(*label_values).inc(amount)
+
+    def _render_child(self, values: tuple, child: _CounterChild) -> list[str]:
+        return [f"{self.name}{_labels(self.label_names, values)} {_number(child.value)}"]
+
+
+class CallbackMetric(_Collector):
+    """Gauge or counter whose samples are read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[tuple[tuple, float]]],
+        label_names: Iterable[str] = (),
+        kind: str = "gauge"
+    ):
+        super().__init__(name, documentation, label_names)
+        self.callback = callback
+        self.kind = kind
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for values, value in self.callback():
+            if value is not None:
+                lines.append(f"{self.name}{_labels(self.label_names, values)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collectors rendered by GET /metrics."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Collector] = {}
+
+    def register(self, metric: _Collector) -> _Collector:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[tuple[tuple, float]]],
+        label_names: Iterable[str] = (),
+        kind: str = "gauge"
+    ) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, callback, label_names, kind))
+
+    def render(self) -> str:
+        """Render all metrics in the text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
+
+# Hot-path collectors
+REQUEST_LATENCY = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time from request start to response headers, by route template",
+    ("method", "route", "status"),
+)
+SSE_TIME_TO_FIRST_TOKEN = metrics.histogram(
+    "sse_time_to_first_token_seconds",
+    "Time from stream start to the first token event",
+    ("service",),
+)
+SSE_STREAM_DURATION = metrics.histogram(
+    "sse_stream_duration_seconds",
+    "Time from stream start to the last event",
+    ("service",),
+)
+UPSTREAM_LATENCY = metrics.histogram(
+    "upstream_request_duration_seconds",
+    "Upstream attempt time to response headers, by service and status (error = no response)",
+    ("service", "status"),
+)
+DB_QUERIES_PER_REQUEST = metrics.histogram(
+    "db_queries_per_request",
+    "SQL statements executed per request, by route template",
+    ("route",),
+    buckets=COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = metrics.histogram(
+    "db_query_seconds_per_request",
+    "Total SQL statement time per request, by route template",
+    ("route",),
+    buckets=QUERY_BUCKETS,
+)
+DB_QUERY_DURATION = metrics.histogram(
+    "db_query_duration_seconds",
+    "Duration of individual SQL statements",
+    buckets=QUERY_BUCKETS,
+)
+
@@ -0,0 +1,142 @@
+"""
+Password hashing off the event loop.
+
+bcrypt deliberately costs ~100-300ms of CPU per hash or verify. Running it
+inline in an async handler stalls every request and SSE stream on the
+worker, so PasswordHasher runs it in a small thread pool (bcrypt releases
+the GIL while hashing).
+
+At most PASSWORD_HASH_WORKERS operations run at once; callers beyond that
+wait on a semaphore without holding a thread. When more than
+PASSWORD_HASH_MAX_QUEUE callers are already waiting, new ones are rejected
+with 503 so a login storm cannot build an unbounded backlog.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+import asyncio
+import logging
+import time
+
+from app.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.security import get_password_hash, verify_and_update_password
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs bcrypt operations in a bounded thread pool."""
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_queue = max_queue if max_queue is not None else settings.PASSWORD_HASH_MAX_QUEUE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._active = 0
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "rehashed": 0,
+            "max_queue_depth": 0,
+            "total_wait_ms": 0.0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="bcrypt"
+            )
+            self._semaphore = asyncio.Semaphore(self.workers)
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        """
+        Run a blocking function in the pool, waiting for a free worker.
+
+        Raises:
+            ServiceUnavailableError: If the wait queue is full
+        """
+        executor = self._get_executor()
+
+        if self._waiting >= self.max_queue:
+            self._stats["rejected"] += 1
+            logger.warning(f"Password hashing queue full ({self._waiting} waiting); rejecting request")
+            raise ServiceUnavailableError("Too many concurrent sign-in requests, please retry")
+
+        self._waiting += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._waiting)
+        started = time.perf_counter()
+
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._stats["total_wait_ms"] += (time.perf_counter() - started) * 1000
+        self._active += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+        finally:
+            self._active -= 1
+            self._stats["completed"] += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured cost factor.
+
+        Args:
+            password: Plain text password
+
+        Returns:
+            Bcrypt hashed password
+        """
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """
+        Verify a password, returning a replacement hash if its cost is outdated.
+
+        Args:
+            password: Plain text password
+            hashed_password: Stored bcrypt hash
+
+        Returns:
+            Tuple of (matches, new_hash or None)
+        """
+        valid, new_hash = await self._run(verify_and_update_password, password, hashed_password)
+        if new_hash:
+            self._stats["rehashed"] += 1
+        return valid, new_hash
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (called from lifespan)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+    def get_stats(self) -> dict:
+        """
+        Get pool counters.
+
+        Returns:
+            Dict with completed, rejected, rehashed, max_queue_depth,
+            total_wait_ms and the current queue depth and active workers
+        """
+        return {
+            **self._stats,
+            "queue_depth": self._waiting,
+            "active": self._active,
+            "workers": self.workers,
+        }
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,159 @@
+"""
+Authenticated principal and its per-process cache.
+
+A Principal is the small, immutable view of a user that request handling
+needs (id, profile fields, active flag, role names). It is loaded with one
+column-only query, so no ORM User/Role objects or their eager relationships
+are materialized, and cached for PRINCIPAL_CACHE_TTL_SECONDS.
+
+Role and account changes call principal_cache.invalidate(user_id), which
+drops the entry and bumps the user's version so a load that was already in
+flight cannot store the stale result. Other workers pick up the change when
+their entry expires, so the TTL bounds cross-process staleness.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.user import User, Role, user_roles
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated user as seen by request handlers."""
+    id: UUID
+    attid: str
+    email: str
+    display_name: Optional[str]
+    is_active: bool
+    created_at: datetime
+    roles: frozenset[str]
+    version: int = 0
+
+    def has_role(self, *role_names: str) -> bool:
+        """True if the principal has any of the given roles."""
+        return any(name in self.roles for name in role_names)
+
+
+async def load_principal(db: AsyncSession, user_id: UUID, version: int = 0) -> Optional[Principal]:
+    """
+    Load a principal with a single user/roles query.
+
+    Args:
+        db: Database session
+        user_id: User UUID
+        version: Cache version to stamp on the principal
+
+    Returns:
+        Principal, or None if the user does not exist
+    """
+    stmt = (
+        select(
+            User.id,
+            User.attid,
+            User.email,
+            User.display_name,
+            User.is_active,
+            User.created_at,
+            Role.name,
+        )
+        .select_from(User)
+        .outerjoin(user_roles, user_roles.c.user_id == User.id)
+        .outerjoin(Role, Role.id == user_roles.c.role_id)
+        .where(User.id == user_id)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+
+    if not rows:
+        return None
+
+    first = rows[0]
+    return Principal(
+        id=first.id,
+        attid=first.attid,
+        email=first.email,
+        display_name=first.display_name,
+        is_active=first.is_active,
+        created_at=first.created_at,
+        roles=frozenset(row.name for row in rows if row.name is not None),
+        version=version,
+    )
+
+
+class PrincipalCache:
+    """LRU cache of principals by user id with a short TTL."""
+
+    def __init__(self):
+        self._entries: OrderedDict[UUID, tuple[Principal, float]] = OrderedDict()
+        self._versions: dict[UUID, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def get(self, db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+        """
+        Get the principal for a user, loading it on a miss.
+
+        Args:
+            db: Database session (used only on a miss)
+            user_id: User UUID
+
+        Returns:
+            Principal, or None if the user does not exist
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            principal, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(user_id)
+                self._stats["hits"] += 1
+                return principal
+            del self._entries[user_id]
+
+        self._stats["misses"] += 1
+
+        version = self._versions.get(user_id, 0)
+        principal = await load_principal(db, user_id, version)
+
+        # Skip storing if the user was invalidated while we were loading
+        if principal is not None and self._versions.get(user_id, 0) == version:
+            self._entries[user_id] = (principal, time.monotonic() + settings.PRINCIPAL_CACHE_TTL_SECONDS)
+            while len(self._entries) > settings.PRINCIPAL_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+        return principal
+
+    def invalidate(self, user_id: UUID) -> None:
+        """
+        Drop a user's cached principal (call after changing roles or status).
+
+        Args:
+            user_id: User UUID
+        """
+        self._entries.pop(user_id, None)
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Drop all cached principals."""
+        for user_id in list(self._entries):
+            self.invalidate(user_id)
+
+    def get_stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with hits, misses, invalidations and cached entries
+        """
+        return {**self._stats, "entries": len(self._entries)}
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
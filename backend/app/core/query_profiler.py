@@ -0,0 +1,137 @@
+"""
+Per-request SQL statement counting and slow-query logging.
+
+instrument_engine() hooks before/after_cursor_execute on the engine. Every
+statement is timed into the db_query_duration_seconds histogram and, when it
+runs inside an HTTP request, added to that request's RequestDbStats. The
+request middleware (app.main) turns those totals into:
+
+- X-DB-Query-Count / X-DB-Query-Time response headers (statements run
+  before the response started; for SSE streams that excludes the stream)
+- db_queries_per_request / db_query_seconds_per_request histograms by route
+  (whole request, streamed body included)
+- a warning when one request runs more than DB_QUERY_COUNT_WARN statements,
+  the usual sign of an N+1 loop or a selectin cascade
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with the route
+that ran them. Parameters are never logged (they carry user content).
+
+count_queries() counts the statements run on an engine inside a block; the
+assert_max_queries test fixture is built on it.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.core.metrics import DB_QUERY_DURATION, route_label
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text written to the slow-query log
+MAX_LOGGED_STATEMENT = 1000
+
+
+class RequestDbStats:
+    """SQL statement count and time for the current request."""
+    __slots__ = ("scope", "queries", "seconds")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.queries = 0
+        self.seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        """Route template of the request, once routing has happened."""
+        return route_label(self.scope) if self.scope is not None else "unknown"
+
+
+# Set by the request middleware; statements outside a request are not attributed
+request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Time every SQL statement on an engine and attribute it to the current request.
+
+    Args:
+        engine: Sync engine (AsyncEngine.sync_engine)
+    """
+    query_duration = DB_QUERY_DURATION.labels()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._profiler_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._profiler_started_at
+        query_duration.observe(elapsed)
+
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+        threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold_ms and elapsed * 1000 >= threshold_ms:
+            route = stats.route if stats is not None else "background"
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f}ms) on {route}: "
+                f"{' '.join(statement.split())[:MAX_LOGGED_STATEMENT]}"
+            )
+
+
+def check_request_query_count(method: str, stats: RequestDbStats) -> None:
+    """
+    Warn when a finished request ran more statements than DB_QUERY_COUNT_WARN.
+
+    Args:
+        method: HTTP method of the request
+        stats: The request's totals
+    """
+    if settings.DB_QUERY_COUNT_WARN and stats.queries > settings.DB_QUERY_COUNT_WARN:
+        logger.warning(
+            f"{method} {stats.route} ran {stats.queries} queries "
+            f"({stats.seconds * 1000:.1f}ms); possible N+1"
+        )
+
+
+class QueryCount:
+    """Statements seen by count_queries()."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryCount]:
+    """
+    Count the SQL statements run on an engine inside the block.
+
+    Args:
+        engine: Sync engine (AsyncEngine.sync_engine)
+
+    Yields:
+        QueryCount; its statements list fills in as the block runs
+    """
+    counter = QueryCount()
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
@@ -0,0 +1,277 @@
+"""
+Retries, hedged requests and circuit breaking for upstream AI calls.
+
+UpstreamGuard.call() wraps one logical upstream request (AskAT&T, AskDocs):
+
+1. Circuit breaker: after UPSTREAM_CIRCUIT_FAILURE_THRESHOLD consecutive
+   failures the circuit opens and calls fail fast with CircuitOpenError for
+   UPSTREAM_CIRCUIT_OPEN_SECONDS. Then one probe call is let through
+   (half-open); its success closes the circuit, its failure reopens it.
+2. Concurrency limit: the call holds one slot of the upstream's adaptive
+   limiter (app.core.concurrency) for its whole duration, hedges included.
+3. Retries: connection failures and 502/503/504 responses are retried up to
+   UPSTREAM_MAX_RETRIES times with full-jitter exponential backoff. Retries
+   happen only while waiting for response headers, before the first token
+   reaches the client, so a retried turn never shows duplicated text. The
+   chat payloads have no upstream side effects, so resending them is safe.
+   Read timeouts are not retried: the turn has already waited the full
+   timeout.
+4. Hedging (UPSTREAM_HEDGING_ENABLED): if an attempt has no response after
+   the upstream's recent p95 latency, a second identical request is sent and
+   whichever answers first is used; the other is cancelled.
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+import asyncio
+import logging
+import math
+import random
+import time
+
+import httpx
+
+from app.config import settings
+from app.core.concurrency import AdaptiveLimiter, askatt_limiter, askdocs_limiter
+from app.core.metrics import UPSTREAM_LATENCY
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+# Failures that happen before the upstream received or processed the request
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+# Recent latencies kept for the hedging threshold
+LATENCY_WINDOW = 200
+
+
+class CircuitOpenError(Exception):
+    """The upstream's circuit is open; calls fail fast until it recovers."""
+
+    def __init__(self, name: str, retry_after: int):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} circuit is open; retry after {retry_after}s")
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self._stats = {"opened": 0, "short_circuited": 0}
+
+    def check(self) -> None:
+        """
+        Admit a call or fail fast.
+
+        Raises:
+            CircuitOpenError: While the circuit is open, or a probe is already running
+        """
+        now = time.monotonic()
+
+        if self.state == "open":
+            remaining = self._opened_at + settings.UPSTREAM_CIRCUIT_OPEN_SECONDS - now
+            if remaining > 0:
+                self._stats["short_circuited"] += 1
+                raise CircuitOpenError(self.name, max(1, math.ceil(remaining)))
+            self.state = "half_open"
+            self._probe_started_at = None
+
+        if self.state == "half_open":
+            # One probe at a time; an abandoned probe is replaced after the open period
+            if (
+                self._probe_started_at is not None
+                and now - self._probe_started_at < settings.UPSTREAM_CIRCUIT_OPEN_SECONDS
+            ):
+                self._stats["short_circuited"] += 1
+                raise CircuitOpenError(self.name, 1)
+            self._probe_started_at = now
+
+    def record_success(self) -> None:
+        """Record a healthy response."""
+        self.failures = 0
+        if self.state != "closed":
+            logger.info(f"{self.name} circuit closed")
+            self.state = "closed"
+
+    def record_failure(self) -> None:
+        """Record a failed attempt, opening the circuit at the threshold."""
+        self.failures += 1
+        if self.state == "half_open" or (
+            self.state == "closed" and self.failures >= settings.UPSTREAM_CIRCUIT_FAILURE_THRESHOLD
+        ):
+            logger.warning(f"{self.name} circuit opened after {self.failures} consecutive failures")
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._stats["opened"] += 1
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "state": self.state, "consecutive_failures": self.failures}
+
+
+def retry_delay(retry: int) -> float:
+    """Full-jitter exponential backoff in seconds for the given retry (1-based)."""
+    ceiling = min(settings.UPSTREAM_RETRY_BACKOFF_MAX_MS, settings.UPSTREAM_RETRY_BACKOFF_MS * 2 ** (retry - 1))
+    return random.uniform(0, ceiling) / 1000
+
+
+class UpstreamGuard:
+    """Circuit breaker, concurrency limit, retries and hedging for one upstream."""
+
+    def __init__(self, name: str, limiter: AdaptiveLimiter):
+        self.name = name
+        self.limiter = limiter
+        self.breaker = CircuitBreaker(name)
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._stats = {"calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+
+    @asynccontextmanager
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]]) -> AsyncIterator[httpx.Response]:
+        """
+        Make one logical upstream request.
+
+        Args:
+            send: Sends a fresh request and returns the response with its body
+                unread (client.send(request, stream=True)); called once per attempt
+
+        Yields:
+            The response (possibly an error status); it is closed on exit
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            UpstreamSaturatedError: If no concurrency slot frees up in time
+            httpx.HTTPError: If every attempt failed
+        """
+        self.breaker.check()
+        self._stats["calls"] += 1
+
+        async with self.limiter.slot() as slot:
+            response = await self._send_with_retries(send)
+            slot.record(response.status_code)
+            try:
+                yield response
+            finally:
+                await response.aclose()
+
+    async def _send_with_retries(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        retries = settings.UPSTREAM_MAX_RETRIES
+
+        for attempt in range(retries + 1):
+            if attempt:
+                self._stats["retries"] += 1
+                await asyncio.sleep(retry_delay(attempt))
+                self.breaker.check()
+
+            try:
+                response = await self._send_hedged(send)
+            except RETRYABLE_ERRORS as e:
+                self._failure()
+                if attempt == retries:
+                    raise
+                logger.warning(f"{self.name} attempt {attempt + 1} failed ({type(e).__name__}); retrying")
+                continue
+            except httpx.TransportError:
+                self._failure()
+                raise
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                self._failure()
+                if attempt == retries:
+                    return response
+                logger.warning(f"{self.name} attempt {attempt + 1} returned {response.status_code}; retrying")
+                await response.aclose()
+                continue
+
+            # Other 5xx responses are not retried but still count against the breaker
+            if response.status_code >= 500:
+                self._failure()
+            else:
+                self.breaker.record_success()
+            return response
+
+    async def _send_hedged(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        delay = self.hedge_delay()
+        first = asyncio.create_task(self._timed_send(send))
+        tasks = {first}
+
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self._stats["hedges"] += 1
+                    tasks.add(asyncio.create_task(self._timed_send(send)))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is not first:
+                        self._stats["hedge_wins"] += 1
+                    response, latency = task.result()
+                    self._latencies.append(latency)
+                    # Close any other response that finished in the same step
+                    for other in done - {task}:
+                        if other.exception() is None:
+                            await other.result()[0].aclose()
+                    return response
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            for task in tasks:
+                try:
+                    response, _ = await task
+                    await response.aclose()
+                except BaseException:
+                    pass
+
+    async def _timed_send(self, send: Callable[[], Awaitable[httpx.Response]]) -> tuple[httpx.Response, float]:
+        self._stats["attempts"] += 1
+        started = time.monotonic()
+        try:
+            response = await send()
+        except Exception:
+            UPSTREAM_LATENCY.labels(self.name, "error").observe(time.monotonic() - started)
+            raise
+        latency = time.monotonic() - started
+        UPSTREAM_LATENCY.labels(self.name, response.status_code).observe(latency)
+        return response, latency
+
+    def _failure(self) -> None:
+        self._stats["failures"] += 1
+        self.breaker.record_failure()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds before a hedge is sent (recent p95 latency), or None if hedging is off."""
+        if not settings.UPSTREAM_HEDGING_ENABLED or len(self._latencies) < settings.UPSTREAM_HEDGE_MIN_SAMPLES:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def get_stats(self) -> dict:
+        """
+        Get resilience counters.
+
+        Returns:
+            Dict with call/attempt/retry/hedge counters, the hedge delay and circuit state
+        """
+        delay = self.hedge_delay()
+        return {
+            **self._stats,
+            "hedge_delay_seconds": round(delay, 3) if delay is not None else None,
+            "circuit": self.breaker.get_stats(),
+        }
+
+
+# Global upstream guard instances
+askatt_upstream = UpstreamGuard("AskAT&T", askatt_limiter)
+askdocs_upstream = UpstreamGuard("AskDocs", askdocs_limiter)
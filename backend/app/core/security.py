@@ -8,7 +8,9 @@ from app.config import settings
 from typing import Optional
 
 # Password hashing context with bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with a different cost than BCRYPT_ROUNDS are reported by
+# verify_and_update() so they can be rehashed on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -25,6 +27,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its cost factor is outdated.
+
+    Args:
+        plain_password: Plain text password from user
+        hashed_password: Bcrypt hashed password from database
+
+    Returns:
+        Tuple of (matches, new_hash); new_hash is None unless the password
+        matched and the stored hash should be replaced
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """
     Hash a password using bcrypt.
@@ -5,18 +5,27 @@ Uses async SQLAlchemy 2.0 with PostgreSQL.
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from app.config import settings
+from app.core.query_profiler import instrument_engine
 
 
+# Pool sizing applies to server databases; SQLite (benchmarks, local runs) uses its default pool
+_pool_options = {} if settings.DATABASE_URL.startswith("sqlite") else {
+    "pool_size": 20,  # Maximum number of connections in pool
+    "max_overflow": 10,  # Maximum overflow connections
+}
+
 # Create async engine with connection pooling
 engine = create_async_engine(
     settings.DATABASE_URL,
-    pool_size=20,  # Maximum number of connections in pool
-    max_overflow=10,  # Maximum overflow connections
     pool_pre_ping=True,  # Verify connections before using
     pool_recycle=3600,  # Recycle connections every hour
-    echo=settings.DEBUG  # Log SQL queries in debug mode
+    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    **_pool_options
 )
 
+# Per-request query counts, slow-query log and /metrics statement timings
+instrument_engine(engine.sync_engine)
+
 # Create async session factory
 # CRITICAL: expire_on_commit=False prevents greenlet errors in async
 async_session_factory = async_sessionmaker(
@@ -3,7 +3,7 @@ FastAPI main application with CORS, middleware, and all API routes.
 """
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
 import logging
@@ -11,6 +11,27 @@ import time
 
 from app.config import settings
 from app.database import engine
+from app.core.http_client import upstream_clients
+from app.core.principal import principal_cache
+from app.core.access_index import configuration_access
+from app.core.concurrency import askatt_limiter, askdocs_limiter
+from app.core.resilience import askatt_upstream, askdocs_upstream
+from app.core.passwords import password_hasher
+from app.core.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    REQUEST_LATENCY,
+    metrics,
+    route_label,
+)
+from app.core.query_profiler import RequestDbStats, check_request_query_count, request_db_stats
+from app.services.azure_ad import azure_token_manager
+from app.services.persistence import message_queue
+from app.services.history_cache import history_cache
+from app.services.configuration_catalog import configuration_catalog
+from app.services.answer_cache import answer_cache
+from app.services.single_flight import askdocs_flights
 from app.models import Base  # Import Base to ensure all models are registered
 from app.api.v1 import api_router
 
@@ -29,9 +50,15 @@ async def lifespan(app: FastAPI):
 
     On startup:
     - Creates database tables (if they don't exist)
+    - Creates pooled upstream HTTP clients
+    - Starts the write-behind message queue
     - Logs startup message
 
     On shutdown:
+    - Drains the write-behind message queue
+    - Closes the history cache backend
+    - Stops the password hashing threads
+    - Closes upstream HTTP connections
     - Closes database connections
     """
     # Startup
@@ -46,10 +73,30 @@ async def lifespan(app: FastAPI):
             await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created successfully")
 
+    # Shared upstream HTTP pools (reused across chat turns)
+    upstream_clients.open([
+        settings.AZURE_AUTH_URL,
+        settings.ASKATT_API_BASE_URL_STAGE,
+        settings.ASKATT_API_BASE_URL_PRODUCTION,
+        settings.ASKDOCS_API_BASE_URL_STAGE,
+        settings.ASKDOCS_API_BASE_URL_PRODUCTION,
+        settings.ASKDOCS_CONFIG_API_STAGE,
+        settings.ASKDOCS_CONFIG_API_PRODUCTION,
+    ])
+
+    # Batched message writes off the response path
+    if settings.PERSIST_WRITE_BEHIND_ENABLED:
+        message_queue.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    await message_queue.stop()
+    await history_cache.aclose()
+    password_hasher.shutdown()
+    await upstream_clients.aclose()
+    logger.info("Upstream HTTP connections closed")
     await engine.dispose()
     logger.info("Database connections closed")
 
@@ -90,28 +137,57 @@ app.add_middleware(
 async def log_requests(request: Request, call_next):
     """
     Log all HTTP requests with timing information.
+
+    Also records request latency and per-request DB query metrics, labelled
+    by route template (e.g. /api/v1/chat/conversations/{conversation_id})
+    so label cardinality stays bounded, and reports the request's SQL
+    statements in X-DB-Query-Count / X-DB-Query-Time.
     """
     start_time = time.time()
 
     # Log request
     logger.info(f"→ {request.method} {request.url.path}")
 
+    # Statements run while handling (and streaming) this request count toward it
+    db_stats = RequestDbStats(request.scope)
+    request_db_stats.set(db_stats)
+
     # Process request
     response = await call_next(request)
 
     # Log response with timing
-    process_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    elapsed = time.time() - start_time
+    process_time = elapsed * 1000  # Convert to milliseconds
     logger.info(
         f"← {request.method} {request.url.path} "
         f"[{response.status_code}] {process_time:.2f}ms"
     )
 
-    # Add custom header with processing time
+    # Add custom headers with processing time and SQL statements so far
     response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
+    if settings.DB_QUERY_HEADERS_ENABLED:
+        response.headers["X-DB-Query-Count"] = str(db_stats.queries)
+        response.headers["X-DB-Query-Time"] = f"{db_stats.seconds * 1000:.2f}ms"
+
+    if settings.METRICS_ENABLED:
+        REQUEST_LATENCY.labels(request.method, route_label(request.scope), response.status_code).observe(elapsed)
+    response.body_iterator = _finish_db_stats(response.body_iterator, request.method, db_stats)
 
     return response
 
 
+async def _finish_db_stats(body_iterator, method: str, db_stats: RequestDbStats):
+    """Pass the response body through, then record the request's DB totals."""
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        check_request_query_count(method, db_stats)
+        if settings.METRICS_ENABLED:
+            DB_QUERIES_PER_REQUEST.labels(db_stats.route).observe(db_stats.queries)
+            DB_TIME_PER_REQUEST.labels(db_stats.route).observe(db_stats.seconds)
+
+
 # Exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -151,16 +227,103 @@ async def health_check():
     """
     Health check endpoint for monitoring and load balancers.
 
-    Returns application status and version.
+    Returns application status, version, Azure AD token cache, write-behind
+    message queue, history cache, principal cache, configuration access
+    index, configuration catalog and password hashing pool counters.
     """
     return {
         "status": "healthy",
         "service": "AI Chat Application API",
         "version": "1.0.0",
-        "environment": "development" if settings.DEBUG else "production"
+        "environment": "development" if settings.DEBUG else "production",
+        "token_cache": azure_token_manager.get_stats(),
+        "message_queue": message_queue.get_stats(),
+        "history_cache": history_cache.get_stats(),
+        "principal_cache": principal_cache.get_stats(),
+        "configuration_access": configuration_access.get_stats(),
+        "configuration_catalog": configuration_catalog.get_stats(),
+        "answer_cache": answer_cache.get_stats(),
+        "askdocs_coalescing": askdocs_flights.get_stats(),
+        "upstream_limits": {
+            "askatt": askatt_limiter.get_stats(),
+            "askdocs": askdocs_limiter.get_stats(),
+        },
+        "upstream_resilience": {
+            "askatt": askatt_upstream.get_stats(),
+            "askdocs": askdocs_upstream.get_stats(),
+        },
+        "password_hashing": password_hasher.get_stats()
     }
 
 
+def _token_cache_samples():
+    stats = azure_token_manager.get_stats()
+    return [((name,), stats[name]) for name in ("hits", "misses", "refreshes", "errors")]
+
+
+def _pool_samples():
+    # Only QueuePool reports sizes; SQLite's static/null pools are skipped
+    pool = engine.sync_engine.pool
+    samples = []
+    for state in ("size", "checkedout", "overflow", "checkedin"):
+        reader = getattr(pool, state, None)
+        if reader is not None:
+            samples.append(((state,), reader()))
+    return samples
+
+
+def _limiter_samples(attribute: str):
+    return lambda: [
+        ((limiter.name,), getattr(limiter, attribute))
+        for limiter in (askatt_limiter, askdocs_limiter)
+    ]
+
+
+metrics.callback(
+    "azure_token_cache_events_total",
+    "Azure AD token cache lookups and refreshes",
+    _token_cache_samples,
+    ("event",),
+    kind="counter",
+)
+metrics.callback(
+    "azure_token_cache_hit_ratio",
+    "Share of token lookups served from the cache",
+    lambda: [((), azure_token_manager.get_stats()["hit_ratio"])],
+)
+metrics.callback(
+    "db_pool_connections",
+    "Database pool connections by state (checkedout near size + max overflow means saturation)",
+    _pool_samples,
+    ("state",),
+)
+metrics.callback(
+    "upstream_concurrency_limit",
+    "Current adaptive concurrency limit per upstream",
+    _limiter_samples("limit"),
+    ("service",),
+)
+metrics.callback(
+    "upstream_in_flight",
+    "Upstream calls holding a concurrency slot",
+    _limiter_samples("in_flight"),
+    ("service",),
+)
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Prometheus scrape endpoint (text exposition format 0.0.4).
+
+    Values are per worker process.
+    """
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": "Not Found"})
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 # Include API v1 routes
 app.include_router(api_router, prefix="/api")
 
@@ -6,7 +6,7 @@ from app.database import Base
 from app.models.user import User, Role, user_roles
 from app.models.domain import Domain, Configuration, role_configuration_access
 from app.models.conversation import Conversation, Message
-from app.models.feedback import Feedback, TokenUsageLog
+from app.models.feedback import Feedback, TokenUsageLog, UsageDailyRollup
 
 # Import for event listener
 from sqlalchemy import event
@@ -28,11 +28,19 @@ def apply_role_based_filtering(execute_state):
     ADMIN users bypass filtering. Other users only see configurations their roles have access to.
 
     CRITICAL: This implements the PRP requirement for role-based filtering at database query level.
+
+    Request handlers normally authorize through the in-memory access index
+    (app.core.access_index) and mark those queries with the execution option
+    `skip_role_filter=True`; this filter remains the fallback for every other query.
     """
     # Skip filtering for relationship/column loads
     if execute_state.is_column_load or execute_state.is_relationship_load:
         return
 
+    # Already restricted through the access index
+    if execute_state.execution_options.get("skip_role_filter"):
+        return
+
     # Get current user's roles from context
     roles = current_user_roles.get()
 
@@ -64,5 +72,6 @@ __all__ = [
     "Message",
     "Feedback",
     "TokenUsageLog",
+    "UsageDailyRollup",
     "current_user_roles",
 ]
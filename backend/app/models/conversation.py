@@ -2,9 +2,8 @@
 Conversation and Message models for chat history tracking.
 Stores conversations with full context (service, domain, config, environment).
 """
-from uuid import uuid4
-from sqlalchemy import String, Text, Integer, ForeignKey, DateTime, JSON, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from uuid import UUID, uuid4
+from sqlalchemy import String, Text, Integer, ForeignKey, DateTime, JSON, Boolean, Index, Uuid, DDL, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.database import Base
@@ -13,8 +12,12 @@ from app.database import Base
 class Conversation(Base):
     """Conversation model tracking chat sessions."""
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Keyset pagination of a user's conversation list (updated_at, id)
+        Index("ix_conversations_user_updated_id", "user_id", "updated_at", "id"),
+    )
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     service_type: Mapped[str] = mapped_column(String(20), index=True)  # askatt or askdocs
     domain_id: Mapped[UUID | None] = mapped_column(ForeignKey("domains.id"), nullable=True)
@@ -25,11 +28,13 @@ class Conversation(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Relationships
+    # Relationships (lazy="raise"; history is read with explicit Message queries)
+    # passive_deletes: messages go with the row via ON DELETE CASCADE, not by loading them
     messages: Mapped[list["Message"]] = relationship(
         back_populates="conversation",
-        lazy="selectin",
-        cascade="all, delete-orphan"
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -39,8 +44,12 @@ class Conversation(Base):
 class Message(Base):
     """Message model storing individual chat messages."""
     __tablename__ = "messages"
+    __table_args__ = (
+        # Latest-N history window: WHERE conversation_id = ? ORDER BY created_at DESC LIMIT N
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+    )
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
     conversation_id: Mapped[UUID] = mapped_column(ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False, index=True)
     role: Mapped[str] = mapped_column(String(20), index=True)  # user, assistant, system
     content: Mapped[str] = mapped_column(Text, nullable=False)
@@ -49,7 +58,63 @@ class Message(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
 
     # Relationships
-    conversation: Mapped[Conversation] = relationship(back_populates="messages")
+    conversation: Mapped[Conversation] = relationship(back_populates="messages", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<Message(id={self.id}, role={self.role}, content={self.content[:50]}...)>"
+
+
+# Full-text search (see app.services.search).
+# PostgreSQL: a stored tsvector column per searchable table, with a GIN index.
+# The columns are generated by the database and deliberately not mapped, so
+# the ORM never reads or writes them.
+# SQLite (tests): external-content FTS5 tables kept in sync by triggers.
+SEARCH_TEXT_CONFIG = "english"
+
+_SEARCH_DDL = {
+    "postgresql": [
+        DDL(
+            "ALTER TABLE messages ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_TEXT_CONFIG}', content)) STORED"
+        ),
+        DDL("CREATE INDEX ix_messages_search_vector ON messages USING gin (search_vector)"),
+        DDL(
+            "ALTER TABLE conversations ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(title, ''))) STORED"
+        ),
+        DDL("CREATE INDEX ix_conversations_search_vector ON conversations USING gin (search_vector)"),
+    ],
+    "sqlite": [
+        DDL(
+            "CREATE VIRTUAL TABLE {table}_fts USING fts5("
+            "{column}, content='{table}', content_rowid='rowid', tokenize='porter unicode61')".format(
+                table=table, column=column
+            )
+        )
+        for table, column in (("messages", "content"), ("conversations", "title"))
+    ] + [
+        DDL(trigger.format(table=table, column=column))
+        for table, column in (("messages", "content"), ("conversations", "title"))
+        for trigger in (
+            "CREATE TRIGGER {table}_fts_insert AFTER INSERT ON {table} BEGIN "
+            "INSERT INTO {table}_fts (rowid, {column}) VALUES (new.rowid, new.{column}); END",
+            "CREATE TRIGGER {table}_fts_delete AFTER DELETE ON {table} BEGIN "
+            "INSERT INTO {table}_fts ({table}_fts, rowid, {column}) VALUES ('delete', old.rowid, old.{column}); END",
+            "CREATE TRIGGER {table}_fts_update AFTER UPDATE OF {column} ON {table} BEGIN "
+            "INSERT INTO {table}_fts ({table}_fts, rowid, {column}) VALUES ('delete', old.rowid, old.{column}); "
+            "INSERT INTO {table}_fts (rowid, {column}) VALUES (new.rowid, new.{column}); END",
+        )
+    ],
+}
+
+for _dialect, _statements in _SEARCH_DDL.items():
+    for _statement in _statements:
+        # Both tables exist once messages (which references conversations) is created
+        event.listen(Message.__table__, "after_create", _statement.execute_if(dialect=_dialect))
+
+for _table in ("messages", "conversations"):
+    event.listen(
+        Message.__table__,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {_table}_fts").execute_if(dialect="sqlite")
+    )
@@ -2,10 +2,9 @@
 Domain and Configuration models for AskDocs integration.
 Implements configuration access control via many-to-many with roles.
 """
-from uuid import uuid4
+from uuid import UUID, uuid4
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Table, Column, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Table, Column, JSON, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.database import Base
@@ -19,10 +18,10 @@ if TYPE_CHECKING:
 role_configuration_access = Table(
     "role_configuration_access",
     Base.metadata,
-    Column("id", UUID(as_uuid=True), primary_key=True, default=uuid4),
+    Column("id", Uuid, primary_key=True, default=uuid4),
     Column("role_id", ForeignKey("roles.id", ondelete="CASCADE"), nullable=False),
     Column("configuration_id", ForeignKey("configurations.id", ondelete="CASCADE"), nullable=False),
-    Column("granted_by", UUID(as_uuid=True), ForeignKey("users.id"), nullable=True),  # Admin who granted
+    Column("granted_by", Uuid, ForeignKey("users.id"), nullable=True),  # Admin who granted
     Column("granted_at", DateTime, default=datetime.utcnow)
 )
 
@@ -31,17 +30,17 @@ class Domain(Base):
     """Domain model representing AskDocs knowledge domains."""
     __tablename__ = "domains"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
     domain_key: Mapped[str] = mapped_column(String(100), unique=True, nullable=False, index=True)
     display_name: Mapped[str] = mapped_column(String(255))
     description: Mapped[str | None] = mapped_column(String(500), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    # Relationships
+    # Relationships (lazy="raise"; load with selectinload() where needed)
     configurations: Mapped[list["Configuration"]] = relationship(
         back_populates="domain",
-        lazy="selectin"
+        lazy="raise"
     )
 
     def __repr__(self) -> str:
@@ -52,7 +51,7 @@ class Configuration(Base):
     """Configuration model representing specific versions/configs within a domain."""
     __tablename__ = "configurations"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
     domain_id: Mapped[UUID] = mapped_column(ForeignKey("domains.id"), nullable=False)
     config_key: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     display_name: Mapped[str] = mapped_column(String(255))
@@ -62,13 +61,13 @@ class Configuration(Base):
     metadata_: Mapped[dict | None] = mapped_column("metadata", JSON, nullable=True)  # Additional config settings
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    # Relationships
-    domain: Mapped[Domain] = relationship(back_populates="configurations", lazy="selectin")
+    # Relationships (lazy="raise"; load with selectinload() where needed)
+    domain: Mapped[Domain] = relationship(back_populates="configurations", lazy="raise")
 
     roles: Mapped[list["Role"]] = relationship(
         secondary=role_configuration_access,
         back_populates="configurations",
-        lazy="selectin"
+        lazy="raise"
     )
 
     def __repr__(self) -> str:
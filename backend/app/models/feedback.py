@@ -1,11 +1,10 @@
 """
-Feedback and TokenUsageLog models for quality tracking and cost analysis.
+Feedback, TokenUsageLog and UsageDailyRollup models for quality tracking and cost analysis.
 """
-from uuid import uuid4
-from sqlalchemy import String, Text, Integer, ForeignKey, DateTime, Numeric, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from uuid import UUID, uuid4
+from sqlalchemy import String, Text, Integer, ForeignKey, DateTime, Date, Numeric, CheckConstraint, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
-from datetime import datetime
+from datetime import date, datetime
 from app.database import Base
 
 
@@ -13,7 +12,7 @@ class Feedback(Base):
     """Feedback model for per-message quality ratings."""
     __tablename__ = "feedback"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     conversation_id: Mapped[UUID] = mapped_column(ForeignKey("conversations.id"), nullable=False, index=True)
     message_id: Mapped[UUID] = mapped_column(ForeignKey("messages.id"), nullable=False, index=True)
@@ -40,11 +39,12 @@ class TokenUsageLog(Base):
     """Token usage log for cost tracking (backend only, not user-facing)."""
     __tablename__ = "token_usage_log"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     conversation_id: Mapped[UUID] = mapped_column(ForeignKey("conversations.id"), nullable=False, index=True)
     message_id: Mapped[UUID] = mapped_column(ForeignKey("messages.id"), nullable=False, index=True)
     service_type: Mapped[str] = mapped_column(String(20), index=True)  # askatt or askdocs
+    configuration_id: Mapped[UUID | None] = mapped_column(ForeignKey("configurations.id"), nullable=True)  # AskDocs only
     model_name: Mapped[str] = mapped_column(String(100))  # gpt-4o, gpt-3.5-turbo, etc.
     prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
     completion_tokens: Mapped[int] = mapped_column(Integer, default=0)
@@ -54,3 +54,30 @@ class TokenUsageLog(Base):
 
     def __repr__(self) -> str:
         return f"<TokenUsageLog(id={self.id}, model={self.model_name}, total_tokens={self.total_tokens})>"
+
+
+class UsageDailyRollup(Base):
+    """
+    Daily usage totals per user, service, configuration and model.
+
+    Maintained incrementally in the same transaction as the token usage log
+    (see app.services.usage). The id is derived from the grouping key, so
+    increments are upserts on the primary key.
+    """
+    __tablename__ = "usage_daily_rollups"
+
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True)  # uuid5 of (day, user, service, configuration, model)
+    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)  # UTC
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    service_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    configuration_id: Mapped[UUID | None] = mapped_column(ForeignKey("configurations.id"), nullable=True)
+    model_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    conversation_count: Mapped[int] = mapped_column(Integer, default=0)  # Conversations started
+    message_count: Mapped[int] = mapped_column(Integer, default=0)  # User prompts and assistant replies
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    total_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<UsageDailyRollup(day={self.day}, user_id={self.user_id}, total_tokens={self.total_tokens})>"
@@ -2,10 +2,9 @@
 User and Role models with many-to-many relationship.
 Implements role-based access control (RBAC).
 """
-from uuid import uuid4
+from uuid import UUID, uuid4
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Table, Column
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Table, Column, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.database import Base
@@ -18,11 +17,11 @@ if TYPE_CHECKING:
 user_roles = Table(
     "user_roles",
     Base.metadata,
-    Column("id", UUID(as_uuid=True), primary_key=True, default=uuid4),
+    Column("id", Uuid, primary_key=True, default=uuid4),
     Column("user_id", ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
     Column("role_id", ForeignKey("roles.id", ondelete="CASCADE"), nullable=False),
     Column("assigned_at", DateTime, default=datetime.utcnow),
-    Column("assigned_by", UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # Admin who assigned
+    Column("assigned_by", Uuid, ForeignKey("users.id"), nullable=True)  # Admin who assigned
 )
 
 
@@ -30,7 +29,7 @@ class User(Base):
     """User model with AT&T ID authentication."""
     __tablename__ = "users"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
     attid: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -40,14 +39,16 @@ class User(Base):
     updated_at: Mapped[datetime | None] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
-    # Relationships with lazy="selectin" for async - CRITICAL to prevent greenlet errors
+    # Relationships are lazy="raise": implicit loads would fail under async anyway,
+    # and eager defaults cascaded User -> roles -> every user in those roles.
+    # Queries that need a relationship ask for it with selectinload().
     # Specify primaryjoin to disambiguate which user_id to use (user_id, not assigned_by)
     roles: Mapped[list["Role"]] = relationship(
         secondary=user_roles,
         primaryjoin="User.id == user_roles.c.user_id",
         secondaryjoin="Role.id == user_roles.c.role_id",
         back_populates="users",
-        lazy="selectin"  # CRITICAL: loads eagerly to avoid async issues
+        lazy="raise"
     )
 
     def __repr__(self) -> str:
@@ -58,26 +59,26 @@ class Role(Base):
     """Role model for role-based access control."""
     __tablename__ = "roles"
 
-    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
     display_name: Mapped[str] = mapped_column(String(100))
     description: Mapped[str | None] = mapped_column(String(500), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    # Relationships with lazy="selectin" for async
+    # Relationships (lazy="raise"; load with selectinload() where needed)
     # Specify primaryjoin to disambiguate which user_id to use (user_id, not assigned_by)
     users: Mapped[list[User]] = relationship(
         secondary=user_roles,
         primaryjoin="Role.id == user_roles.c.role_id",
         secondaryjoin="User.id == user_roles.c.user_id",
         back_populates="roles",
-        lazy="selectin"
+        lazy="raise"
     )
 
     configurations: Mapped[list["Configuration"]] = relationship(
         secondary="role_configuration_access",
         back_populates="roles",
-        lazy="selectin"
+        lazy="raise"
     )
 
     def __repr__(self) -> str:
@@ -78,6 +78,21 @@ class ConversationListItem(BaseModel):
         from_attributes = True
 
 
+class SearchResult(BaseModel):
+    """Full-text search hit (message_id is null when the conversation title matched)."""
+    conversation_id: UUID
+    conversation_title: Optional[str] = None
+    service_type: str
+    message_id: Optional[UUID] = None
+    role: Optional[str] = None
+    snippet: str
+    rank: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class FeedbackRequest(BaseModel):
     """User feedback on a message."""
     rating: int = Field(..., ge=1, le=5, description="Rating 1-5")
@@ -0,0 +1,290 @@
+"""
+Answer cache for repeated AskDocs questions.
+
+Many users ask the same standalone question ("how do I reset my password")
+against the same configuration. A completed answer is kept, with its
+sources, under (configuration id, normalized question) and replayed through
+the normal SSE path instead of another RAG round-trip.
+
+Only questions asked without conversation history are cached or served:
+a follow-up's answer depends on the earlier turns.
+
+Near-duplicate matching (ANSWER_CACHE_NEAR_DUPLICATES) compares 64-bit
+SimHash fingerprints of the normalized question's words and word pairs.
+Fingerprints are split into ANSWER_CACHE_MAX_DISTANCE + 1 bands; any two
+fingerprints within that Hamming distance share at least one band exactly,
+so a lookup only checks entries indexed under the question's own bands.
+
+The cache is per process, bounded by ANSWER_CACHE_MAX_ENTRIES (least
+recently used first) and ANSWER_CACHE_TTL_SECONDS.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Optional
+from uuid import UUID
+import hashlib
+import re
+import time
+import unicodedata
+
+from app.config import settings
+from app.services.stream_events import (
+    EndEvent,
+    MessageAccumulator,
+    SourcesEvent,
+    StreamEvent,
+    TokenEvent,
+    UsageEvent,
+)
+
+SIMHASH_BITS = 64
+
+_WORD_RE = re.compile(r"\w+")
+
+# A replayed answer costs no upstream tokens
+CACHED_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+
+def normalize_question(question: str) -> str:
+    """Casefold, strip punctuation and collapse whitespace."""
+    return " ".join(_WORD_RE.findall(unicodedata.normalize("NFKC", question).casefold()))
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash of a normalized question (words and adjacent word pairs).
+
+    Args:
+        text: Output of normalize_question()
+
+    Returns:
+        Fingerprint as an unsigned int
+    """
+    words = text.split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _bands(fingerprint: int, count: int) -> list[tuple[int, int]]:
+    """Split a fingerprint into count (band number, band value) pairs."""
+    bounds = [SIMHASH_BITS * i // count for i in range(count + 1)]
+    return [
+        (i, fingerprint >> low & ((1 << (high - low)) - 1))
+        for i, (low, high) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+
+@dataclass
+class CachedAnswer:
+    """A completed AskDocs answer."""
+    answer: str
+    sources: Optional[list[dict]]
+    cached_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass(slots=True)
+class AnswerCacheHit:
+    """A cached answer and how it matched the question."""
+    entry: CachedAnswer
+    match: str  # "exact" or "near"
+    distance: int = 0
+
+    def metadata(self) -> dict:
+        """Message metadata recording the hit."""
+        return {
+            "hit": True,
+            "match": self.match,
+            "distance": self.distance,
+            "cached_at": self.entry.cached_at.isoformat(),
+        }
+
+
+@dataclass(slots=True)
+class _Entry:
+    answer: CachedAnswer
+    fingerprint: int
+    expires_at: float
+
+
+class AnswerCache:
+    """Per-process LRU of AskDocs answers keyed by (configuration id, normalized question)."""
+
+    def __init__(self):
+        self._entries: OrderedDict[tuple[UUID, str], _Entry] = OrderedDict()
+        self._bands: dict[tuple[UUID, int, int], set[tuple[UUID, str]]] = {}
+        self._stats = {"hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, configuration_id: UUID, question: str) -> Optional[AnswerCacheHit]:
+        """
+        Look up a cached answer.
+
+        Args:
+            configuration_id: AskDocs configuration
+            question: The user's question, as typed
+
+        Returns:
+            AnswerCacheHit, or None on a miss
+        """
+        if not settings.ANSWER_CACHE_ENABLED:
+            return None
+
+        text = normalize_question(question)
+        key = (configuration_id, text)
+
+        entry = self._live(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return AnswerCacheHit(entry=entry.answer, match="exact")
+
+        if settings.ANSWER_CACHE_NEAR_DUPLICATES and text:
+            hit = self._nearest(configuration_id, simhash(text))
+            if hit is not None:
+                self._stats["near_hits"] += 1
+                return hit
+
+        self._stats["misses"] += 1
+        return None
+
+    def set(self, configuration_id: UUID, question: str, answer: CachedAnswer) -> None:
+        """
+        Store a completed answer.
+
+        Args:
+            configuration_id: AskDocs configuration
+            question: The user's question, as typed
+            answer: Answer text and sources
+        """
+        if not settings.ANSWER_CACHE_ENABLED:
+            return
+
+        text = normalize_question(question)
+        if not text:
+            return
+
+        key = (configuration_id, text)
+        self._remove(key)
+
+        fingerprint = simhash(text)
+        self._entries[key] = _Entry(
+            answer=answer,
+            fingerprint=fingerprint,
+            expires_at=time.monotonic() + settings.ANSWER_CACHE_TTL_SECONDS,
+        )
+        for band in _bands(fingerprint, self._band_count()):
+            self._bands.setdefault((configuration_id, *band), set()).add(key)
+        self._stats["stores"] += 1
+
+        while len(self._entries) > settings.ANSWER_CACHE_MAX_ENTRIES:
+            self._remove(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    async def record(
+        self,
+        configuration_id: UUID,
+        question: str,
+        events: AsyncIterator[StreamEvent]
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Pass an upstream stream through, storing the answer if it completes without error.
+
+        Args:
+            configuration_id: AskDocs configuration
+            question: The user's question, as typed
+            events: Live AskDocs stream
+
+        Yields:
+            The stream's events, unchanged
+        """
+        accumulator = MessageAccumulator()
+        async for event in events:
+            accumulator.add(event)
+            yield event
+
+        if accumulator.error is None and accumulator.content:
+            self.set(configuration_id, question, CachedAnswer(answer=accumulator.content, sources=accumulator.sources))
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        self._entries.clear()
+        self._bands.clear()
+
+    def _live(self, key: tuple[UUID, str]) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() >= entry.expires_at:
+            self._remove(key)
+            return None
+        return entry
+
+    def _nearest(self, configuration_id: UUID, fingerprint: int) -> Optional[AnswerCacheHit]:
+        candidates = set()
+        for band in _bands(fingerprint, self._band_count()):
+            candidates |= self._bands.get((configuration_id, *band), set())
+
+        best = None
+        for key in candidates:
+            entry = self._live(key)
+            if entry is None:
+                continue
+            distance = (entry.fingerprint ^ fingerprint).bit_count()
+            if distance <= settings.ANSWER_CACHE_MAX_DISTANCE and (best is None or distance < best[0]):
+                best = (distance, key, entry)
+
+        if best is None:
+            return None
+
+        distance, key, entry = best
+        self._entries.move_to_end(key)
+        return AnswerCacheHit(entry=entry.answer, match="near", distance=distance)
+
+    def _band_count(self) -> int:
+        return max(1, min(settings.ANSWER_CACHE_MAX_DISTANCE + 1, SIMHASH_BITS))
+
+    def _remove(self, key: tuple[UUID, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in _bands(entry.fingerprint, self._band_count()):
+            keys = self._bands.get((key[0], *band))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._bands[(key[0], *band)]
+
+    def get_stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with hits, near_hits, misses, stores, evictions and entries
+        """
+        return {**self._stats, "entries": len(self._entries)}
+
+
+async def replay_answer(hit: AnswerCacheHit) -> AsyncGenerator[StreamEvent, None]:
+    """
+    Replay a cached answer as the events a live AskDocs stream would send.
+
+    Args:
+        hit: Cache hit from AnswerCache.get()
+
+    Yields:
+        Stream events (token, sources, usage, end)
+    """
+    yield TokenEvent(hit.entry.answer)
+    if hit.entry.sources:
+        yield SourcesEvent(hit.entry.sources)
+    yield UsageEvent(dict(CACHED_USAGE))
+    yield EndEvent()
+
+
+# Global answer cache instance
+answer_cache = AnswerCache()
@@ -3,36 +3,187 @@ AskAT&T API service using real Azure AD authentication and API format.
 """
 import httpx
 import json
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterator, Optional
 from app.config import settings
+from app.core.concurrency import UpstreamSaturatedError
+from app.core.resilience import CircuitOpenError, askatt_upstream
+from app.core.http_client import get_upstream_client, upstream_timeout
 from app.services.azure_ad import get_askatt_token
+from app.services.stream_events import (
+    StreamEvent,
+    TokenEvent,
+    UsageEvent,
+    ErrorEvent,
+    EndEvent,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _usage_data(token_usage: dict) -> dict:
+    """Normalize a token usage dict to prompt/completion/total counts."""
+    return {
+        "prompt_tokens": token_usage.get("prompt_tokens", 0),
+        "completion_tokens": token_usage.get("completion_tokens", 0),
+        "total_tokens": token_usage.get("total_tokens", 0)
+    }
+
+
+def _replay_buffered_result(result: dict) -> Iterator[StreamEvent]:
+    """
+    Replay a complete (non-streamed) API response as stream events.
+
+    Args:
+        result: Parsed JSON response body
+
+    Yields:
+        Token, usage or error events
+    """
+    logger.debug(f"Response: {json.dumps(result, indent=2)}")
+
+    # Extract the assistant's response
+    # Real API format: {"status": "success", "modelResult": {"content": "...", "response_metadata": {...}}}
+    assistant_message = None
+
+    # Try new format first (real API)
+    if "status" in result and result["status"] == "success" and "modelResult" in result:
+        assistant_message = result["modelResult"].get("content", "")
+
+        # The full answer is already here; send it as one token event
+        yield TokenEvent(assistant_message)
+
+        # Send usage information if available
+        if "response_metadata" in result["modelResult"]:
+            token_usage = result["modelResult"]["response_metadata"].get("token_usage", {})
+            yield UsageEvent(_usage_data(token_usage))
+
+    # Try old format (OpenAI-like, for compatibility)
+    elif "choices" in result and len(result["choices"]) > 0:
+        assistant_message = result["choices"][0]["message"]["content"]
+
+        # The full answer is already here; send it as one token event
+        yield TokenEvent(assistant_message)
+
+        # Send usage information if available
+        if "usage" in result:
+            yield UsageEvent(_usage_data(result['usage']))
+
+    else:
+        # Handle unexpected response format
+        logger.warning(f"Unexpected API response format: {result}")
+        error_msg = result.get("error", {}).get("message", "Unexpected response format")
+        yield ErrorEvent(error_msg)
+
+
+def _parse_stream_chunk(chunk: dict) -> tuple[Optional[str], Optional[dict], Optional[str]]:
+    """
+    Extract the text delta, usage and error from one streamed chunk.
+
+    Supports the gateway format ({"modelResult": {"content": "..."}}) and the
+    OpenAI-like delta format ({"choices": [{"delta": {"content": "..."}}]}).
+
+    Args:
+        chunk: Parsed JSON chunk
+
+    Returns:
+        Tuple of (content delta, usage dict, error message), each possibly None
+    """
+    if "error" in chunk:
+        error = chunk["error"]
+        return None, None, error.get("message", "Upstream error") if isinstance(error, dict) else str(error)
+
+    content = None
+    usage = None
+
+    if "modelResult" in chunk:
+        model_result = chunk["modelResult"] or {}
+        content = model_result.get("content")
+        token_usage = (model_result.get("response_metadata") or {}).get("token_usage")
+        if token_usage:
+            usage = _usage_data(token_usage)
+
+    elif "choices" in chunk:
+        for choice in chunk["choices"]:
+            delta = choice.get("delta") or {}
+            if delta.get("content"):
+                content = (content or "") + delta["content"]
+
+    if chunk.get("usage"):
+        usage = _usage_data(chunk["usage"])
+
+    return content, usage, None
+
+
+async def _forward_stream(response: httpx.Response) -> AsyncGenerator[StreamEvent, None]:
+    """
+    Forward deltas from a streamed (SSE or NDJSON) response as they arrive.
+
+    Args:
+        response: Open streaming httpx response
+
+    Yields:
+        Token, usage or error events
+    """
+    usage_data = None
+
+    async for line in response.aiter_lines():
+        line = line.strip()
+
+        # Skip blank lines, SSE comments and non-data SSE fields
+        if not line or line.startswith(":") or line.startswith(("event:", "id:", "retry:")):
+            continue
+        if line.startswith("data:"):
+            line = line[5:].strip()
+        if line == "[DONE]":
+            break
+
+        try:
+            chunk = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping malformed stream chunk: {line[:200]}")
+            continue
+
+        content, usage, error = _parse_stream_chunk(chunk)
+
+        if error:
+            yield ErrorEvent(error)
+            return
+        if content:
+            yield TokenEvent(content)
+        if usage:
+            usage_data = usage
+
+    # Usage usually arrives on the last chunk; send it once at the end
+    if usage_data:
+        yield UsageEvent(usage_data)
+
+
 async def stream_askatt_chat(
     message: str,
     conversation_history: list[dict],
     environment: str = "production"
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[StreamEvent, None]:
     """
     Stream chat responses from AskAT&T API using real Azure AD authentication.
 
+    With ASKATT_STREAMING enabled the upstream's streamed deltas are forwarded
+    as they arrive; a complete JSON body is replayed as before.
+
     Args:
         message: User message
         conversation_history: Previous messages in the conversation
         environment: "stage" or "production"
 
     Yields:
-        SSE-formatted chunks with token, usage, or end events
+        Stream events: token, usage, end (or error)
     """
     # Get Azure AD access token
     try:
         access_token = await get_askatt_token(use_domain_scope=False)
     except Exception as e:
         logger.error(f"Failed to get Azure AD token: {str(e)}")
-        yield f"data: {json.dumps({'type': 'error', 'content': 'Authentication failed'})}\n\n"
+        yield ErrorEvent("Authentication failed")
         return
 
     # Select API URL based on environment
@@ -76,74 +227,64 @@ async def stream_askatt_chat(
         }
     }
 
+    # Ask the upstream to stream deltas (ignored by gateways that can't stream)
+    if settings.ASKATT_STREAMING:
+        payload["modelPayload"]["stream"] = True
+
     headers = {
         'Authorization': f'Bearer {access_token}',
         'Content-Type': 'application/json',
+        'Accept': 'text/event-stream, application/json' if settings.ASKATT_STREAMING else 'application/json',
     }
 
     logger.info(f"Calling AskAT&T API: {api_url}")
     logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
 
     try:
-        async with httpx.AsyncClient(verify=False, timeout=60.0) as client:
-            response = await client.post(api_url, headers=headers, json=payload)
+        client = get_upstream_client(api_url)
+
+        def send():
+            request = client.build_request(
+                "POST",
+                api_url,
+                headers=headers,
+                json=payload,
+                timeout=upstream_timeout(settings.ASKATT_TIMEOUT)
+            )
+            return client.send(request, stream=True)
+
+        # Retried / hedged until response headers arrive, before any token is sent
+        async with askatt_upstream.call(send) as response:
+            if response.is_error:
+                await response.aread()  # Needed for e.response.text in the error log
             response.raise_for_status()
 
-            result = response.json()
-            logger.info(f"AskAT&T API response received")
-            logger.debug(f"Response: {json.dumps(result, indent=2)}")
-
-            # Extract the assistant's response
-            # Real API format: {"status": "success", "modelResult": {"content": "...", "response_metadata": {...}}}
-            assistant_message = None
-
-            # Try new format first (real API)
-            if "status" in result and result["status"] == "success" and "modelResult" in result:
-                assistant_message = result["modelResult"].get("content", "")
-
-                # Stream the response token by token
-                for char in assistant_message:
-                    yield f"data: {json.dumps({'type': 'token', 'content': char})}\n\n"
-
-                # Send usage information if available
-                if "response_metadata" in result["modelResult"]:
-                    token_usage = result["modelResult"]["response_metadata"].get("token_usage", {})
-                    usage_data = {
-                        "prompt_tokens": token_usage.get("prompt_tokens", 0),
-                        "completion_tokens": token_usage.get("completion_tokens", 0),
-                        "total_tokens": token_usage.get("total_tokens", 0)
-                    }
-                    yield f"data: {json.dumps({'type': 'usage', 'usage': usage_data})}\n\n"
-
-            # Try old format (OpenAI-like, for compatibility)
-            elif "choices" in result and len(result["choices"]) > 0:
-                assistant_message = result["choices"][0]["message"]["content"]
-
-                # Stream the response token by token
-                for char in assistant_message:
-                    yield f"data: {json.dumps({'type': 'token', 'content': char})}\n\n"
-
-                # Send usage information if available
-                if "usage" in result:
-                    usage_data = {
-                        "prompt_tokens": result["usage"].get("prompt_tokens", 0),
-                        "completion_tokens": result["usage"].get("completion_tokens", 0),
-                        "total_tokens": result["usage"].get("total_tokens", 0)
-                    }
-                    yield f"data: {json.dumps({'type': 'usage', 'usage': usage_data})}\n\n"
+            content_type = response.headers.get("content-type", "")
 
+            if settings.ASKATT_STREAMING and ("text/event-stream" in content_type or "ndjson" in content_type):
+                logger.info("AskAT&T API streaming response started")
+                async for event in _forward_stream(response):
+                    yield event
             else:
-                # Handle unexpected response format
-                logger.warning(f"Unexpected API response format: {result}")
-                error_msg = result.get("error", {}).get("message", "Unexpected response format")
-                yield f"data: {json.dumps({'type': 'error', 'content': error_msg})}\n\n"
+                # Complete body (streaming disabled, or the upstream didn't stream)
+                await response.aread()
+                logger.info("AskAT&T API response received")
+
+                for event in _replay_buffered_result(response.json()):
+                    yield event
 
-            # Send end event
-            yield f"data: {json.dumps({'type': 'end'})}\n\n"
+        # Send end event
+        yield EndEvent()
 
+    except UpstreamSaturatedError as e:
+        logger.warning(str(e))
+        yield ErrorEvent("AskAT&T is busy, please try again shortly", retry_after=e.retry_after)
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+        yield ErrorEvent("AskAT&T is temporarily unavailable, please try again shortly", retry_after=e.retry_after)
     except httpx.HTTPStatusError as e:
         logger.error(f"AskAT&T API error: {e.response.status_code} - {e.response.text}")
-        yield f"data: {json.dumps({'type': 'error', 'content': f'API error: {e.response.status_code}'})}\n\n"
+        yield ErrorEvent(f"API error: {e.response.status_code}")
     except Exception as e:
         logger.error(f"Error calling AskAT&T API: {str(e)}")
-        yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
+        yield ErrorEvent(str(e))
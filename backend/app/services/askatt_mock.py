@@ -6,9 +6,14 @@ This allows you to develop and test the full application without needing
 access to the actual AskAT&T endpoints on the corporate intranet.
 """
 from typing import AsyncGenerator
-import json
 import asyncio
 import random
+from app.services.stream_events import (
+    StreamEvent,
+    TokenEvent,
+    UsageEvent,
+    EndEvent,
+)
 
 # Sample responses to simulate AI chat
 MOCK_RESPONSES = [
@@ -24,7 +29,7 @@ async def stream_askatt_chat_mock(
     message: str,
     conversation_history: list[dict],
     environment: str = "production"
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[StreamEvent, None]:
     """
     Mock AskAT&T streaming chat service.
 
@@ -39,7 +44,7 @@ async def stream_askatt_chat_mock(
         environment: "stage" or "production" (not used in mock)
 
     Yields:
-        SSE-formatted events: data: {json}\\n\\n
+        Stream events (token, usage, end)
     """
     # Select a random mock response or generate based on message
     if "hello" in message.lower() or "hi" in message.lower():
@@ -57,7 +62,7 @@ async def stream_askatt_chat_mock(
 
     # Simulate token-by-token streaming
     for char in response_text:
-        yield f"data: {json.dumps({'type': 'token', 'content': char})}\n\n"
+        yield TokenEvent(char)
         await asyncio.sleep(0.01)  # Simulate network delay
 
     # Send mock usage statistics
@@ -67,22 +72,22 @@ async def stream_askatt_chat_mock(
         "total_tokens": len(message.split()) + len(response_text.split())
     }
 
-    yield f"data: {json.dumps({'type': 'usage', 'usage': mock_usage})}\n\n"
+    yield UsageEvent(mock_usage)
 
     # Send end event
-    yield f"data: {json.dumps({'type': 'end'})}\n\n"
+    yield EndEvent()
 
 
 async def stream_askatt_chat(
     message: str,
     conversation_history: list[dict],
     environment: str = "production"
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[StreamEvent, None]:
     """
     Wrapper function that matches the real service interface.
 
     In production, this would be replaced with the real AskAT&T integration.
     For now, it calls the mock service.
     """
-    async for chunk in stream_askatt_chat_mock(message, conversation_history, environment):
-        yield chunk
+    async for event in stream_askatt_chat_mock(message, conversation_history, environment):
+        yield event
@@ -3,13 +3,20 @@ AskDocs API service using real Azure AD authentication and API format.
 Provides domain-specific RAG (Retrieval-Augmented Generation) responses.
 """
 import httpx
-import json
 from typing import AsyncGenerator
-from uuid import UUID
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
+from app.core.concurrency import UpstreamSaturatedError
+from app.core.resilience import CircuitOpenError, askdocs_upstream
+from app.core.http_client import get_upstream_client, upstream_timeout
 from app.services.azure_ad import get_askatt_token
+from app.services.stream_events import (
+    StreamEvent,
+    TokenEvent,
+    UsageEvent,
+    SourcesEvent,
+    ErrorEvent,
+    EndEvent,
+)
 from app.models.domain import Configuration
 import logging
 
@@ -17,43 +24,32 @@ logger = logging.getLogger(__name__)
 
 
 async def stream_askdocs_chat(
-    configuration_id: UUID,
+    config: Configuration,
     message: str,
     conversation_history: list[dict],
-    environment: str,
-    db: AsyncSession
-) -> AsyncGenerator[str, None]:
+    environment: str
+) -> AsyncGenerator[StreamEvent, None]:
     """
     Stream chat responses from AskDocs API using real Azure AD authentication.
 
     AskDocs provides domain-specific RAG responses with source attribution.
 
     Args:
-        configuration_id: UUID of the AskDocs configuration to use
+        config: AskDocs configuration (with domain), already access-checked
         message: User's question
         conversation_history: Previous messages in the conversation
         environment: "stage" or "production"
-        db: Database session to fetch configuration
 
     Yields:
-        SSE-formatted chunks with token, sources, usage, or end events
+        Stream events: token, sources, usage, end (or error)
     """
-    # Get configuration (automatically filtered by user's roles via event listener)
-    stmt = select(Configuration).where(Configuration.id == configuration_id)
-    result = await db.execute(stmt)
-    config = result.scalar_one_or_none()
-
-    if not config:
-        yield f"data: {json.dumps({'type': 'error', 'content': 'Configuration not found or access denied'})}\n\n"
-        return
-
     # Get Azure AD access token (same as AskAT&T)
     try:
         access_token = await get_askatt_token(use_domain_scope=True)
         logger.info(f"Successfully obtained Azure AD token for AskDocs")
     except Exception as e:
         logger.error(f"Failed to get Azure AD token: {str(e)}")
-        yield f"data: {json.dumps({'type': 'error', 'content': 'Authentication failed'})}\n\n"
+        yield ErrorEvent("Authentication failed")
         return
 
     # Select API URL based on environment
@@ -79,82 +75,102 @@ async def stream_askdocs_chat(
     logger.debug(f"Domain: {payload['domain']}, Config: {payload['config_version']}")
 
     try:
-        async with httpx.AsyncClient(verify=False, timeout=120.0) as client:
-            response = await client.post(api_url, headers=headers, json=payload)
-            response.raise_for_status()
-
-            result = response.json()
-            logger.info(f"AskDocs API response received")
-            logger.debug(f"Response keys: {list(result.keys())}")
-
-            # Extract the assistant's response
-            # Try multiple possible response keys
-            assistant_message = None
-            if "response" in result:
-                assistant_message = result["response"]
-            elif "answer" in result:
-                assistant_message = result["answer"]
-            elif "content" in result:
-                assistant_message = result["content"]
-
-            if not assistant_message:
-                logger.warning(f"Unexpected API response format: {result}")
-                yield f"data: {json.dumps({'type': 'error', 'content': 'Unexpected response format'})}\n\n"
-                return
-
-            # Stream the response token by token
-            for char in assistant_message:
-                yield f"data: {json.dumps({'type': 'token', 'content': char})}\n\n"
-
-            # Extract and send source information if available
-            # Real API format: citations array with complex structure
-            citations = result.get("citations", [])
-            sources = result.get("sources", [])  # Fallback for old format
-
-            formatted_sources = []
-
-            # Handle citations format (real API)
-            if citations:
-                for citation in citations:
-                    if isinstance(citation, dict):
-                        metadata = citation.get("metadata", {})
-                        source_url = metadata.get("source", "#")
-
-                        # Extract title from captions or page_content
-                        captions = metadata.get("captions", {})
-                        title = captions.get("text", "")[:100] if captions.get("text") else citation.get("page_content", "")[:100]
-
-                        if not title:
-                            title = f"Source {citation.get('id', 'Unknown')}"
-
-                        formatted_sources.append({
-                            "title": title,
-                            "url": source_url
-                        })
-
-            # Handle old sources format (for compatibility)
-            elif sources:
-                for source in sources:
-                    if isinstance(source, dict):
-                        formatted_sources.append({
-                            "title": source.get("title", source.get("name", "Unknown")),
-                            "url": source.get("url", source.get("link", "#"))
-                        })
-
-            if formatted_sources:
-                yield f"data: {json.dumps({'type': 'sources', 'sources': formatted_sources})}\n\n"
-
-            # Send usage information if available
-            if "usage" in result:
-                usage_data = {
-                    "prompt_tokens": result["usage"].get("prompt_tokens", 0),
-                    "completion_tokens": result["usage"].get("completion_tokens", 0),
-                    "total_tokens": result["usage"].get("total_tokens", 0)
-                }
-                yield f"data: {json.dumps({'type': 'usage', 'usage': usage_data})}\n\n"
-
-            # Send end event
-            yield f"data: {json.dumps({'type': 'end'})}\n\n"
+        client = get_upstream_client(api_url)
+
+        def send():
+            request = client.build_request(
+                "POST",
+                api_url,
+                headers=headers,
+                json=payload,
+                timeout=upstream_timeout(settings.ASKDOCS_TIMEOUT)
+            )
+            return client.send(request, stream=True)
+
+        # Retried / hedged until the full answer arrives (nothing sent to the client yet)
+        async with askdocs_upstream.call(send) as response:
+            await response.aread()
+        response.raise_for_status()
+
+        result = response.json()
+        logger.info(f"AskDocs API response received")
+        logger.debug(f"Response keys: {list(result.keys())}")
+
+        # Extract the assistant's response
+        # Try multiple possible response keys
+        assistant_message = None
+        if "response" in result:
+            assistant_message = result["response"]
+        elif "answer" in result:
+            assistant_message = result["answer"]
+        elif "content" in result:
+            assistant_message = result["content"]
+
+        if not assistant_message:
+            logger.warning(f"Unexpected API response format: {result}")
+            yield ErrorEvent("Unexpected response format")
+            return
+
+        # The full answer is already here; send it as one token event
+        yield TokenEvent(assistant_message)
+
+        # Extract and send source information if available
+        # Real API format: citations array with complex structure
+        citations = result.get("citations", [])
+        sources = result.get("sources", [])  # Fallback for old format
+
+        formatted_sources = []
+
+        # Handle citations format (real API)
+        if citations:
+            for citation in citations:
+                if isinstance(citation, dict):
+                    metadata = citation.get("metadata", {})
+                    source_url = metadata.get("source", "#")
+
+                    # Extract title from captions or page_content
+                    captions = metadata.get("captions", {})
+                    title = captions.get("text", "")[:100] if captions.get("text") else citation.get("page_content", "")[:100]
+
+                    if not title:
+                        title = f"Source {citation.get('id', 'Unknown')}"
+
+                    formatted_sources.append({
+                        "title": title,
+                        "url": source_url
+                    })
+
+        # Handle old sources format (for compatibility)
+        elif sources:
+            for source in sources:
+                if isinstance(source, dict):
+                    formatted_sources.append({
+                        "title": source.get("title", source.get("name", "Unknown")),
+                        "url": source.get("url", source.get("link", "#"))
+                    })
+
+        if formatted_sources:
+            yield SourcesEvent(formatted_sources)
+
+        # Send usage information if available
+        if "usage" in result:
+            usage_data = {
+                "prompt_tokens": result["usage"].get("prompt_tokens", 0),
+                "completion_tokens": result["usage"].get("completion_tokens", 0),
+                "total_tokens": result["usage"].get("total_tokens", 0)
+            }
+            yield UsageEvent(usage_data)
+
+        # Send end event
+        yield EndEvent()
+
+    except UpstreamSaturatedError as e:
+        logger.warning(str(e))
+        yield ErrorEvent("AskDocs is busy, please try again shortly", retry_after=e.retry_after)
+
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+        yield ErrorEvent("AskDocs is temporarily unavailable, please try again shortly", retry_after=e.retry_after)
 
     except httpx.HTTPStatusError as e:
         logger.error(f"AskDocs API error: {e.response.status_code} - {e.response.text}")
@@ -166,12 +182,12 @@ async def stream_askdocs_chat(
         except:
             error_msg = f"API error: {e.response.status_code}"
 
-        yield f"data: {json.dumps({'type': 'error', 'content': error_msg})}\n\n"
+        yield ErrorEvent(error_msg)
 
     except httpx.TimeoutException:
         logger.error(f"AskDocs API timeout")
-        yield f"data: {json.dumps({'type': 'error', 'content': 'Request timeout - API took too long to respond'})}\n\n"
+        yield ErrorEvent("Request timeout - API took too long to respond")
 
     except Exception as e:
         logger.error(f"Error calling AskDocs API: {str(e)}", exc_info=True)
-        yield f"data: {json.dumps({'type': 'error', 'content': f'Service error: {str(e)}'})}\n\n"
+        yield ErrorEvent(f"Service error: {str(e)}")
@@ -2,10 +2,10 @@
 Service for fetching AskDocs configurations from external API.
 Uses Azure AD OAuth2 authentication (same as AskAT&T and AskDocs).
 """
-import httpx
 import logging
 from typing import Optional
 from app.config import settings
+from app.core.http_client import get_upstream_client, upstream_timeout
 from app.services.azure_ad import get_askatt_token
 
 logger = logging.getLogger(__name__)
@@ -65,16 +65,21 @@ async def fetch_configurations_by_domain(
     logger.info(f"Fetching configurations for domain: {domain_name} from {url}")
     logger.debug(f"Payload: {payload}")
 
-    # Make HTTP POST request with authentication
-    async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-        response = await client.post(url, json=payload, headers=headers)
-        response.raise_for_status()  # Raise exception for 4xx/5xx responses
-
-        logger.info(f"Successfully fetched configurations for domain: {domain_name}")
-        logger.debug(f"Response: {response.text[:200]}...")  # Log first 200 chars
-
-        # Return response as string (as per API specification)
-        return response.text
+    # Make HTTP POST request with authentication (shared pooled client)
+    client = get_upstream_client(url)
+    response = await client.post(
+        url,
+        json=payload,
+        headers=headers,
+        timeout=upstream_timeout(settings.ASKDOCS_CONFIG_TIMEOUT)
+    )
+    response.raise_for_status()  # Raise exception for 4xx/5xx responses
+
+    logger.info(f"Successfully fetched configurations for domain: {domain_name}")
+    logger.debug(f"Response: {response.text[:200]}...")  # Log first 200 chars
+
+    # Return response as string (as per API specification)
+    return response.text
 
 
 async def fetch_configurations_by_domain_mock(
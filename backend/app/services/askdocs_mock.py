@@ -6,13 +6,16 @@ This allows you to develop and test the full application without needing
 access to the actual AskDocs endpoints on the corporate intranet.
 """
 from typing import AsyncGenerator
-from uuid import UUID
-import json
 import asyncio
 import random
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.domain import Configuration
+from app.services.stream_events import (
+    StreamEvent,
+    TokenEvent,
+    UsageEvent,
+    SourcesEvent,
+    EndEvent,
+)
 
 # Sample RAG responses with sources
 MOCK_RAG_RESPONSES = {
@@ -41,12 +44,11 @@ MOCK_RAG_RESPONSES = {
 
 
 async def stream_askdocs_chat_mock(
-    configuration_id: UUID,
+    config: Configuration,
     message: str,
     conversation_history: list[dict],
-    environment: str,
-    db: AsyncSession
-) -> AsyncGenerator[str, None]:
+    environment: str
+) -> AsyncGenerator[StreamEvent, None]:
     """
     Mock AskDocs streaming RAG chat service.
 
@@ -57,24 +59,14 @@ async def stream_askdocs_chat_mock(
     - Usage statistics
 
     Args:
-        configuration_id: UUID of the configuration to use
+        config: Configuration to use (with domain), already access-checked
         message: User's question
         conversation_history: Previous conversation messages
         environment: "stage" or "production"
-        db: Database session
 
     Yields:
-        SSE-formatted events: data: {json}\\n\\n
+        Stream events (token, sources, usage, end)
     """
-    # Get configuration (automatically filtered by user's roles via event listener)
-    stmt = select(Configuration).where(Configuration.id == configuration_id)
-    result = await db.execute(stmt)
-    config = result.scalar_one_or_none()
-
-    if not config:
-        yield f"data: {json.dumps({'type': 'error', 'content': 'Configuration not found or access denied'})}\n\n"
-        return
-
     # Select appropriate mock response based on message content
     message_lower = message.lower()
 
@@ -100,11 +92,11 @@ async def stream_askdocs_chat_mock(
 
     # Stream answer token by token
     for char in answer_text:
-        yield f"data: {json.dumps({'type': 'token', 'content': char})}\n\n"
+        yield TokenEvent(char)
         await asyncio.sleep(0.01)  # Simulate network delay
 
     # Send sources
-    yield f"data: {json.dumps({'type': 'sources', 'sources': mock_data['sources']})}\n\n"
+    yield SourcesEvent(mock_data['sources'])
 
     # Send mock usage statistics
     mock_usage = {
@@ -113,26 +105,25 @@ async def stream_askdocs_chat_mock(
         "total_tokens": len(message.split()) + len(answer_text.split()) + 50
     }
 
-    yield f"data: {json.dumps({'type': 'usage', 'usage': mock_usage})}\n\n"
+    yield UsageEvent(mock_usage)
 
     # Send end event
-    yield f"data: {json.dumps({'type': 'end'})}\n\n"
+    yield EndEvent()
 
 
 async def stream_askdocs_chat(
-    configuration_id: UUID,
+    config: Configuration,
     message: str,
     conversation_history: list[dict],
-    environment: str,
-    db: AsyncSession
-) -> AsyncGenerator[str, None]:
+    environment: str
+) -> AsyncGenerator[StreamEvent, None]:
     """
     Wrapper function that matches the real service interface.
 
     In production, this would be replaced with the real AskDocs integration.
     For now, it calls the mock service.
     """
-    async for chunk in stream_askdocs_chat_mock(
-        configuration_id, message, conversation_history, environment, db
+    async for event in stream_askdocs_chat_mock(
+        config, message, conversation_history, environment
     ):
-        yield chunk
+        yield event
@@ -2,11 +2,13 @@
 Authentication service with business logic for user signup and login.
 """
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from app.models.user import User, Role
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import create_access_token
+from app.core.passwords import password_hasher
 from app.core.exceptions import AuthenticationError, ValidationError
 
 
@@ -54,13 +56,14 @@ async def create_user(
         # If USER role doesn't exist, create it
         user_role = Role(
             name="USER",
+            display_name="User",
             description="Basic user with access to general chat"
         )
         db.add(user_role)
         await db.flush()  # Get the role ID
 
-    # Hash the password
-    password_hash = get_password_hash(password)
+    # Hash the password (in the bcrypt worker pool)
+    password_hash = await password_hasher.hash(password)
 
     # Create new user
     new_user = User(
@@ -76,7 +79,7 @@ async def create_user(
 
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
+    # No refresh: defaults are applied client-side, and a refresh would expire roles
 
     return new_user
 
@@ -97,22 +100,28 @@ async def authenticate_user(
     Returns:
         User: Authenticated user if credentials are valid, None otherwise
     """
-    # Retrieve user by attid
-    stmt = select(User).where(User.attid == attid)
+    # Retrieve user by attid (with roles for the login response)
+    stmt = select(User).where(User.attid == attid).options(selectinload(User.roles))
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
 
     if not user:
         return None
 
-    # Verify password
-    if not verify_password(password, user.password_hash):
+    # Verify password (in the bcrypt worker pool)
+    valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not valid:
         return None
 
     # Check if user is active
     if not user.is_active:
         return None
 
+    # Upgrade hashes made with an outdated BCRYPT_ROUNDS
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     return user
 
 
@@ -1,24 +1,50 @@
 """
 Azure AD OAuth2 authentication service for AskAT&T API.
+
+Tokens are cached per scope until shortly before they expire. When a cached
+token enters its refresh window it is still served while a single background
+refresh runs, and concurrent misses for the same scope share one in-flight
+token request (single-flight).
 """
+import asyncio
+import time
+from dataclasses import dataclass
 import httpx
 from app.config import settings
+from app.core.http_client import get_upstream_client, upstream_timeout
 from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class CachedToken:
+    """An access token with its monotonic-clock expiry and refresh deadlines."""
+    access_token: str
+    token_type: str
+    expires_at: float  # Stop serving the token after this time
+    refresh_at: float  # Start a background refresh after this time
+
+
 class AzureADTokenManager:
     """Manages Azure AD OAuth2 tokens for API authentication."""
 
     def __init__(self):
-        self._token: Optional[str] = None
-        self._token_type: Optional[str] = None
+        self._tokens: dict[str, CachedToken] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "background_refreshes": 0,
+            "coalesced": 0,
+            "errors": 0,
+        }
 
     async def get_access_token(self, scope: Optional[str] = None) -> str:
         """
-        Get an access token from Azure AD using client credentials flow.
+        Get an access token for the scope, using the cache when possible.
 
         Args:
             scope: OAuth2 scope (defaults to AZURE_SCOPE_ASKATT_GENERAL)
@@ -27,35 +53,125 @@ class AzureADTokenManager:
             Access token string
 
         Raises:
-            HTTPError: If token request fails
+            HTTPError: If token request fails and no valid cached token exists
         """
         # Use provided scope or default to general AskAT&T scope
         token_scope = scope or settings.AZURE_SCOPE_ASKATT_GENERAL
 
+        cached = self._tokens.get(token_scope)
+        now = time.monotonic()
+
+        if cached and now < cached.expires_at:
+            self._stats["hits"] += 1
+
+            # Refresh proactively so callers never wait on an expired token
+            if now >= cached.refresh_at and token_scope not in self._inflight:
+                self._stats["background_refreshes"] += 1
+                self._start_refresh(token_scope)
+
+            return cached.access_token
+
+        self._stats["misses"] += 1
+
+        # shield() so a cancelled caller does not cancel the shared request
+        token = await asyncio.shield(self._start_refresh(token_scope))
+        return token.access_token
+
+    def _start_refresh(self, scope: str) -> asyncio.Task:
+        """
+        Return the in-flight refresh task for a scope, starting one if needed.
+
+        Args:
+            scope: OAuth2 scope
+
+        Returns:
+            Task resolving to the new CachedToken
+        """
+        task = self._inflight.get(scope)
+        if task is not None:
+            self._stats["coalesced"] += 1
+            return task
+
+        task = asyncio.create_task(self._fetch_token(scope))
+        self._inflight[scope] = task
+
+        def _done(finished: asyncio.Task) -> None:
+            self._inflight.pop(scope, None)
+            # Retrieve the exception so background failures are not reported as unhandled
+            if not finished.cancelled():
+                finished.exception()
+
+        task.add_done_callback(_done)
+        return task
+
+    async def _fetch_token(self, scope: str) -> CachedToken:
+        """
+        Request a new token from Azure AD and store it in the cache.
+
+        Args:
+            scope: OAuth2 scope
+
+        Returns:
+            The newly cached token
+        """
+        self._stats["refreshes"] += 1
+
+        try:
+            token_data = await self._request_token(scope)
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+        now = time.monotonic()
+        lifetime = float(token_data.get('expires_in', settings.AZURE_TOKEN_DEFAULT_EXPIRES_IN))
+        lifetime = max(lifetime - settings.AZURE_TOKEN_EXPIRY_SKEW_SECONDS, 0.0)
+
+        # Short-lived tokens refresh halfway through their lifetime
+        refresh_margin = min(settings.AZURE_TOKEN_REFRESH_MARGIN_SECONDS, lifetime / 2)
+
+        token = CachedToken(
+            access_token=token_data['access_token'],
+            token_type=token_data.get('token_type', 'Bearer'),
+            expires_at=now + lifetime,
+            refresh_at=now + lifetime - refresh_margin,
+        )
+        self._tokens[scope] = token
+
+        return token
+
+    async def _request_token(self, scope: str) -> dict:
+        """
+        Perform the client credentials POST against Azure AD.
+
+        Args:
+            scope: OAuth2 scope
+
+        Returns:
+            Token response JSON (access_token, token_type, expires_in)
+
+        Raises:
+            HTTPError: If token request fails
+        """
         # Prepare the payload for the token request
         payload = {
             'client_id': settings.AZURE_CLIENT_ID,
             'client_secret': settings.AZURE_CLIENT_SECRET,
-            'scope': token_scope,
+            'scope': scope,
             'grant_type': 'client_credentials'
         }
 
         try:
-            # Make the request to the authentication server
-            async with httpx.AsyncClient(verify=False) as client:
-                response = await client.post(
-                    settings.AZURE_AUTH_URL,
-                    data=payload,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-
-                token_data = response.json()
-                self._token = token_data['access_token']
-                self._token_type = token_data.get('token_type', 'Bearer')
-
-                logger.info(f"Successfully obtained Azure AD token with scope: {token_scope}")
-                return self._token
+            # Make the request to the authentication server (shared pooled client)
+            client = get_upstream_client(settings.AZURE_AUTH_URL)
+            response = await client.post(
+                settings.AZURE_AUTH_URL,
+                data=payload,
+                timeout=upstream_timeout(settings.AZURE_AD_TIMEOUT)
+            )
+            response.raise_for_status()
+
+            logger.info(f"Successfully obtained Azure AD token with scope: {scope}")
+            return response.json()
 
         except httpx.HTTPStatusError as e:
             logger.error(f"Failed to retrieve Azure AD token: {e.response.status_code} - {e.response.text}")
@@ -64,14 +180,35 @@ class AzureADTokenManager:
             logger.error(f"Error during Azure AD authentication: {str(e)}")
             raise
 
-    def get_cached_token(self) -> Optional[str]:
+    def get_cached_token(self, scope: Optional[str] = None) -> Optional[str]:
         """
         Get the cached token without making a new request.
 
+        Args:
+            scope: OAuth2 scope (defaults to AZURE_SCOPE_ASKATT_GENERAL)
+
         Returns:
-            Cached token or None if not available
+            Cached token or None if not available or expired
         """
-        return self._token
+        cached = self._tokens.get(scope or settings.AZURE_SCOPE_ASKATT_GENERAL)
+        if cached and time.monotonic() < cached.expires_at:
+            return cached.access_token
+        return None
+
+    def get_stats(self) -> dict:
+        """
+        Get token cache counters.
+
+        Returns:
+            Dict with hits, misses, refreshes, background_refreshes, coalesced,
+            errors, hit_ratio and the number of cached scopes
+        """
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+            "cached_scopes": len(self._tokens),
+        }
 
 
 # Global token manager instance
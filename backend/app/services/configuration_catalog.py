@@ -0,0 +1,194 @@
+"""
+Cached AskDocs configuration catalog.
+
+The configuration list changes only when an admin edits it, but the frontend
+loads it on every page. The catalog keeps the serialized JSON response per
+(role set, environment) together with a strong ETag (hash of the body), so
+repeat loads skip the query and serialization, and clients that send
+If-None-Match get a 304 without a body.
+
+Admin changes to configurations, domains and user roles call
+configuration_catalog.invalidate(), which bumps the catalog version and
+drops every entry. Entries also expire after CONFIG_CATALOG_TTL_SECONDS,
+which bounds staleness across workers. Because the ETag is a content hash,
+workers serving the same catalog return the same ETag.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+import hashlib
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.core.access_index import configuration_access
+from app.models.domain import Configuration
+from app.schemas.chat import ConfigurationResponse, DomainResponse
+
+# Distinct role sets x environments stay small; this only guards against surprises
+MAX_CATALOG_ENTRIES = 256
+
+_catalog_adapter = TypeAdapter(list[ConfigurationResponse])
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogEntry:
+    """Serialized catalog for one (role set, environment)."""
+    body: bytes
+    etag: str
+    version: int
+    expires_at: float
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, per RFC 9110).
+
+    Args:
+        if_none_match: Header value (may list several tags or be "*")
+        etag: Current strong ETag, quoted
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+async def load_catalog(
+    db: AsyncSession,
+    roles: Iterable[str],
+    environment: Optional[str] = None
+) -> list[ConfigurationResponse]:
+    """
+    Query the active configurations (with domains) accessible to a role set.
+
+    Args:
+        db: Database session
+        roles: Role names of the current user
+        environment: Optional "stage" or "production" filter
+
+    Returns:
+        Configuration responses
+    """
+    stmt = (
+        select(Configuration)
+        .where(Configuration.is_active.is_(True))
+        .options(selectinload(Configuration.domain))
+    )
+
+    if environment:
+        stmt = stmt.where(Configuration.environment == environment)
+
+    # Restrict to the ids the roles can access (primary-key IN lookup);
+    # without the index the role-based event listener filters the query
+    if await configuration_access.ensure_fresh(db):
+        allowed_ids = configuration_access.allowed_ids(roles)
+        if allowed_ids is not None:
+            stmt = stmt.where(Configuration.id.in_(allowed_ids))
+        stmt = stmt.execution_options(skip_role_filter=True)
+
+    result = await db.execute(stmt)
+    configurations = result.scalars().all()
+
+    return [
+        ConfigurationResponse(
+            id=config.id,
+            domain_id=config.domain_id,
+            config_key=config.config_key,
+            display_name=config.display_name,
+            description=config.description,
+            environment=config.environment,
+            is_active=config.is_active,
+            domain=DomainResponse(
+                id=config.domain.id,
+                domain_key=config.domain.domain_key,
+                display_name=config.domain.display_name,
+                description=config.domain.description
+            )
+        )
+        for config in configurations
+    ]
+
+
+class ConfigurationCatalog:
+    """Per-process cache of serialized catalogs keyed by (role set, environment)."""
+
+    def __init__(self):
+        self._entries: OrderedDict[tuple[frozenset[str], str], CatalogEntry] = OrderedDict()
+        self._version = 0
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def get(self, db: AsyncSession, roles: Iterable[str], environment: Optional[str] = None) -> CatalogEntry:
+        """
+        Get the serialized catalog for a role set, building it on a miss.
+
+        Args:
+            db: Database session (used only on a miss)
+            roles: Role names of the current user
+            environment: Optional "stage" or "production" filter
+
+        Returns:
+            CatalogEntry with JSON body and ETag
+        """
+        key = (frozenset(roles), environment or "")
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.version == self._version and time.monotonic() < entry.expires_at:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry
+            del self._entries[key]
+
+        self._stats["misses"] += 1
+
+        version = self._version
+        body = _catalog_adapter.dump_json(await load_catalog(db, key[0], environment))
+        entry = CatalogEntry(
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            version=version,
+            expires_at=time.monotonic() + settings.CONFIG_CATALOG_TTL_SECONDS,
+        )
+
+        # Skip storing if the catalog was invalidated while we were loading
+        if version == self._version:
+            self._entries[key] = entry
+            while len(self._entries) > MAX_CATALOG_ENTRIES:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def invalidate(self) -> None:
+        """Drop all cached catalogs (call after changing configurations, domains or roles)."""
+        self._version += 1
+        self._entries.clear()
+        self._stats["invalidations"] += 1
+
+    def get_stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with hits, misses, invalidations, cached entries and version
+        """
+        return {**self._stats, "entries": len(self._entries), "version": self._version}
+
+
+# Global catalog cache instance
+configuration_catalog = ConfigurationCatalog()
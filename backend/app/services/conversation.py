@@ -1,16 +1,20 @@
 """
 Conversation management service for creating and retrieving chat history.
 """
+from datetime import datetime
 from uuid import UUID
 from typing import Optional
-from sqlalchemy import select, func, delete
+import base64
+from sqlalchemy import select, func, delete, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
 
 from app.models.conversation import Conversation, Message
+from app.models.feedback import TokenUsageLog
 from app.models.user import User
 from app.models.domain import Configuration
-from app.core.exceptions import ResourceNotFoundError, PermissionDeniedError
+from app.core.exceptions import ResourceNotFoundError, PermissionDeniedError, ValidationError
+from app.services.history_cache import CachedHistory, cached_message, history_cache
 
 
 async def create_conversation(
@@ -44,13 +48,17 @@ async def create_conversation(
     await db.commit()
     await db.refresh(conversation)
 
+    # A new conversation's complete history is known: it is empty
+    await history_cache.set(conversation.id, CachedHistory(complete=True, version=conversation.updated_at))
+
     return conversation
 
 
 async def get_conversation(
     db: AsyncSession,
     conversation_id: UUID,
-    user_id: UUID
+    user_id: UUID,
+    load_messages: bool = True
 ) -> Conversation:
     """
     Get conversation by ID (with permission check).
@@ -59,9 +67,11 @@ async def get_conversation(
         db: Database session
         conversation_id: Conversation UUID
         user_id: User UUID (for permission check)
+        load_messages: Load all messages; pass False for ownership checks
+            (use load_conversation_history for chat context)
 
     Returns:
-        Conversation: Conversation with messages
+        Conversation: Conversation (with messages when load_messages is True)
 
     Raises:
         ResourceNotFoundError: If conversation not found
@@ -70,7 +80,10 @@ async def get_conversation(
     stmt = (
         select(Conversation)
         .where(Conversation.id == conversation_id)
-        .options(selectinload(Conversation.messages))
+        .options(
+            selectinload(Conversation.messages) if load_messages
+            else raiseload(Conversation.messages)
+        )
     )
 
     result = await db.execute(stmt)
@@ -86,56 +99,109 @@ async def get_conversation(
     return conversation
 
 
+def encode_conversation_cursor(updated_at: datetime, conversation_id: UUID) -> str:
+    """
+    Encode a keyset pagination cursor for the conversation list.
+
+    Args:
+        updated_at: updated_at of the last conversation on the page
+        conversation_id: id of the last conversation on the page
+
+    Returns:
+        Opaque URL-safe cursor string
+    """
+    raw = f"{updated_at.isoformat()}|{conversation_id.hex}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_conversation_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_conversation_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (updated_at, conversation_id)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        updated_at, conversation_id = raw.split("|", 1)
+        return datetime.fromisoformat(updated_at), UUID(hex=conversation_id)
+    except ValueError:
+        raise ValidationError("Invalid pagination cursor")
+
+
 async def list_user_conversations(
     db: AsyncSession,
     user_id: UUID,
     service_type: Optional[str] = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None
 ) -> list[tuple[Conversation, int]]:
     """
     List user's conversations with message counts.
 
+    Runs a single query: message counts come from a correlated COUNT
+    subquery (evaluated only for the returned page, via the
+    messages.conversation_id index) and messages are never loaded.
+
     Args:
         db: Database session
         user_id: User UUID
         service_type: Filter by "askatt" or "askdocs" (optional)
         limit: Maximum conversations to return
-        offset: Pagination offset
+        offset: Pagination offset (ignored when cursor is given)
+        cursor: Keyset cursor from encode_conversation_cursor; returns the
+            conversations after it in (updated_at, id) descending order
 
     Returns:
         List of (Conversation, message_count) tuples
+
+    Raises:
+        ValidationError: If the cursor is malformed
     """
+    message_count = (
+        select(func.count(Message.id))
+        .where(Message.conversation_id == Conversation.id)
+        .correlate(Conversation)
+        .scalar_subquery()
+    )
+
     # Build query
-    stmt = select(Conversation).where(Conversation.user_id == user_id)
+    stmt = (
+        select(Conversation, message_count)
+        .where(Conversation.user_id == user_id)
+        .options(raiseload(Conversation.messages))
+    )
 
     if service_type:
         stmt = stmt.where(Conversation.service_type == service_type)
 
+    if cursor:
+        cursor_updated_at, cursor_id = decode_conversation_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                Conversation.updated_at < cursor_updated_at,
+                and_(Conversation.updated_at == cursor_updated_at, Conversation.id < cursor_id)
+            )
+        )
+    else:
+        stmt = stmt.offset(offset)
+
     stmt = (
         stmt
-        .order_by(Conversation.updated_at.desc())
+        .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
         .limit(limit)
-        .offset(offset)
     )
 
     result = await db.execute(stmt)
-    conversations = result.scalars().all()
-
-    # Get message counts for each conversation
-    conversation_data = []
-    for conv in conversations:
-        count_stmt = (
-            select(func.count())
-            .select_from(Message)
-            .where(Message.conversation_id == conv.id)
-        )
-        count_result = await db.execute(count_stmt)
-        message_count = count_result.scalar()
-
-        conversation_data.append((conv, message_count))
 
-    return conversation_data
+    return [(conv, count) for conv, count in result.all()]
 
 
 async def add_message(
@@ -177,23 +243,28 @@ async def add_message(
         role=role,
         content=content,
         token_count=token_count,
-        metadata_=metadata if metadata else None
+        metadata_=metadata if metadata else None,
+        created_at=datetime.utcnow()
     )
 
     db.add(message)
 
-    # Update conversation's updated_at timestamp
+    # Update conversation's updated_at timestamp (the history cache's version)
     stmt = select(Conversation).where(Conversation.id == conversation_id)
     result = await db.execute(stmt)
     conversation = result.scalar_one_or_none()
 
     if conversation:
-        # SQLAlchemy will auto-update the updated_at field
-        await db.flush()
+        conversation.updated_at = message.created_at
 
     await db.commit()
     await db.refresh(message)
 
+    await history_cache.append(
+        conversation_id,
+        cached_message(message.id, role, content, message.created_at, message.metadata_)
+    )
+
     return message
 
 
@@ -203,7 +274,7 @@ async def delete_conversation(
     user_id: UUID
 ) -> None:
     """
-    Delete a conversation and all its messages.
+    Delete a conversation, its messages and their token usage log rows.
 
     Args:
         db: Database session
@@ -215,7 +286,13 @@ async def delete_conversation(
         PermissionDeniedError: If user doesn't own the conversation
     """
     # Get conversation with permission check
-    conversation = await get_conversation(db, conversation_id, user_id)
+    conversation = await get_conversation(db, conversation_id, user_id, load_messages=False)
+
+    # Per-reply token usage rows reference the messages; the daily rollups
+    # (the usage history) are kept
+    await db.execute(
+        delete(TokenUsageLog).where(TokenUsageLog.conversation_id == conversation_id)
+    )
 
     # Delete all messages first (cascade should handle this, but explicit is safer)
     await db.execute(
@@ -226,6 +303,8 @@ async def delete_conversation(
     await db.delete(conversation)
     await db.commit()
 
+    await history_cache.invalidate(conversation_id)
+
 
 async def generate_conversation_title(
     db: AsyncSession,
@@ -0,0 +1,266 @@
+"""
+Streamed conversation detail payloads.
+
+GET /chat/conversations/{id} used to materialize every Message as an ORM
+object, copy it into a dict and validate one MessageResponse per message
+before serializing the lot. Here messages are read as plain column rows
+(no ORM identity map, no relationship loaders), shaped into the response
+dicts directly and serialized in batches of DETAIL_BATCH_SIZE with orjson
+(falling back to json), so the response streams while rows are read.
+
+The wire format is unchanged: the ConversationResponse JSON object with
+its "messages" array.
+
+Messages can be paginated in chronological order with a keyset cursor over
+(created_at, id); the full history is returned when no limit is given.
+The full history also includes replies still waiting in this worker's
+write-behind queue, so a reply does not disappear until its batch is written.
+"""
+from datetime import datetime
+from typing import AsyncGenerator, Iterable, Optional
+from uuid import UUID
+import base64
+import json
+
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import ValidationError
+from app.models.conversation import Conversation, Message
+from app.services.history_cache import CachedHistory, cached_message, history_cache
+from app.services.persistence import message_queue
+
+# orjson is optional; it serializes UUIDs and datetimes natively and is much faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Messages serialized per streamed chunk
+DETAIL_BATCH_SIZE = 200
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """Serialize to compact JSON bytes (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_json_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode_message_cursor(created_at: datetime, message_id: UUID) -> str:
+    """
+    Encode a keyset pagination cursor for a conversation's messages.
+
+    Args:
+        created_at: created_at of the last message on the page
+        message_id: id of the last message on the page
+
+    Returns:
+        Opaque URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{message_id.hex}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_message_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_message_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (created_at, message_id)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, message_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(hex=message_id)
+    except ValueError:
+        raise ValidationError("Invalid pagination cursor")
+
+
+def build_message_query(conversation_id: UUID, cursor: Optional[str] = None) -> Select:
+    """
+    Build the column query for a conversation's messages.
+
+    Args:
+        conversation_id: Conversation UUID (ownership already checked)
+        cursor: Keyset cursor; only messages after it are selected
+
+    Returns:
+        Select of (id, role, content, metadata, created_at) in chronological order
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    stmt = (
+        select(Message.id, Message.role, Message.content, Message.metadata_, Message.created_at)
+        .where(Message.conversation_id == conversation_id)
+    )
+
+    if cursor:
+        cursor_created_at, cursor_id = decode_message_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                Message.created_at > cursor_created_at,
+                and_(Message.created_at == cursor_created_at, Message.id > cursor_id)
+            )
+        )
+
+    return stmt.order_by(Message.created_at, Message.id)
+
+
+def message_payload(conversation_id: UUID, row) -> dict:
+    """Shape one (id, role, content, metadata, created_at) row as a MessageResponse dict."""
+    message_id, role, content, metadata, created_at = row
+    return {
+        "id": message_id,
+        "conversation_id": conversation_id,
+        "role": role,
+        "content": content,
+        "token_usage": metadata.get("token_usage") if metadata else None,
+        "sources": metadata.get("sources") if metadata else None,
+        "created_at": created_at,
+    }
+
+
+def _conversation_head(conversation: Conversation) -> bytes:
+    """The response object up to the opening of the messages array."""
+    head = dumps({
+        "id": conversation.id,
+        "user_id": conversation.user_id,
+        "service_type": conversation.service_type,
+        "configuration_id": conversation.configuration_id,
+        "title": conversation.title,
+        "created_at": conversation.created_at,
+        "updated_at": conversation.updated_at,
+    })
+    return head[:-1] + b',"messages":['
+
+
+def _message_chunk(payloads: Iterable[dict], first: bool) -> bytes:
+    body = b",".join(dumps(payload) for payload in payloads)
+    return body if first or not body else b"," + body
+
+
+async def load_message_page(
+    db: AsyncSession,
+    conversation_id: UUID,
+    limit: int,
+    cursor: Optional[str] = None
+) -> tuple[list, Optional[str]]:
+    """
+    Load one page of message rows.
+
+    Args:
+        db: Database session
+        conversation_id: Conversation UUID (ownership already checked)
+        limit: Maximum messages
+        cursor: Keyset cursor from a previous page
+
+    Returns:
+        Tuple of (rows, next cursor or None when the page is not full)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    result = await db.execute(build_message_query(conversation_id, cursor).limit(limit))
+    rows = result.all()
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_message_cursor(last.created_at, last.id)
+    return rows, next_cursor
+
+
+async def stream_conversation_detail(
+    db: AsyncSession,
+    conversation: Conversation,
+    rows: Optional[list] = None
+) -> AsyncGenerator[bytes, None]:
+    """
+    Stream a conversation with its messages as ConversationResponse JSON.
+
+    Args:
+        db: Database session (kept open while the response streams)
+        conversation: Conversation (ownership already checked)
+        rows: A page from load_message_page(); None streams the full history,
+            from the history cache when it holds all of it
+
+    Yields:
+        JSON chunks of up to DETAIL_BATCH_SIZE messages
+    """
+    conversation_id = conversation.id
+    yield _conversation_head(conversation)
+
+    if rows is not None:
+        for start in range(0, len(rows), DETAIL_BATCH_SIZE):
+            batch = rows[start:start + DETAIL_BATCH_SIZE]
+            yield _message_chunk((message_payload(conversation_id, row) for row in batch), first=start == 0)
+        yield b"]}"
+        return
+
+    cached = await history_cache.get(conversation_id, conversation.updated_at)
+    if cached and cached.complete:
+        # Cached messages are already JSON-shaped (string id and timestamp)
+        yield _message_chunk(({**message, "conversation_id": conversation_id} for message in cached.messages), True)
+        yield b"]}"
+        return
+
+    # Taken before the query: a message written meanwhile is in one or the other
+    queued = {message.id: message for message in message_queue.pending(conversation_id)}
+
+    # Full history from a server-side cursor; short histories are cached on the way
+    result = await db.stream(build_message_query(conversation_id).execution_options(yield_per=DETAIL_BATCH_SIZE))
+    cacheable: Optional[list] = []
+    first = True
+    try:
+        async for batch in result.partitions():
+            yield _message_chunk((message_payload(conversation_id, row) for row in batch), first)
+            first = False
+
+            for row in batch:
+                queued.pop(row.id, None)
+            if cacheable is not None:
+                cacheable.extend(batch)
+                if len(cacheable) > settings.HISTORY_CACHE_MAX_MESSAGES:
+                    cacheable = None
+    finally:
+        await result.close()
+
+    # Replies still in this worker's write-behind queue are the newest messages
+    version = conversation.updated_at
+    if queued:
+        tail = []
+        for message in queued.values():
+            row = message.message_row()
+            tail.append((message.id, message.role, message.content, row["metadata_"], message.created_at))
+            version = max(version, message.created_at)
+        yield _message_chunk((message_payload(conversation_id, row) for row in tail), first)
+
+        if cacheable is not None:
+            cacheable.extend(tail)
+            if len(cacheable) > settings.HISTORY_CACHE_MAX_MESSAGES:
+                cacheable = None
+    yield b"]}"
+
+    if cacheable is not None:
+        await history_cache.fill(conversation_id, CachedHistory(messages=[
+            cached_message(message_id, role, content, created_at, metadata)
+            for message_id, role, content, metadata, created_at in cacheable
+        ], complete=True, version=version))
@@ -0,0 +1,209 @@
+"""
+Streaming export of conversations, messages, feedback and token usage.
+
+Rows are read through a server-side cursor (AsyncSession.stream with
+yield_per) and serialized one partition of EXPORT_BATCH_SIZE rows at a
+time, so memory stays constant however much history is exported. Queries
+select plain columns, so no ORM objects or eager-loaded relationships are
+built.
+
+Formats:
+- ndjson: one JSON object per line (UUIDs as strings, datetimes ISO 8601)
+- csv: header row, then one row per record (JSON columns as JSON text)
+"""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import AsyncGenerator, Optional
+from uuid import UUID
+import csv
+import io
+import json
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import ValidationError
+from app.models.conversation import Conversation, Message
+from app.models.feedback import Feedback, TokenUsageLog
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_DATASETS = ["conversations", "messages", "feedback", "token_usage"]
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def export_filename(dataset: str, export_format: str) -> str:
+    """Attachment filename, e.g. messages-20261016T120000Z.ndjson."""
+    return f"{dataset}-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.{export_format}"
+
+
+def build_export_query(
+    dataset: str,
+    user_id: Optional[UUID] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    service_type: Optional[str] = None
+) -> Select:
+    """
+    Build the column query for an export dataset.
+
+    Args:
+        dataset: One of EXPORT_DATASETS
+        user_id: Only rows belonging to this user
+        since: Created at or after (inclusive)
+        until: Created before (exclusive)
+        service_type: "askatt" or "askdocs"
+
+    Returns:
+        Select ordered by created_at, id
+
+    Raises:
+        ValidationError: If the dataset is unknown
+    """
+    if dataset == "conversations":
+        stmt = select(
+            Conversation.id,
+            Conversation.user_id,
+            Conversation.service_type,
+            Conversation.domain_id,
+            Conversation.configuration_id,
+            Conversation.environment,
+            Conversation.title,
+            Conversation.is_active,
+            Conversation.created_at,
+            Conversation.updated_at,
+        )
+        model, owner, service = Conversation, Conversation.user_id, Conversation.service_type
+
+    elif dataset == "messages":
+        # Owner and service live on the conversation
+        stmt = select(
+            Message.id,
+            Message.conversation_id,
+            Conversation.user_id,
+            Conversation.service_type,
+            Message.role,
+            Message.content,
+            Message.token_count,
+            Message.metadata_.label("metadata"),
+            Message.created_at,
+        ).join(Conversation, Conversation.id == Message.conversation_id)
+        model, owner, service = Message, Conversation.user_id, Conversation.service_type
+
+    elif dataset == "feedback":
+        stmt = select(
+            Feedback.id,
+            Feedback.user_id,
+            Feedback.conversation_id,
+            Feedback.message_id,
+            Feedback.rating,
+            Feedback.comment,
+            Feedback.service_type,
+            Feedback.domain_id,
+            Feedback.configuration_id,
+            Feedback.environment,
+            Feedback.created_at,
+        )
+        model, owner, service = Feedback, Feedback.user_id, Feedback.service_type
+
+    elif dataset == "token_usage":
+        stmt = select(
+            TokenUsageLog.id,
+            TokenUsageLog.user_id,
+            TokenUsageLog.conversation_id,
+            TokenUsageLog.message_id,
+            TokenUsageLog.service_type,
+            TokenUsageLog.configuration_id,
+            TokenUsageLog.model_name,
+            TokenUsageLog.prompt_tokens,
+            TokenUsageLog.completion_tokens,
+            TokenUsageLog.total_tokens,
+            TokenUsageLog.estimated_cost,
+            TokenUsageLog.created_at,
+        )
+        model, owner, service = TokenUsageLog, TokenUsageLog.user_id, TokenUsageLog.service_type
+
+    else:
+        raise ValidationError(f"Unknown export dataset '{dataset}'")
+
+    # Columns hold naive UTC timestamps
+    since, until = _naive_utc(since), _naive_utc(until)
+
+    if user_id is not None:
+        stmt = stmt.where(owner == user_id)
+    if since is not None:
+        stmt = stmt.where(model.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(model.created_at < until)
+    if service_type:
+        stmt = stmt.where(service == service_type)
+
+    return stmt.order_by(model.created_at, model.id)
+
+
+def _json_value(value):
+    """Convert a column value to something json.dumps and csv can write."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _ndjson_chunk(columns: list[str], rows) -> bytes:
+    return "".join(
+        json.dumps({column: _json_value(value) for column, value in zip(columns, row)}) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value) if isinstance(value, (dict, list)) else _json_value(value)
+            for value in row
+        ])
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_export(db: AsyncSession, stmt: Select, export_format: str) -> AsyncGenerator[bytes, None]:
+    """
+    Stream query results as NDJSON or CSV chunks.
+
+    Args:
+        db: Database session (kept open while the response streams)
+        stmt: Query from build_export_query()
+        export_format: "ndjson" or "csv"
+
+    Yields:
+        Encoded chunks of up to EXPORT_BATCH_SIZE rows
+    """
+    result = await db.stream(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    columns = list(result.keys())
+
+    try:
+        if export_format == "csv":
+            header = io.StringIO()
+            csv.writer(header).writerow(columns)
+            yield header.getvalue().encode("utf-8")
+
+        async for rows in result.partitions():
+            if export_format == "csv":
+                yield _csv_chunk(rows)
+            else:
+                yield _ndjson_chunk(columns, rows)
+    finally:
+        await result.close()
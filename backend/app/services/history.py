@@ -0,0 +1,226 @@
+"""
+Bounded conversation history for chat turns.
+
+Loads only the most recent messages of a conversation with an indexed
+ORDER BY created_at DESC LIMIT query, then trims them to a token budget.
+Limits are configured per service (ASKATT_HISTORY_* / ASKDOCS_HISTORY_*).
+Active conversations are served from the recent-history cache.
+
+With HISTORY_SUMMARIZE_OLDER enabled, up to HISTORY_SUMMARY_MESSAGES older
+messages that fall outside the window are condensed into one leading
+"system" message (an extractive summary: the start of each older turn),
+capped at HISTORY_SUMMARY_MAX_TOKENS.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.conversation import Conversation, Message
+from app.services.history_cache import CachedHistory, cached_message, history_cache
+from app.services.persistence import message_queue
+
+# Rough average for English text with GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+
+# Characters kept from each older turn in the summary
+SUMMARY_SNIPPET_CHARS = 200
+
+
+@dataclass(frozen=True)
+class HistoryLimits:
+    """Per-service history window."""
+    max_messages: int
+    max_tokens: int
+
+
+def history_limits(service_type: str) -> HistoryLimits:
+    """
+    Get the configured history window for a service.
+
+    Args:
+        service_type: "askatt" or "askdocs"
+
+    Returns:
+        HistoryLimits for the service
+    """
+    if service_type == "askdocs":
+        return HistoryLimits(settings.ASKDOCS_HISTORY_MAX_MESSAGES, settings.ASKDOCS_HISTORY_MAX_TOKENS)
+    return HistoryLimits(settings.ASKATT_HISTORY_MAX_MESSAGES, settings.ASKATT_HISTORY_MAX_TOKENS)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+
+    Args:
+        text: Message content
+
+    Returns:
+        Approximate number of tokens (at least 1)
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def trim_history(recent_first: list[dict], max_tokens: int) -> list[dict]:
+    """
+    Keep the newest messages that fit the token budget.
+
+    Args:
+        recent_first: Messages ({"role", "content"}) ordered newest first
+        max_tokens: Token budget for the kept messages
+
+    Returns:
+        Kept messages in chronological order
+    """
+    kept = []
+    used = 0
+
+    for message in recent_first:
+        used += estimate_tokens(message["content"])
+        if used > max_tokens:
+            break
+        kept.append(message)
+
+    kept.reverse()
+    return kept
+
+
+def summarize_messages(messages: list[dict], max_tokens: int) -> Optional[str]:
+    """
+    Build an extractive summary of older turns.
+
+    Args:
+        messages: Older messages in chronological order
+        max_tokens: Token budget for the summary
+
+    Returns:
+        Summary text, or None if nothing fits the budget
+    """
+    header = "Summary of earlier conversation:"
+    lines = []
+    budget = max_tokens * CHARS_PER_TOKEN - len(header)
+
+    for message in messages:
+        snippet = " ".join(message["content"].split())
+        if len(snippet) > SUMMARY_SNIPPET_CHARS:
+            snippet = snippet[:SUMMARY_SNIPPET_CHARS] + "..."
+        line = f"- {message['role']}: {snippet}"
+
+        if len(line) + 1 > budget:
+            break
+        lines.append(line)
+        budget -= len(line) + 1
+
+    if not lines:
+        return None
+    return "\n".join([header, *lines])
+
+
+async def recent_messages(db: AsyncSession, conversation: Conversation, count: int) -> list[dict]:
+    """
+    Get the newest messages of a conversation, from the history cache if possible.
+
+    On a cache miss (or an outdated cached window) the newest
+    HISTORY_CACHE_MAX_MESSAGES (at least count) are read with one indexed
+    query, completed with this worker's still-queued messages and stored
+    in the cache. With the cache disabled only count messages are read,
+    and queued messages are still included.
+
+    Args:
+        db: Database session
+        conversation: Conversation (ownership already checked)
+        count: Number of messages needed
+
+    Returns:
+        Up to count messages ({"role", "content", ...}) ordered newest first
+    """
+    conversation_id = conversation.id
+    cached = await history_cache.get(conversation_id, conversation.updated_at)
+    if cached and (cached.complete or len(cached.messages) >= count):
+        return cached.messages[::-1][:count]
+
+    # Taken before the query: a message written meanwhile is in one or the other
+    queued = message_queue.pending(conversation_id)
+
+    if settings.HISTORY_CACHE_ENABLED:
+        window = max(count, settings.HISTORY_CACHE_MAX_MESSAGES)
+    else:
+        window = count
+    stmt = (
+        select(Message.id, Message.role, Message.content, Message.metadata_, Message.created_at)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(window)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+    messages = [
+        cached_message(message_id, role, content, created_at, metadata)
+        for message_id, role, content, metadata, created_at in reversed(rows)
+    ]
+
+    # Queued messages are the newest; the window is current as of their write
+    read_ids = {row.id for row in rows}
+    version = conversation.updated_at
+    for message in queued:
+        if message.id not in read_ids:
+            messages.append(message.cached())
+            version = max(version, message.created_at)
+
+    if settings.HISTORY_CACHE_ENABLED:
+        await history_cache.fill(
+            conversation_id,
+            CachedHistory(messages=messages, complete=len(rows) < window, version=version)
+        )
+
+    return messages[::-1][:count]
+
+
+async def load_conversation_history(
+    db: AsyncSession,
+    conversation: Conversation,
+    service_type: str,
+    limits: Optional[HistoryLimits] = None
+) -> list[dict]:
+    """
+    Load the recent history of a conversation for the upstream request.
+
+    Served from the history cache when it holds enough messages; otherwise
+    uses the (conversation_id, created_at) index and reads at most
+    max_messages rows (plus HISTORY_SUMMARY_MESSAGES when summarizing).
+
+    Args:
+        db: Database session
+        conversation: Conversation (ownership already checked)
+        service_type: "askatt" or "askdocs" (selects the configured limits)
+        limits: Override the configured limits
+
+    Returns:
+        List of {"role", "content"} dicts in chronological order
+    """
+    limits = limits or history_limits(service_type)
+    if limits.max_messages <= 0:
+        return []
+
+    summarize = settings.HISTORY_SUMMARIZE_OLDER
+    fetch = limits.max_messages + (settings.HISTORY_SUMMARY_MESSAGES if summarize else 0)
+
+    recent_first = [
+        {"role": message["role"], "content": message["content"]}
+        for message in await recent_messages(db, conversation, fetch)
+    ]
+
+    window, older = recent_first[:limits.max_messages], recent_first[limits.max_messages:]
+    history = trim_history(window, limits.max_tokens)
+
+    if summarize:
+        # Messages dropped by the token budget are summarized along with those past the window
+        dropped = window[len(history):] + older
+        summary = summarize_messages(list(reversed(dropped)), settings.HISTORY_SUMMARY_MAX_TOKENS) if dropped else None
+        if summary:
+            history.insert(0, {"role": "system", "content": summary})
+
+    return history
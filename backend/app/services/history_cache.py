@@ -0,0 +1,402 @@
+"""
+Recent-history cache for active conversations.
+
+Keeps the newest HISTORY_CACHE_MAX_MESSAGES messages of each conversation so
+a user chatting back and forth does not reload the same rows on every turn.
+Entries are appended to in place when messages are saved (including
+messages still waiting in the write-behind queue) and dropped when the
+conversation is deleted.
+
+Each entry records whether it holds the conversation's complete history, so
+short conversations can also be served to the detail endpoint.
+
+Entries are versioned by the conversation's updated_at, which every message
+write sets to the message's created_at. A window is only served to a reader
+whose conversation row is not newer than the window, so messages saved
+through another worker (invisible to a per-worker memory cache) cause a
+reload instead of a stale read. Appends are read-modify-write operations
+made atomic by the backend: trivially in process memory, with a WATCH/MULTI
+transaction on Redis. (Two workers writing to one conversation at the same
+moment can still leave a memory-backend window a message short until it
+expires; the shared Redis window has no such gap.)
+
+Backends:
+- "memory": per-process LRU with TTL, bounded by HISTORY_CACHE_MAX_BYTES
+- "redis": any Redis-compatible server at HISTORY_CACHE_REDIS_URL, shared by
+  all uvicorn workers (requires the optional "redis" package)
+
+Cache errors are logged and treated as misses; the database stays the source
+of truth.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+from uuid import UUID
+import json
+import logging
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis backend needs the optional "redis" package
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import WatchError
+    REDIS_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    redis_asyncio = None
+    WatchError = None
+    REDIS_AVAILABLE = False
+
+
+@dataclass
+class CachedHistory:
+    """Newest messages of a conversation, oldest first."""
+    messages: list[dict] = field(default_factory=list)
+    complete: bool = False  # True if no older messages exist
+    version: Optional[datetime] = None  # Conversation updated_at the window is current as of
+
+    def to_bytes(self) -> bytes:
+        return json.dumps({
+            "complete": self.complete,
+            "version": self.version.isoformat() if self.version else None,
+            "messages": self.messages,
+        }).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedHistory":
+        value = json.loads(data)
+        version = datetime.fromisoformat(value["version"]) if value.get("version") else None
+        return cls(messages=value["messages"], complete=value["complete"], version=version)
+
+    def is_current(self, version: datetime) -> bool:
+        """True if no message newer than this window has been written."""
+        return self.version is not None and self.version >= version
+
+
+def cached_message(
+    message_id: UUID,
+    role: str,
+    content: str,
+    created_at: datetime,
+    metadata: Optional[dict] = None
+) -> dict:
+    """
+    Build the cached form of a message.
+
+    Args:
+        message_id: Message UUID
+        role: "user" or "assistant"
+        content: Message content
+        created_at: Message timestamp
+        metadata: Message metadata (token_usage, sources)
+
+    Returns:
+        JSON-serializable dict accepted by MessageResponse
+    """
+    metadata = metadata or {}
+    return {
+        "id": str(message_id),
+        "role": role,
+        "content": content,
+        "token_usage": metadata.get('token_usage'),
+        "sources": metadata.get('sources'),
+        "created_at": created_at.isoformat(),
+    }
+
+
+class HistoryCacheBackend(ABC):
+    """Byte-oriented key/value store with per-key TTL."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def update(self, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]], ttl: float) -> None:
+        """Atomically replace the value with fn(current value); fn returns None to leave it."""
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def aclose(self) -> None:
+        pass
+
+
+class MemoryHistoryBackend(HistoryCacheBackend):
+    """In-process LRU cache with TTL, bounded by total value size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._remove(key)
+        if len(value) > self.max_bytes:
+            return
+
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self.size += len(value)
+
+        # Evict least recently used entries until within the byte budget
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    async def update(self, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]], ttl: float) -> None:
+        # get and set never suspend, so no other task can run between them
+        value = fn(await self.get(key))
+        if value is not None:
+            await self.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisHistoryBackend(HistoryCacheBackend):
+    """Redis-compatible backend shared across worker processes."""
+
+    def __init__(self, url: str):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("HISTORY_CACHE_BACKEND=redis requires the 'redis' package")
+        self._client = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def update(self, key: str, fn: Callable[[Optional[bytes]], Optional[bytes]], ttl: float) -> None:
+        # Optimistic transaction: retried when another worker writes the key after WATCH
+        async with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    value = fn(await pipe.get(key))
+                    if value is None:
+                        await pipe.unwatch()
+                        return
+                    pipe.multi()
+                    pipe.set(key, value, px=int(ttl * 1000))
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class ConversationHistoryCache:
+    """Recent message windows keyed by conversation id."""
+
+    def __init__(self, backend: HistoryCacheBackend):
+        self.backend = backend
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "errors": 0}
+
+    @staticmethod
+    def _key(conversation_id: UUID) -> str:
+        return f"history:{conversation_id}"
+
+    @staticmethod
+    def _trimmed(history: CachedHistory) -> CachedHistory:
+        limit = settings.HISTORY_CACHE_MAX_MESSAGES
+        if len(history.messages) > limit:
+            return CachedHistory(messages=history.messages[-limit:], complete=False, version=history.version)
+        return history
+
+    async def get(self, conversation_id: UUID, version: datetime) -> Optional[CachedHistory]:
+        """
+        Get the cached window for a conversation.
+
+        Args:
+            conversation_id: Conversation UUID
+            version: The conversation's updated_at as just read from the database
+
+        Returns:
+            CachedHistory, or None on a miss or when the window is older than version
+        """
+        if not settings.HISTORY_CACHE_ENABLED:
+            return None
+
+        try:
+            data = await self.backend.get(self._key(conversation_id))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"History cache read failed: {str(e)}")
+            return None
+
+        if data is None:
+            self._stats["misses"] += 1
+            return None
+
+        history = CachedHistory.from_bytes(data)
+        if not history.is_current(version):
+            self._stats["stale"] += 1
+            return None
+
+        self._stats["hits"] += 1
+        return history
+
+    async def set(self, conversation_id: UUID, history: CachedHistory) -> None:
+        """
+        Store the window for a conversation (trimmed to HISTORY_CACHE_MAX_MESSAGES).
+
+        Args:
+            conversation_id: Conversation UUID
+            history: Messages oldest first, whether they are the complete history,
+                and the conversation updated_at they were read at
+        """
+        if not settings.HISTORY_CACHE_ENABLED:
+            return
+
+        try:
+            await self.backend.set(
+                self._key(conversation_id),
+                self._trimmed(history).to_bytes(),
+                settings.HISTORY_CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"History cache write failed: {str(e)}")
+
+    async def fill(self, conversation_id: UUID, history: CachedHistory) -> None:
+        """
+        Store a window read from the database unless a window at least as new is cached.
+
+        A read that missed can finish after a write appended to a window
+        stored meanwhile; that window (which may hold messages not yet
+        written) is kept rather than replaced by the older snapshot.
+
+        Args:
+            conversation_id: Conversation UUID
+            history: Messages oldest first, whether they are the complete history,
+                and the conversation updated_at they were read at
+        """
+        if not settings.HISTORY_CACHE_ENABLED:
+            return
+
+        value = self._trimmed(history).to_bytes()
+
+        def filled(data: Optional[bytes]) -> Optional[bytes]:
+            if data is not None and CachedHistory.from_bytes(data).is_current(history.version):
+                return None
+            return value
+
+        try:
+            await self.backend.update(self._key(conversation_id), filled, settings.HISTORY_CACHE_TTL_SECONDS)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"History cache write failed: {str(e)}")
+
+    async def append(self, conversation_id: UUID, message: dict) -> None:
+        """
+        Append a newly saved message to a cached window, if one exists.
+
+        The window's version moves up to the message's created_at, which
+        is what the write sets the conversation's updated_at to.
+
+        Args:
+            conversation_id: Conversation UUID
+            message: Message built with cached_message()
+        """
+        if not settings.HISTORY_CACHE_ENABLED:
+            return
+
+        created_at = datetime.fromisoformat(message["created_at"])
+
+        def appended(data: Optional[bytes]) -> Optional[bytes]:
+            # Nothing cached: the next read loads the window from the database
+            if data is None:
+                return None
+
+            history = CachedHistory.from_bytes(data)
+            history.messages.append(message)
+            if history.version is not None:
+                history.version = max(history.version, created_at)
+            return self._trimmed(history).to_bytes()
+
+        try:
+            await self.backend.update(self._key(conversation_id), appended, settings.HISTORY_CACHE_TTL_SECONDS)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"History cache append failed: {str(e)}")
+
+    async def invalidate(self, conversation_id: UUID) -> None:
+        """
+        Drop the cached window for a conversation.
+
+        Args:
+            conversation_id: Conversation UUID
+        """
+        try:
+            await self.backend.delete(self._key(conversation_id))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"History cache delete failed: {str(e)}")
+
+    async def aclose(self) -> None:
+        """Close the backend connection (called from lifespan)."""
+        await self.backend.aclose()
+
+    def get_stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict with hits, misses, stale (outdated windows not served),
+            errors and the backend name
+        """
+        return {**self._stats, "backend": settings.HISTORY_CACHE_BACKEND}
+
+
+def create_history_backend() -> HistoryCacheBackend:
+    """
+    Create the backend selected by HISTORY_CACHE_BACKEND.
+
+    Returns:
+        MemoryHistoryBackend or RedisHistoryBackend
+    """
+    if settings.HISTORY_CACHE_BACKEND == "redis":
+        return RedisHistoryBackend(settings.HISTORY_CACHE_REDIS_URL)
+    return MemoryHistoryBackend(settings.HISTORY_CACHE_MAX_BYTES)
+
+
+# Global history cache instance
+history_cache = ConversationHistoryCache(create_history_backend())
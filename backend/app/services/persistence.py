@@ -0,0 +1,392 @@
+"""
+Write-behind persistence for chat messages.
+
+Assistant messages (with their token usage log and daily usage rollups) are
+queued once the response has been streamed and written by a background
+worker in batches, so the SSE stream can close without waiting on the
+database. Batches are flushed when
+PERSIST_BATCH_SIZE messages are pending or PERSIST_FLUSH_INTERVAL_MS after
+the first queued message, whichever comes first.
+
+Durability semantics:
+- Message ids are generated at enqueue time, so a queued message has a
+  stable id before it reaches the database.
+- Graceful shutdown (lifespan) stops accepting new messages and drains the
+  queue, waiting up to PERSIST_DRAIN_TIMEOUT_SECONDS.
+- A hard crash (SIGKILL, OOM) loses messages still in the queue: at most
+  PERSIST_QUEUE_MAXSIZE messages, normally only those from the last flush
+  interval. Set PERSIST_WRITE_BEHIND_ENABLED=false to write synchronously.
+- A failed batch is retried with backoff, then written one message at a time
+  so a single bad row (e.g. its conversation was deleted) cannot drop the
+  rest. Messages that still fail are logged at ERROR and discarded.
+
+Backpressure: when the queue is full, enqueue waits up to
+PERSIST_ENQUEUE_TIMEOUT_MS for space and then writes the message directly
+with the caller's session. Nothing is dropped; the caller just pays the
+synchronous write, as before.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+import asyncio
+import logging
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session_factory
+from app.models.conversation import Conversation, Message
+from app.models.feedback import TokenUsageLog
+from app.services.history_cache import cached_message, history_cache
+from app.services.usage import rollup_increments, upsert_usage_rollups
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingMessage:
+    """A message waiting to be written."""
+    conversation_id: UUID
+    role: str
+    content: str
+    user_id: Optional[UUID] = None
+    service_type: Optional[str] = None
+    configuration_id: Optional[UUID] = None
+    model_name: Optional[str] = None
+    token_usage: Optional[dict] = None
+    sources: Optional[list[dict]] = None
+    cache: Optional[dict] = None  # Answer cache hit details
+    new_conversation: bool = False  # First reply of a conversation started this turn
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def message_row(self) -> dict:
+        """Column values for the messages table."""
+        metadata = {}
+        if self.token_usage:
+            metadata['token_usage'] = self.token_usage
+        if self.sources:
+            metadata['sources'] = self.sources
+        if self.cache:
+            metadata['cache'] = self.cache
+
+        token_count = None
+        if self.token_usage and 'total_tokens' in self.token_usage:
+            token_count = self.token_usage['total_tokens']
+
+        return {
+            "id": self.id,
+            "conversation_id": self.conversation_id,
+            "role": self.role,
+            "content": self.content,
+            "token_count": token_count,
+            "metadata_": metadata if metadata else None,
+            "created_at": self.created_at,
+        }
+
+    def cached(self) -> dict:
+        """The message as kept in the history cache."""
+        return cached_message(self.id, self.role, self.content, self.created_at, self.message_row()["metadata_"])
+
+    def token_usage_row(self) -> Optional[dict]:
+        """Column values for token_usage_log (every assistant message), or None."""
+        if self.role != "assistant" or self.user_id is None:
+            return None
+
+        usage = self.token_usage or {}
+        return {
+            "id": uuid4(),
+            "user_id": self.user_id,
+            "conversation_id": self.conversation_id,
+            "message_id": self.id,
+            "service_type": self.service_type or "unknown",
+            "configuration_id": self.configuration_id,
+            "model_name": self.model_name or "unknown",
+            "prompt_tokens": usage.get('prompt_tokens', 0),
+            "completion_tokens": usage.get('completion_tokens', 0),
+            "total_tokens": usage.get('total_tokens', 0),
+            "created_at": self.created_at,
+        }
+
+
+async def write_messages(db: AsyncSession, messages: list[PendingMessage]) -> None:
+    """
+    Insert messages, their token usage and usage rollups in one transaction.
+
+    Uses multi-row inserts and one executemany UPDATE of the conversations'
+    updated_at, instead of a select/flush/commit/refresh per message. Each
+    conversation's updated_at becomes its newest message's created_at, the
+    version the history cache compares against.
+
+    Args:
+        db: Database session
+        messages: Messages to write
+    """
+    if not messages:
+        return
+
+    await db.execute(insert(Message), [message.message_row() for message in messages])
+
+    usage_rows = [row for row in (message.token_usage_row() for message in messages) if row]
+    if usage_rows:
+        await db.execute(insert(TokenUsageLog), usage_rows)
+
+        new_conversation_ids = {message.conversation_id for message in messages if message.new_conversation}
+        await upsert_usage_rollups(db, rollup_increments(usage_rows, new_conversation_ids))
+
+    updated_at: dict[UUID, datetime] = {}
+    for message in messages:
+        if message.created_at > updated_at.get(message.conversation_id, datetime.min):
+            updated_at[message.conversation_id] = message.created_at
+    conversations = Conversation.__table__
+    await db.execute(
+        update(conversations)
+        .where(conversations.c.id == bindparam("conversation_id"))
+        .values(updated_at=bindparam("newest_created_at")),
+        [
+            {"conversation_id": conversation_id, "newest_created_at": value}
+            for conversation_id, value in updated_at.items()
+        ]
+    )
+
+    await db.commit()
+
+
+# Marks the end of the queue on shutdown
+_STOP = object()
+
+
+class MessageWriteBehindQueue:
+    """Bounded queue of pending messages drained by one batching worker."""
+
+    def __init__(self, session_factory: async_sessionmaker = async_session_factory):
+        self._session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Queued messages by conversation, until their write succeeds or is given up
+        self._pending: dict[UUID, list[PendingMessage]] = {}
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "direct_writes": 0,
+            "retries": 0,
+            "failed": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """True while the worker is accepting messages."""
+        return self._worker is not None
+
+    def start(self) -> None:
+        """Start the background worker (called from lifespan)."""
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue(maxsize=settings.PERSIST_QUEUE_MAXSIZE)
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Message write-behind queue started "
+            f"(batch={settings.PERSIST_BATCH_SIZE}, interval={settings.PERSIST_FLUSH_INTERVAL_MS}ms)"
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop accepting messages and drain the queue.
+
+        Messages still queued after PERSIST_DRAIN_TIMEOUT_SECONDS are lost
+        and logged.
+        """
+        if not self.running:
+            return
+
+        worker, queue = self._worker, self._queue
+        self._worker = None
+
+        await queue.put(_STOP)
+        try:
+            await asyncio.wait_for(worker, settings.PERSIST_DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            lost = queue.qsize()
+            self._stats["failed"] += lost
+            logger.error(f"Message queue drain timed out; {lost} queued messages were not written")
+        else:
+            # Messages put by callers that were waiting on a full queue during stop
+            leftovers = []
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not _STOP:
+                    leftovers.append(item)
+            if leftovers:
+                await self._flush(leftovers)
+
+        logger.info(f"Message write-behind queue stopped: {self.get_stats()}")
+
+    async def enqueue(self, db: AsyncSession, message: PendingMessage) -> None:
+        """
+        Queue a message for writing, or write it now if the queue is unavailable.
+
+        Writes directly with the caller's session when the worker is not
+        running or the queue stays full for PERSIST_ENQUEUE_TIMEOUT_MS.
+
+        Args:
+            db: Caller's database session (used for direct writes)
+            message: Message to persist
+        """
+        if self.running:
+            # Tracked before the put so the worker can never write it untracked
+            self._pending.setdefault(message.conversation_id, []).append(message)
+            try:
+                await asyncio.wait_for(
+                    self._queue.put(message),
+                    settings.PERSIST_ENQUEUE_TIMEOUT_MS / 1000
+                )
+                self._stats["enqueued"] += 1
+                return
+            except asyncio.TimeoutError:
+                self._forget([message])
+                logger.warning("Message queue full; writing message synchronously")
+
+        self._stats["direct_writes"] += 1
+        await write_messages(db, [message])
+
+    async def _run(self) -> None:
+        """Collect messages into batches and write them until stopped."""
+        loop = asyncio.get_running_loop()
+        interval = settings.PERSIST_FLUSH_INTERVAL_MS / 1000
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + interval
+
+            while len(batch) < settings.PERSIST_BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    def pending(self, conversation_id: UUID) -> list[PendingMessage]:
+        """
+        Get a conversation's messages still waiting in this worker's queue.
+
+        Args:
+            conversation_id: Conversation UUID
+
+        Returns:
+            Queued messages, oldest first
+        """
+        return list(self._pending.get(conversation_id, ()))
+
+    def _forget(self, batch: list[PendingMessage]) -> None:
+        """Stop tracking messages that were written or dropped."""
+        for message in batch:
+            queued = self._pending.get(message.conversation_id)
+            if queued is None:
+                continue
+            queued[:] = [item for item in queued if item is not message]
+            if not queued:
+                del self._pending[message.conversation_id]
+
+    async def _flush(self, batch: list[PendingMessage]) -> None:
+        """Write a batch, then stop tracking its messages as pending."""
+        try:
+            await self._write_with_retries(batch)
+        finally:
+            self._forget(batch)
+
+    async def _write_with_retries(self, batch: list[PendingMessage]) -> None:
+        """Write a batch, retrying with backoff, then one message at a time."""
+        for attempt in range(settings.PERSIST_MAX_RETRIES + 1):
+            if await self._write(batch):
+                self._stats["batches"] += 1
+                self._stats["written"] += len(batch)
+                return
+
+            if attempt < settings.PERSIST_MAX_RETRIES:
+                self._stats["retries"] += 1
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+        if len(batch) == 1:
+            self._record_failure(batch[0])
+            return
+
+        for message in batch:
+            if await self._write([message]):
+                self._stats["written"] += 1
+            else:
+                self._record_failure(message)
+
+    async def _write(self, batch: list[PendingMessage]) -> bool:
+        """Write a batch in its own session; returns False on error."""
+        try:
+            async with self._session_factory() as session:
+                await write_messages(session, batch)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to write {len(batch)} queued messages: {str(e)}")
+            return False
+
+    def _record_failure(self, message: PendingMessage) -> None:
+        """Log a message that could not be written."""
+        self._stats["failed"] += 1
+        logger.error(
+            f"Dropping message {message.id} for conversation {message.conversation_id} "
+            f"(role={message.role}, {len(message.content)} chars) after repeated write failures"
+        )
+
+    def get_stats(self) -> dict:
+        """
+        Get queue counters.
+
+        Returns:
+            Dict with enqueued, written, batches, direct_writes, retries,
+            failed, the current queue depth and whether the worker is running
+        """
+        return {
+            **self._stats,
+            "queue_depth": self._queue.qsize() if self.running else 0,
+            "running": self.running,
+        }
+
+
+# Global write-behind queue instance
+message_queue = MessageWriteBehindQueue()
+
+
+async def persist_message(db: AsyncSession, message: PendingMessage) -> None:
+    """
+    Persist a message through the write-behind queue when enabled, and
+    append it to the conversation's cached history.
+
+    Args:
+        db: Caller's database session
+        message: Message to persist
+    """
+    if settings.PERSIST_WRITE_BEHIND_ENABLED:
+        await message_queue.enqueue(db, message)
+    else:
+        await write_messages(db, [message])
+
+    # The cache sees the message immediately, even while it is still queued
+    await history_cache.append(message.conversation_id, message.cached())
@@ -0,0 +1,285 @@
+"""
+Full-text search over the caller's message history and conversation titles.
+
+PostgreSQL matches the generated messages.search_vector and
+conversations.search_vector columns (GIN indexed) against
+websearch_to_tsquery, ranks with ts_rank and builds snippets with
+ts_headline. ts_headline re-parses the document, so it runs only on the
+returned page. SQLite (tests) uses the FTS5 stand-in tables with bm25 and
+snippet(); its query syntax is simplified to "all words must match".
+
+Message hits and title hits are ranked separately and merged. Results are
+ordered by (rank, id) descending and paginated with a keyset cursor on that
+pair, so later pages never re-rank or skip rows that were already returned.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+import base64
+
+from sqlalchemy import Select, and_, cast, column, func, literal_column, null, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import ValidationError
+from app.models.conversation import SEARCH_TEXT_CONFIG, Conversation, Message
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+
+# ts_headline options (PostgreSQL); FTS5 snippets are cut to SNIPPET_TOKENS tokens
+HEADLINE_OPTIONS = f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=30, MinWords=12, MaxFragments=2"
+SNIPPET_TOKENS = 24
+
+# Unmapped generated / virtual tables (see app.models.conversation)
+_messages_search_vector = literal_column("messages.search_vector")
+_conversations_search_vector = literal_column("conversations.search_vector")
+_messages_fts = table("messages_fts", column("rowid"))
+_conversations_fts = table("conversations_fts", column("rowid"))
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """One search result: a matching message, or a conversation whose title matches."""
+    id: UUID
+    conversation_id: UUID
+    conversation_title: Optional[str]
+    service_type: str
+    message_id: Optional[UUID]
+    role: Optional[str]
+    snippet: str
+    rank: float
+    created_at: datetime
+
+
+def encode_search_cursor(rank: float, hit_id: UUID) -> str:
+    """
+    Encode a keyset cursor after the given hit.
+
+    Args:
+        rank: Rank of the last hit on the page
+        hit_id: id of the last hit on the page
+
+    Returns:
+        Opaque URL-safe cursor string
+    """
+    raw = f"{rank!r}|{hit_id.hex}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, UUID]:
+    """
+    Decode a cursor produced by encode_search_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (rank, hit_id)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        rank, hit_id = raw.split("|", 1)
+        return float(rank), UUID(hex=hit_id)
+    except ValueError:
+        raise ValidationError("Invalid search cursor")
+
+
+def fts5_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query where every word must match.
+
+    Words are quoted, so FTS5 operators and punctuation in the input are
+    treated as text rather than query syntax.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def _after_cursor(ranked, cursor: Optional[tuple[float, UUID]]):
+    if cursor is None:
+        return True
+    rank, hit_id = cursor
+    return or_(ranked.c.rank < rank, and_(ranked.c.rank == rank, ranked.c.id < hit_id))
+
+
+def _page(ranked, cursor: Optional[tuple[float, UUID]], limit: int) -> Select:
+    return (
+        select(ranked)
+        .where(_after_cursor(ranked, cursor))
+        .order_by(ranked.c.rank.desc(), ranked.c.id.desc())
+        .limit(limit)
+    )
+
+
+def _postgresql_queries(
+    query: str,
+    user_id: UUID,
+    service_type: Optional[str],
+    cursor: Optional[tuple[float, UUID]],
+    limit: int
+) -> list[Select]:
+    tsquery = func.websearch_to_tsquery(SEARCH_TEXT_CONFIG, query)
+
+    messages = (
+        select(
+            Message.id.label("id"),
+            Message.conversation_id.label("conversation_id"),
+            Conversation.title.label("conversation_title"),
+            Conversation.service_type.label("service_type"),
+            Message.id.label("message_id"),
+            Message.role.label("role"),
+            Message.content.label("document"),
+            func.ts_rank(_messages_search_vector, tsquery).label("rank"),
+            Message.created_at.label("created_at"),
+        )
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(Conversation.user_id == user_id, _messages_search_vector.op("@@")(tsquery))
+    )
+
+    titles = (
+        select(
+            Conversation.id.label("id"),
+            Conversation.id.label("conversation_id"),
+            Conversation.title.label("conversation_title"),
+            Conversation.service_type.label("service_type"),
+            cast(null(), Message.id.type).label("message_id"),
+            cast(null(), Message.role.type).label("role"),
+            Conversation.title.label("document"),
+            func.ts_rank(_conversations_search_vector, tsquery).label("rank"),
+            Conversation.created_at.label("created_at"),
+        )
+        .where(Conversation.user_id == user_id, _conversations_search_vector.op("@@")(tsquery))
+    )
+
+    statements = []
+    for stmt in (messages, titles):
+        if service_type:
+            stmt = stmt.where(Conversation.service_type == service_type)
+
+        # Headlines for the page only
+        page = _page(stmt.subquery(), cursor, limit).subquery()
+        statements.append(
+            select(
+                *(c for c in page.c if c.key != "document"),
+                func.ts_headline(SEARCH_TEXT_CONFIG, page.c.document, tsquery, HEADLINE_OPTIONS).label("snippet"),
+            ).order_by(page.c.rank.desc(), page.c.id.desc())
+        )
+    return statements
+
+
+def _sqlite_queries(
+    query: str,
+    user_id: UUID,
+    service_type: Optional[str],
+    cursor: Optional[tuple[float, UUID]],
+    limit: int
+) -> list[Select]:
+    match = fts5_query(query)
+
+    def snippet(fts_table: str):
+        return func.snippet(literal_column(fts_table), 0, SNIPPET_START, SNIPPET_STOP, "…", SNIPPET_TOKENS)
+
+    def rank(fts_table: str):
+        # bm25 is lower-is-better; negate so both backends sort rank descending
+        return (-func.bm25(literal_column(fts_table))).label("rank")
+
+    messages = (
+        select(
+            Message.id.label("id"),
+            Message.conversation_id.label("conversation_id"),
+            Conversation.title.label("conversation_title"),
+            Conversation.service_type.label("service_type"),
+            Message.id.label("message_id"),
+            Message.role.label("role"),
+            snippet("messages_fts").label("snippet"),
+            rank("messages_fts"),
+            Message.created_at.label("created_at"),
+        )
+        .select_from(_messages_fts)
+        .join(Message, literal_column("messages.rowid") == _messages_fts.c.rowid)
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(Conversation.user_id == user_id, literal_column("messages_fts").op("MATCH")(match))
+    )
+
+    titles = (
+        select(
+            Conversation.id.label("id"),
+            Conversation.id.label("conversation_id"),
+            Conversation.title.label("conversation_title"),
+            Conversation.service_type.label("service_type"),
+            cast(null(), Message.id.type).label("message_id"),
+            cast(null(), Message.role.type).label("role"),
+            snippet("conversations_fts").label("snippet"),
+            rank("conversations_fts"),
+            Conversation.created_at.label("created_at"),
+        )
+        .select_from(_conversations_fts)
+        .join(Conversation, literal_column("conversations.rowid") == _conversations_fts.c.rowid)
+        .where(Conversation.user_id == user_id, literal_column("conversations_fts").op("MATCH")(match))
+    )
+
+    statements = []
+    for stmt in (messages, titles):
+        if service_type:
+            stmt = stmt.where(Conversation.service_type == service_type)
+        statements.append(_page(stmt.subquery(), cursor, limit))
+    return statements
+
+
+async def search_history(
+    db: AsyncSession,
+    user_id: UUID,
+    query: str,
+    service_type: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> tuple[list[SearchHit], Optional[str]]:
+    """
+    Search a user's messages and conversation titles.
+
+    Args:
+        db: Database session
+        user_id: Only this user's conversations are searched
+        query: Search text (PostgreSQL accepts web search syntax:
+            "quoted phrases", OR, -excluded)
+        service_type: Filter by "askatt" or "askdocs" (optional)
+        limit: Maximum hits to return
+        cursor: Keyset cursor from a previous page
+
+    Returns:
+        Tuple of (hits ordered by rank, next page cursor or None)
+
+    Raises:
+        ValidationError: If the query is empty, the cursor is malformed or
+            the database has no full-text search support
+    """
+    if not query.strip():
+        raise ValidationError("Search query must not be empty")
+
+    position = decode_search_cursor(cursor) if cursor else None
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statements = _postgresql_queries(query, user_id, service_type, position, limit + 1)
+    elif dialect == "sqlite":
+        statements = _sqlite_queries(query, user_id, service_type, position, limit + 1)
+    else:
+        raise ValidationError(f"Full-text search is not supported on {dialect}")
+
+    hits = []
+    for stmt in statements:
+        result = await db.execute(stmt)
+        hits.extend(SearchHit(**row._mapping) for row in result)
+
+    # Both lists are sorted by (rank, id) desc and already past the cursor
+    hits.sort(key=lambda hit: (hit.rank, hit.id), reverse=True)
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_search_cursor(hits[-1].rank, hits[-1].id)
+
+    return hits, next_cursor
@@ -0,0 +1,134 @@
+"""
+Single-flight coalescing of identical in-flight upstream streams.
+
+When many users ask the same standalone AskDocs question at once (typically
+during an incident), only the first request (the leader) starts an upstream
+call. Requests that arrive while it is running (followers) subscribe to the
+same flight: every subscriber receives all events from the beginning, then
+new events as they arrive.
+
+The upstream stream runs in its own task. A subscriber that disconnects only
+stops reading; the shared call continues for the others and still completes
+(so its answer reaches the answer cache) even if every subscriber has left.
+A flight is removed when its stream ends, so later requests start a new one
+or are served from the answer cache.
+"""
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, AsyncIterator, Callable, Hashable
+import asyncio
+import logging
+
+from app.services.stream_events import ErrorEvent, StreamEvent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Flight:
+    events: list[StreamEvent] = field(default_factory=list)
+    done: bool = False
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    subscribers: int = 0
+    task: asyncio.Task | None = None
+
+    def publish(self, event: StreamEvent) -> None:
+        self.events.append(event)
+        self._notify()
+
+    def finish(self) -> None:
+        self.done = True
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake current waiters; later waiters wait on the fresh event
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+@dataclass(slots=True)
+class Subscription:
+    """A request's view of a (possibly shared) upstream stream."""
+    flight: _Flight
+    leader: bool
+
+    async def events(self) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Yield every event of the flight, from the first, until it ends.
+
+        Closing this generator unsubscribes without affecting the flight.
+        """
+        self.flight.subscribers += 1
+        index = 0
+        try:
+            while True:
+                changed = self.flight.changed
+                if index < len(self.flight.events):
+                    event = self.flight.events[index]
+                    index += 1
+                    yield event
+                    continue
+                if self.flight.done:
+                    return
+                await changed.wait()
+        finally:
+            self.flight.subscribers -= 1
+
+
+class SingleFlight:
+    """Shares one upstream stream among concurrent requests with the same key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: dict[Hashable, _Flight] = {}
+        self._stats = {"leaders": 0, "followers": 0, "errors": 0}
+
+    def join(self, key: Hashable, start: Callable[[], AsyncIterator[StreamEvent]]) -> Subscription:
+        """
+        Subscribe to the in-flight stream for a key, starting it if there is none.
+
+        Args:
+            key: Identifies identical requests
+            start: Creates the upstream stream (called only by the leader)
+
+        Returns:
+            Subscription; iterate subscription.events()
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self._stats["followers"] += 1
+            return Subscription(flight=flight, leader=False)
+
+        flight = self._flights[key] = _Flight()
+        flight.task = asyncio.create_task(self._run(key, flight, start()))
+        self._stats["leaders"] += 1
+        return Subscription(flight=flight, leader=True)
+
+    async def _run(self, key: Hashable, flight: _Flight, events: AsyncIterator[StreamEvent]) -> None:
+        try:
+            async for event in events:
+                flight.publish(event)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Shared {self.name} request failed: {str(e)}")
+            flight.publish(ErrorEvent(f"{self.name} request failed"))
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.finish()
+
+    def get_stats(self) -> dict:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dict with leaders, followers, errors, in-flight streams and their subscribers
+        """
+        return {
+            **self._stats,
+            "in_flight": len(self._flights),
+            "subscribers": sum(flight.subscribers for flight in self._flights.values()),
+        }
+
+
+# Global AskDocs request coalescing instance
+askdocs_flights = SingleFlight("AskDocs")
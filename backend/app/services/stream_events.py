@@ -0,0 +1,145 @@
+"""
+Typed chat stream events.
+
+Chat services yield these objects instead of pre-serialized SSE strings.
+The chat endpoints accumulate the assistant message from them directly and
+serialize each event exactly once, at the edge, with serialize_event().
+
+Wire format (unchanged for the frontend):
+    data: {"type": "token", "content": "..."}\\n\\n
+"""
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, AsyncIterator, Optional, Union
+import json
+import time
+
+from app.core.metrics import SSE_STREAM_DURATION, SSE_TIME_TO_FIRST_TOKEN
+
+
+@dataclass(slots=True)
+class TokenEvent:
+    """A chunk of assistant text."""
+    content: str
+
+    def to_dict(self) -> dict:
+        return {"type": "token", "content": self.content}
+
+
+@dataclass(slots=True)
+class UsageEvent:
+    """Token usage for the response (prompt/completion/total tokens)."""
+    usage: dict
+
+    def to_dict(self) -> dict:
+        return {"type": "usage", "usage": self.usage}
+
+
+@dataclass(slots=True)
+class SourcesEvent:
+    """Source attribution for RAG responses (list of {title, url})."""
+    sources: list[dict]
+
+    def to_dict(self) -> dict:
+        return {"type": "sources", "sources": self.sources}
+
+
+@dataclass(slots=True)
+class ErrorEvent:
+    """A terminal error; no further events follow."""
+    content: str
+    retry_after: Optional[int] = None  # Seconds, when the client should retry later
+
+    def to_dict(self) -> dict:
+        if self.retry_after is not None:
+            return {"type": "error", "content": self.content, "retry_after": self.retry_after}
+        return {"type": "error", "content": self.content}
+
+
+@dataclass(slots=True)
+class EndEvent:
+    """Successful end of the response."""
+
+    def to_dict(self) -> dict:
+        return {"type": "end"}
+
+
+@dataclass(slots=True)
+class ConversationIdEvent:
+    """Id of a newly created conversation, sent before the response."""
+    conversation_id: str
+
+    def to_dict(self) -> dict:
+        return {"type": "conversation_id", "conversation_id": self.conversation_id}
+
+
+StreamEvent = Union[TokenEvent, UsageEvent, SourcesEvent, ErrorEvent, EndEvent, ConversationIdEvent]
+
+
+def serialize_event(event: StreamEvent) -> str:
+    """
+    Serialize an event as one SSE frame.
+
+    Args:
+        event: Stream event
+
+    Returns:
+        SSE-formatted string: data: {json}\\n\\n
+    """
+    return f"data: {json.dumps(event.to_dict(), separators=(',', ':'))}\n\n"
+
+
+async def serialize_stream(
+    events: AsyncIterator[StreamEvent],
+    service: Optional[str] = None
+) -> AsyncGenerator[str, None]:
+    """
+    Serialize a stream of events into SSE frames for StreamingResponse.
+
+    Args:
+        events: Stream events
+        service: Service label for the time-to-first-token and stream duration
+            metrics; None records nothing
+
+    Yields:
+        SSE-formatted strings
+    """
+    if service is None:
+        async for event in events:
+            yield serialize_event(event)
+        return
+
+    started = time.perf_counter()
+    first_token = True
+    try:
+        async for event in events:
+            if first_token and isinstance(event, TokenEvent):
+                first_token = False
+                SSE_TIME_TO_FIRST_TOKEN.labels(service).observe(time.perf_counter() - started)
+            yield serialize_event(event)
+    finally:
+        SSE_STREAM_DURATION.labels(service).observe(time.perf_counter() - started)
+
+
+@dataclass
+class MessageAccumulator:
+    """Builds the final assistant message from stream events."""
+    parts: list[str] = field(default_factory=list)
+    usage: Optional[dict] = None
+    sources: Optional[list[dict]] = None
+    error: Optional[str] = None
+
+    def add(self, event: StreamEvent) -> None:
+        """Record one event."""
+        if isinstance(event, TokenEvent):
+            self.parts.append(event.content)
+        elif isinstance(event, UsageEvent):
+            self.usage = event.usage
+        elif isinstance(event, SourcesEvent):
+            self.sources = event.sources
+        elif isinstance(event, ErrorEvent):
+            self.error = event.content
+
+    @property
+    def content(self) -> str:
+        """The full assistant message text."""
+        return "".join(self.parts)
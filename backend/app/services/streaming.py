@@ -0,0 +1,162 @@
+"""
+Stream helpers shared by the chat endpoints.
+
+The upstream services emit one TokenEvent per character (or per small
+delta). coalesce_token_frames merges consecutive token events into a single
+TokenEvent, flushed when the buffered text reaches SSE_COALESCE_MAX_BYTES
+or SSE_COALESCE_WINDOW_MS after the first buffered token, whichever comes
+first. The event schema is unchanged, so clients simply append larger chunks.
+"""
+from dataclasses import dataclass
+from typing import AsyncGenerator, AsyncIterator, Optional
+import asyncio
+import logging
+
+from app.config import settings
+from app.services.stream_events import StreamEvent, TokenEvent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CoalesceStats:
+    """Event counts before and after coalescing."""
+    frames_in: int = 0
+    frames_out: int = 0
+
+    @property
+    def frames_saved(self) -> int:
+        return self.frames_in - self.frames_out
+
+
+# Marks the end of the source stream in the pump queue
+_END_OF_STREAM = object()
+
+
+async def _pump(iterator: AsyncIterator[StreamEvent], queue: asyncio.Queue) -> None:
+    """Copy events from the source stream into the queue, then the end marker."""
+    try:
+        async for event in iterator:
+            await queue.put(event)
+    except Exception as exc:
+        await queue.put(exc)
+        return
+    await queue.put(_END_OF_STREAM)
+
+
+async def coalesce_token_frames(
+    events: AsyncIterator[StreamEvent],
+    max_bytes: Optional[int] = None,
+    window_ms: Optional[float] = None,
+    stats: Optional[CoalesceStats] = None
+) -> AsyncGenerator[StreamEvent, None]:
+    """
+    Merge consecutive token events into fewer, larger token events.
+
+    The source is drained by one pump task into a queue, so events that are
+    already available are taken without waiting and the time window only
+    needs a timer while the source is idle.
+
+    Args:
+        events: Stream events from a chat service
+        max_bytes: Flush once this many UTF-8 bytes of token text are buffered
+        window_ms: Flush this many milliseconds after the first buffered token
+        stats: Optional stats object updated with event counts
+
+    Yields:
+        Stream events; non-token events pass through unchanged and in order
+    """
+    max_bytes = settings.SSE_COALESCE_MAX_BYTES if max_bytes is None else max_bytes
+    window = (settings.SSE_COALESCE_WINDOW_MS if window_ms is None else window_ms) / 1000
+    stats = stats if stats is not None else CoalesceStats()
+
+    loop = asyncio.get_running_loop()
+    iterator = events.__aiter__()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SSE_COALESCE_QUEUE_SIZE)
+    pump = asyncio.create_task(_pump(iterator, queue))
+
+    buffer: list[str] = []
+    buffered_bytes = 0
+    deadline = 0.0
+
+    def flush() -> TokenEvent:
+        nonlocal buffered_bytes
+        event = TokenEvent("".join(buffer))
+        buffer.clear()
+        buffered_bytes = 0
+        stats.frames_out += 1
+        return event
+
+    try:
+        while True:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                if not buffer:
+                    item = await queue.get()
+                else:
+                    # Source is idle: wait only until the window closes
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        yield flush()
+                        continue
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        yield flush()
+                        continue
+
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            stats.frames_in += 1
+
+            if type(item) is TokenEvent:
+                if not buffer:
+                    deadline = loop.time() + window
+                buffer.append(item.content)
+                buffered_bytes += len(item.content.encode())
+
+                if buffered_bytes >= max_bytes or loop.time() >= deadline:
+                    yield flush()
+                continue
+
+            # Any other event flushes pending tokens first to preserve ordering
+            if buffer:
+                yield flush()
+            stats.frames_out += 1
+            yield item
+
+        if buffer:
+            yield flush()
+
+    finally:
+        if not pump.done():
+            pump.cancel()
+        try:
+            await pump
+        except (asyncio.CancelledError, Exception):
+            pass
+
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+        logger.debug(f"SSE coalescing: {stats.frames_in} -> {stats.frames_out} events")
+
+
+def coalesce_if_enabled(events: AsyncIterator[StreamEvent]) -> AsyncIterator[StreamEvent]:
+    """
+    Apply coalesce_token_frames when SSE_COALESCE_ENABLED is set.
+
+    Args:
+        events: Stream events from a chat service
+
+    Returns:
+        The coalesced stream, or the original stream when disabled
+    """
+    if not settings.SSE_COALESCE_ENABLED:
+        return events
+    return coalesce_token_frames(events)
@@ -0,0 +1,159 @@
+"""
+Daily token usage rollups.
+
+Every assistant message gets a token_usage_log row, written by
+persistence.write_messages. The same transaction adds the message to its
+usage_daily_rollups row, keyed by (UTC day, user, service, configuration,
+model). The admin usage statistics endpoint sums rollup rows. That is at
+most days x active users x services x models rows; the messages table is
+never scanned.
+
+Rollup ids are uuid5 of the grouping key, so an increment is an upsert on
+the primary key (ON CONFLICT works the same on PostgreSQL and SQLite, and a
+NULL configuration needs no special unique index). Because rollups are
+written in the message's transaction, a retried batch cannot count twice.
+
+What is counted:
+- message_count: each assistant reply completes one exchange, the user's
+  prompt (saved when the turn starts) plus the reply, so it adds 2
+- conversation_count: added by the first reply of a conversation that was
+  started in the same turn
+"""
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID, uuid5
+
+from sqlalchemy import func, select, update, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.feedback import UsageDailyRollup
+
+# Namespace for rollup ids (never change: existing rows are keyed by it)
+ROLLUP_NAMESPACE = UUID("6f1c2a7e-4b5d-4e8a-9c3f-0d2b7a1e5c94")
+
+# Additive rollup columns
+ROLLUP_COUNTERS = ["conversation_count", "message_count", "prompt_tokens", "completion_tokens", "total_tokens"]
+
+
+def rollup_id(
+    day: date,
+    user_id: UUID,
+    service_type: str,
+    configuration_id: Optional[UUID],
+    model_name: str
+) -> UUID:
+    """Deterministic rollup row id for a grouping key."""
+    return uuid5(ROLLUP_NAMESPACE, f"{day.isoformat()}|{user_id}|{service_type}|{configuration_id or ''}|{model_name}")
+
+
+def rollup_increments(usage_rows: list[dict], new_conversation_ids: set[UUID]) -> list[dict]:
+    """
+    Group token_usage_log rows into rollup increments.
+
+    Args:
+        usage_rows: Column values of token_usage_log rows being inserted
+        new_conversation_ids: Conversations started by these replies
+
+    Returns:
+        One increment per rollup row, ordered by id
+    """
+    increments: dict[UUID, dict] = {}
+    counted_conversations = set()
+
+    for row in usage_rows:
+        day = row["created_at"].date()
+        key = rollup_id(day, row["user_id"], row["service_type"], row.get("configuration_id"), row["model_name"])
+
+        increment = increments.get(key)
+        if increment is None:
+            increment = increments[key] = {
+                "id": key,
+                "day": day,
+                "user_id": row["user_id"],
+                "service_type": row["service_type"],
+                "configuration_id": row.get("configuration_id"),
+                "model_name": row["model_name"],
+                **{counter: 0 for counter in ROLLUP_COUNTERS},
+                "updated_at": datetime.utcnow(),
+            }
+
+        conversation_id = row["conversation_id"]
+        if conversation_id in new_conversation_ids and conversation_id not in counted_conversations:
+            counted_conversations.add(conversation_id)
+            increment["conversation_count"] += 1
+
+        increment["message_count"] += 2
+        increment["prompt_tokens"] += row["prompt_tokens"] or 0
+        increment["completion_tokens"] += row["completion_tokens"] or 0
+        increment["total_tokens"] += row["total_tokens"] or 0
+
+    # Consistent lock order for concurrent upserts
+    return [increments[key] for key in sorted(increments)]
+
+
+async def upsert_usage_rollups(db: AsyncSession, increments: list[dict]) -> None:
+    """
+    Add increments to their rollup rows, creating missing rows.
+
+    Does not commit; the caller commits with the usage log rows.
+
+    Args:
+        db: Database session
+        increments: Output of rollup_increments()
+    """
+    if not increments:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(UsageDailyRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UsageDailyRollup.id],
+            set_={
+                **{counter: getattr(UsageDailyRollup, counter) + getattr(stmt.excluded, counter) for counter in ROLLUP_COUNTERS},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await db.execute(stmt, increments)
+        return
+
+    # Other databases: update, then insert the rows that did not exist yet
+    for increment in increments:
+        result = await db.execute(
+            update(UsageDailyRollup)
+            .where(UsageDailyRollup.id == increment["id"])
+            .values(
+                **{counter: getattr(UsageDailyRollup, counter) + increment[counter] for counter in ROLLUP_COUNTERS},
+                updated_at=increment["updated_at"],
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await db.execute(insert(UsageDailyRollup), [increment])
+
+
+async def get_usage_totals(db: AsyncSession, since: date, until: Optional[date] = None) -> dict:
+    """
+    Sum rollups over a range of days.
+
+    Args:
+        db: Database session
+        since: First UTC day (inclusive)
+        until: Last UTC day (inclusive), default no limit
+
+    Returns:
+        Dict with conversation_count, message_count, prompt_tokens,
+        completion_tokens and total_tokens
+    """
+    stmt = select(*(
+        func.coalesce(func.sum(getattr(UsageDailyRollup, counter)), 0).label(counter)
+        for counter in ROLLUP_COUNTERS
+    )).where(UsageDailyRollup.day >= since)
+
+    if until is not None:
+        stmt = stmt.where(UsageDailyRollup.day <= until)
+
+    result = await db.execute(stmt)
+    return dict(result.one()._mapping)
@@ -0,0 +1,11 @@
+"""
+Load and latency benchmarks for the backend.
+
+Boots the FastAPI app against a local database and local HTTP stand-ins for
+Azure AD, AskAT&T and AskDocs, drives concurrent signup/login/chat/listing
+workloads and reports latency percentiles, time-to-first-token, tokens/sec
+and database queries per request.
+
+Usage (from the backend directory):
+    python -m benchmarks.run --users 50 --concurrency 25
+"""
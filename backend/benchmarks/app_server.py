@@ -0,0 +1,97 @@
+"""
+Boot the backend for a benchmark run.
+
+Creates the schema and the minimal seed data (USER/ADMIN roles and one
+AskDocs configuration readable by USER), installs a SQL statement counter on
+the engine and serves the app with uvicorn. The environment (DATABASE_URL,
+upstream URLs, USE_MOCK_* flags) is prepared by benchmarks.run.
+
+Extra endpoint:
+- GET /__bench/stats  Total SQL statements executed so far
+
+Usage:
+    python -m benchmarks.app_server --port 8100
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import event, select
+import uvicorn
+
+from app.database import engine, async_session_factory
+from app.main import app
+from app.models import Base
+from app.models.user import Role
+from app.models.domain import Domain, Configuration
+
+# SQL statements executed by this process (request handlers and background writers)
+query_counter = {"queries": 0}
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    query_counter["queries"] += 1
+
+
+@app.get("/__bench/stats", include_in_schema=False)
+async def bench_stats():
+    return dict(query_counter)
+
+
+async def prepare_database() -> None:
+    """Create tables (if missing) and the seed data the workloads need."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session_factory() as session:
+        roles = {}
+        for name, display_name in (("USER", "User"), ("ADMIN", "Administrator")):
+            result = await session.execute(select(Role).where(Role.name == name))
+            role = result.scalar_one_or_none()
+            if role is None:
+                role = Role(name=name, display_name=display_name, description=f"Benchmark {name} role")
+                session.add(role)
+            roles[name] = role
+        await session.flush()
+
+        result = await session.execute(select(Domain).where(Domain.domain_key == "BENCH"))
+        if result.scalar_one_or_none() is None:
+            domain = Domain(domain_key="BENCH", display_name="Benchmark Domain")
+            session.add(domain)
+            await session.flush()
+
+            configuration = Configuration(
+                domain_id=domain.id,
+                config_key="bench_config_v1",
+                display_name="Benchmark Configuration",
+                environment="production",
+            )
+            configuration.roles = [roles["USER"], roles["ADMIN"]]
+            session.add(configuration)
+
+        await session.commit()
+
+
+async def serve(host: str, port: int) -> None:
+    """Prepare the database and serve in one event loop, so pooled connections stay usable."""
+    await prepare_database()
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    await server.serve()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the backend for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--verbose", action="store_true", help="Keep per-request INFO logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
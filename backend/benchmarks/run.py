@@ -0,0 +1,226 @@
+"""
+Benchmark runner.
+
+Starts the upstream stand-ins and the backend as subprocesses, runs the
+workloads in order (signup, login storm, AskAT&T chat, AskDocs chat,
+conversation listing) and prints one row of metrics per workload.
+
+Usage (from the backend directory):
+    python -m benchmarks.run --users 50 --concurrency 25 --turns 3
+    python -m benchmarks.run --json results.json
+    python -m benchmarks.run --baseline results.json --max-regression 0.2
+    python -m benchmarks.run --env SSE_COALESCE_ENABLED=false
+
+Exits with status 1 when --baseline is given and a workload regressed.
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+from benchmarks import workloads
+from benchmarks.stats import find_regressions, format_table
+from benchmarks.workloads import BenchUser
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+WORKLOADS = ["signup", "login", "chat_askatt", "chat_askdocs", "list_conversations"]
+STARTUP_TIMEOUT_SECONDS = 60
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _app_env(args: argparse.Namespace, database_url: str, upstream: str) -> dict:
+    """Environment for the backend: local database, every upstream pointed at the stand-ins."""
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "JWT_SECRET": "benchmark-secret",
+        "DEBUG": "false",
+        "USE_MOCK_ASKATT": "false",
+        "USE_MOCK_ASKDOCS": "false",
+        "USE_MOCK_AZURE_AD": "false",
+        "AZURE_TENANT_ID": "bench-tenant",
+        "AZURE_CLIENT_ID": "bench-client",
+        "AZURE_CLIENT_SECRET": "bench-secret",
+        "AZURE_SECRET_ID": "bench-secret-id",
+        "AZURE_AUTH_URL": f"{upstream}/oauth2/token",
+        "AZURE_SCOPE_ASKATT_GENERAL": "api://bench/.default",
+        "AZURE_SCOPE_ASKATT_DOMAIN": "api://bench/.default",
+        "ASKATT_API_BASE_URL_STAGE": f"{upstream}/askatt",
+        "ASKATT_API_BASE_URL_PRODUCTION": f"{upstream}/askatt",
+        "ASKDOCS_API_BASE_URL_STAGE": f"{upstream}/askdocs",
+        "ASKDOCS_API_BASE_URL_PRODUCTION": f"{upstream}/askdocs",
+        "ASKDOCS_CONFIG_API_STAGE": upstream,
+        "ASKDOCS_CONFIG_API_PRODUCTION": upstream,
+    })
+    for override in args.env:
+        key, _, value = override.partition("=")
+        env[key] = value
+    return env
+
+
+def _start(module: str, extra_args: list[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", module, *extra_args],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def _wait_until_ready(url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with status {process.returncode}")
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {STARTUP_TIMEOUT_SECONDS}s")
+
+
+async def run_workloads(args: argparse.Namespace, base_url: str) -> dict[str, dict]:
+    """
+    Run the selected workloads against the backend.
+
+    Args:
+        args: Parsed command line
+        base_url: Backend URL
+
+    Returns:
+        Workload name -> summary dict
+    """
+    run_id = uuid.uuid4().hex[:6]
+    users = [
+        BenchUser(attid=f"bench{run_id}_{i}", email=f"bench{run_id}_{i}@example.com", password="Bench123!")
+        for i in range(args.users)
+    ]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    summaries = {}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        async def run(name, job):
+            result = await workloads.run_workload(name, client, [lambda u=u: job(u) for u in users], args.concurrency)
+            summaries[name] = result.summary()
+            print(f"  {name}: {result.requests} requests in {result.duration_s:.1f}s", file=sys.stderr)
+
+        # Accounts and tokens are prerequisites for everything else
+        await run("signup", lambda user: workloads.signup(client, user))
+        await run("login", lambda user: workloads.login(client, user))
+        users = [user for user in users if user.token]
+        if not users:
+            raise RuntimeError("No benchmark user could log in")
+
+        if "chat_askatt" in args.workloads:
+            await run("chat_askatt", lambda user: workloads.chat(client, user, "askatt", args.turns))
+
+        if "chat_askdocs" in args.workloads:
+            configuration_id = await workloads.first_configuration_id(client, users[0])
+            if configuration_id is None:
+                print("  chat_askdocs: skipped, no accessible configuration", file=sys.stderr)
+            else:
+                await run("chat_askdocs", lambda user: workloads.chat(
+                    client, user, "askdocs", args.turns, configuration_id
+                ))
+
+        if "list_conversations" in args.workloads:
+            await run("list_conversations", lambda user: workloads.list_conversations(client, user, args.list_repeats))
+
+    return {name: summary for name, summary in summaries.items() if name in args.workloads}
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict[str, dict]:
+    """Start the stand-ins and the backend, run the workloads, stop both."""
+    upstream_port, app_port = _free_port(), _free_port()
+    upstream = f"http://127.0.0.1:{upstream_port}"
+    base_url = f"http://127.0.0.1:{app_port}"
+
+    with tempfile.TemporaryDirectory(prefix="askdocs-bench-") as tmp:
+        database_url = args.db_url or f"sqlite+aiosqlite:///{tmp}/bench.db"
+
+        processes = [
+            _start("benchmarks.stand_ins", [
+                "--port", str(upstream_port),
+                "--latency-ms", str(args.latency_ms),
+                "--token-rate", str(args.token_rate),
+                "--response-tokens", str(args.response_tokens),
+                *(["--no-streaming"] if args.no_streaming else []),
+            ], dict(os.environ)),
+        ]
+        try:
+            await _wait_until_ready(f"{upstream}/stats", processes[0])
+            processes.append(_start("benchmarks.app_server", ["--port", str(app_port)], _app_env(args, database_url, upstream)))
+            await _wait_until_ready(f"{base_url}/health", processes[1])
+
+            return await run_workloads(args, base_url)
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run backend load benchmarks against local stand-ins")
+    parser.add_argument("--users", type=int, default=50, help="Benchmark users (one job per user per workload)")
+    parser.add_argument("--concurrency", type=int, default=25, help="Jobs in flight per workload")
+    parser.add_argument("--turns", type=int, default=3, help="Chat turns per user")
+    parser.add_argument("--list-repeats", type=int, default=3, help="Conversation list loads per user")
+    parser.add_argument(
+        "--workloads", default=",".join(WORKLOADS),
+        help=f"Comma-separated subset of {','.join(WORKLOADS)} (signup and login always run)",
+    )
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Upstream time to first byte")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="Upstream tokens per second")
+    parser.add_argument("--response-tokens", type=int, default=100, help="Tokens per upstream answer")
+    parser.add_argument("--no-streaming", action="store_true", help="Upstream AskAT&T answers in one JSON body")
+    parser.add_argument("--db-url", help="Database URL (default: SQLite file in a temp directory)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra backend setting")
+    parser.add_argument("--json", help="Write summaries to this file")
+    parser.add_argument("--baseline", help="Compare against summaries from a previous --json run")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative increase vs baseline")
+    args = parser.parse_args()
+
+    args.workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    unknown = set(args.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    summaries = asyncio.run(run_benchmark(args))
+    print(format_table(summaries))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(summaries, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = find_regressions(summaries, baseline, args.max_regression)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
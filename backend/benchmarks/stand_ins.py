@@ -0,0 +1,146 @@
+"""
+Local HTTP stand-ins for the upstream services.
+
+Serves the endpoints the backend calls, with configurable latency and token
+rate, so benchmarks measure our own overhead instead of the intranet:
+- POST /oauth2/token  Azure AD client-credentials token
+- POST /askatt        AskAT&T chat (SSE deltas when the request asks to
+                      stream, otherwise one JSON body in the gateway format)
+- POST /askdocs       AskDocs RAG answer with sources
+- GET  /stats         Request counts per endpoint
+
+Usage:
+    python -m benchmarks.stand_ins --port 9100 --latency-ms 50 --token-rate 200
+"""
+from collections import Counter
+from dataclasses import dataclass
+import argparse
+import asyncio
+import json
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import uvicorn
+
+
+@dataclass
+class StandInConfig:
+    """Simulated upstream behaviour."""
+    latency_ms: float = 50.0  # Delay before the first byte of a response
+    token_rate: float = 200.0  # Tokens per second while generating (0 = instant)
+    response_tokens: int = 100  # Tokens per answer
+    streaming: bool = True  # Stream AskAT&T deltas when the request asks for it
+
+
+def _answer_tokens(count: int) -> list[str]:
+    return [f"token{i} " for i in range(count)]
+
+
+def _usage(prompt: str, completion_tokens: int) -> dict:
+    prompt_tokens = max(1, len(prompt) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def create_stand_in_app(config: StandInConfig) -> FastAPI:
+    """
+    Build the stand-in application.
+
+    Args:
+        config: Simulated latency and token rate
+
+    Returns:
+        FastAPI app serving the upstream endpoints
+    """
+    app = FastAPI(title="Upstream stand-ins")
+    requests: Counter = Counter()
+
+    latency = config.latency_ms / 1000
+    token_interval = 1 / config.token_rate if config.token_rate > 0 else 0.0
+    generation_time = config.response_tokens * token_interval
+
+    @app.post("/oauth2/token")
+    async def token():
+        requests["token"] += 1
+        await asyncio.sleep(latency)
+        return {"access_token": uuid.uuid4().hex, "token_type": "Bearer", "expires_in": 3600}
+
+    @app.post("/askatt")
+    async def askatt(request: Request):
+        requests["askatt"] += 1
+        payload = await request.json()
+        model_payload = payload.get("modelPayload", {})
+        prompt = json.dumps(model_payload.get("messages", []))
+        tokens = _answer_tokens(config.response_tokens)
+        usage = _usage(prompt, len(tokens))
+
+        await asyncio.sleep(latency)
+
+        if config.streaming and model_payload.get("stream"):
+            async def deltas():
+                for token in tokens:
+                    yield f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}\n\n"
+                    if token_interval:
+                        await asyncio.sleep(token_interval)
+                yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(deltas(), media_type="text/event-stream")
+
+        await asyncio.sleep(generation_time)
+        return {
+            "status": "success",
+            "modelResult": {
+                "content": "".join(tokens),
+                "response_metadata": {"token_usage": usage},
+            },
+        }
+
+    @app.post("/askdocs")
+    async def askdocs(request: Request):
+        requests["askdocs"] += 1
+        payload = await request.json()
+        tokens = _answer_tokens(config.response_tokens)
+
+        await asyncio.sleep(latency + generation_time)
+        return {
+            "response": "".join(tokens),
+            "sources": [
+                {"title": f"{payload.get('domain', 'doc')} page {i}", "url": f"https://docs.example.com/{i}"}
+                for i in range(3)
+            ],
+            "usage": _usage(payload.get("query", ""), len(tokens)),
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return dict(requests)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run local upstream stand-ins")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--token-rate", type=float, default=200.0)
+    parser.add_argument("--response-tokens", type=int, default=100)
+    parser.add_argument("--no-streaming", action="store_true", help="Always answer AskAT&T with one JSON body")
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency_ms=args.latency_ms,
+        token_rate=args.token_rate,
+        response_tokens=args.response_tokens,
+        streaming=not args.no_streaming,
+    )
+    uvicorn.run(create_stand_in_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Result collection, percentiles, reporting and regression checks.
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+import math
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """
+    Percentile with linear interpolation between closest ranks.
+
+    Args:
+        values: Samples (any order)
+        pct: Percentile in [0, 100]
+
+    Returns:
+        The percentile, or None for no samples
+    """
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+@dataclass
+class WorkloadResult:
+    """Samples collected for one workload."""
+    name: str
+    latencies_ms: list[float] = field(default_factory=list)
+    ttft_ms: list[float] = field(default_factory=list)
+    tokens_per_sec: list[float] = field(default_factory=list)
+    errors: int = 0
+    duration_s: float = 0.0
+    db_queries: Optional[int] = None
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms) + self.errors
+
+    def summary(self) -> dict:
+        """Aggregate the samples into the reported metrics."""
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 2) if value is not None else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": rounded(self.requests / self.duration_s if self.duration_s else None),
+            "latency_p50_ms": rounded(percentile(self.latencies_ms, 50)),
+            "latency_p95_ms": rounded(percentile(self.latencies_ms, 95)),
+            "latency_p99_ms": rounded(percentile(self.latencies_ms, 99)),
+            "ttft_p50_ms": rounded(percentile(self.ttft_ms, 50)),
+            "ttft_p95_ms": rounded(percentile(self.ttft_ms, 95)),
+            "tokens_per_sec_p50": rounded(percentile(self.tokens_per_sec, 50)),
+            "db_queries_per_request": rounded(
+                self.db_queries / self.requests if self.db_queries is not None and self.requests else None
+            ),
+        }
+
+
+# Columns printed by format_table: (summary key, header)
+TABLE_COLUMNS = [
+    ("requests", "reqs"),
+    ("errors", "errs"),
+    ("throughput_rps", "rps"),
+    ("latency_p50_ms", "p50 ms"),
+    ("latency_p95_ms", "p95 ms"),
+    ("latency_p99_ms", "p99 ms"),
+    ("ttft_p50_ms", "ttft p50"),
+    ("ttft_p95_ms", "ttft p95"),
+    ("tokens_per_sec_p50", "tok/s"),
+    ("db_queries_per_request", "queries/req"),
+]
+
+
+def format_table(summaries: dict[str, dict]) -> str:
+    """
+    Render workload summaries as a fixed-width table.
+
+    Args:
+        summaries: Workload name -> summary dict
+
+    Returns:
+        Table text
+    """
+    name_width = max([len("workload")] + [len(name) for name in summaries])
+    headers = ["workload".ljust(name_width)] + [header.rjust(11) for _, header in TABLE_COLUMNS]
+    lines = [" ".join(headers), "-" * len(" ".join(headers))]
+
+    for name, summary in summaries.items():
+        cells = [name.ljust(name_width)]
+        for key, _ in TABLE_COLUMNS:
+            value = summary.get(key)
+            cells.append(("-" if value is None else f"{value:g}").rjust(11))
+        lines.append(" ".join(cells))
+
+    return "\n".join(lines)
+
+
+# Metrics where a higher value is a regression
+REGRESSION_METRICS = ["latency_p95_ms", "ttft_p95_ms", "db_queries_per_request"]
+
+
+def find_regressions(current: dict[str, dict], baseline: dict[str, dict], max_regression: float) -> list[str]:
+    """
+    Compare summaries against a baseline run.
+
+    Args:
+        current: Workload name -> summary dict for this run
+        baseline: Workload name -> summary dict from a previous run
+        max_regression: Allowed relative increase (0.2 = 20%)
+
+    Returns:
+        Human-readable descriptions of metrics that regressed
+    """
+    regressions = []
+
+    for name, summary in current.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+
+        for metric in REGRESSION_METRICS:
+            now, before = summary.get(metric), previous.get(metric)
+            if now is None or not before:
+                continue
+            if now > before * (1 + max_regression):
+                regressions.append(f"{name}.{metric}: {before:g} -> {now:g} (+{(now / before - 1) * 100:.0f}%)")
+
+        if summary.get("errors", 0) > previous.get("errors", 0):
+            regressions.append(f"{name}.errors: {previous.get('errors', 0)} -> {summary['errors']}")
+
+    return regressions
@@ -0,0 +1,208 @@
+"""
+Benchmark workloads driven against a running backend.
+
+Each workload runs one job per benchmark user, at most `concurrency` at a
+time, and records per-request samples. SQL statements are counted by the
+benchmark app server (GET /__bench/stats) before and after the workload.
+"""
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.stats import WorkloadResult
+
+# Time for write-behind flushes to land before queries are counted
+SETTLE_SECONDS = 0.5
+
+
+@dataclass
+class BenchUser:
+    """A user created by the signup workload."""
+    attid: str
+    email: str
+    password: str
+    token: Optional[str] = None
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class Sample:
+    """Timings for one request."""
+    latency_ms: float
+    ttft_ms: Optional[float] = None
+    tokens_per_sec: Optional[float] = None
+
+
+class RequestFailed(Exception):
+    """A request returned an unexpected status or an error event."""
+
+
+async def _db_queries(client: httpx.AsyncClient) -> Optional[int]:
+    try:
+        response = await client.get("/__bench/stats")
+        return response.json()["queries"]
+    except Exception:
+        return None
+
+
+async def run_workload(
+    name: str,
+    client: httpx.AsyncClient,
+    jobs: list[Callable[[], Awaitable[list[Sample]]]],
+    concurrency: int
+) -> WorkloadResult:
+    """
+    Run jobs concurrently and collect their samples.
+
+    Args:
+        name: Workload name
+        client: HTTP client for the backend
+        jobs: One coroutine factory per user; each returns its samples
+        concurrency: Max jobs in flight
+
+    Returns:
+        WorkloadResult with samples, errors, duration and SQL statement count
+    """
+    result = WorkloadResult(name=name)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(job):
+        async with semaphore:
+            try:
+                samples = await job()
+            except (RequestFailed, httpx.HTTPError):
+                result.errors += 1
+                return
+        for sample in samples:
+            result.latencies_ms.append(sample.latency_ms)
+            if sample.ttft_ms is not None:
+                result.ttft_ms.append(sample.ttft_ms)
+            if sample.tokens_per_sec is not None:
+                result.tokens_per_sec.append(sample.tokens_per_sec)
+
+    queries_before = await _db_queries(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(run(job) for job in jobs))
+    result.duration_s = time.perf_counter() - started
+
+    await asyncio.sleep(SETTLE_SECONDS)
+    queries_after = await _db_queries(client)
+    if queries_before is not None and queries_after is not None:
+        result.db_queries = queries_after - queries_before
+
+    return result
+
+
+async def signup(client: httpx.AsyncClient, user: BenchUser) -> list[Sample]:
+    """Create the user's account."""
+    started = time.perf_counter()
+    response = await client.post("/api/v1/auth/signup", json={
+        "attid": user.attid,
+        "email": user.email,
+        "password": user.password,
+        "full_name": f"Benchmark {user.attid}",
+    })
+    if response.status_code != 201:
+        raise RequestFailed(f"signup {response.status_code}: {response.text[:200]}")
+    return [Sample((time.perf_counter() - started) * 1000)]
+
+
+async def login(client: httpx.AsyncClient, user: BenchUser) -> list[Sample]:
+    """Log in and keep the access token for later workloads."""
+    started = time.perf_counter()
+    response = await client.post("/api/v1/auth/login", json={"attid": user.attid, "password": user.password})
+    if response.status_code != 200:
+        raise RequestFailed(f"login {response.status_code}: {response.text[:200]}")
+    user.token = response.json()["access_token"]
+    return [Sample((time.perf_counter() - started) * 1000)]
+
+
+async def _chat_turn(client: httpx.AsyncClient, user: BenchUser, path: str, body: dict) -> tuple[Sample, Optional[str]]:
+    """Send one chat message and read the SSE stream to the end."""
+    started = time.perf_counter()
+    first_token = None
+    token_events = 0
+    completion_tokens = None
+    conversation_id = None
+
+    async with client.stream("POST", path, json=body, headers=user.headers) as response:
+        if response.status_code != 200:
+            await response.aread()
+            raise RequestFailed(f"chat {response.status_code}: {response.text[:200]}")
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[6:])
+
+            if event["type"] == "token":
+                token_events += 1
+                if first_token is None:
+                    first_token = time.perf_counter()
+            elif event["type"] == "usage":
+                completion_tokens = event["usage"].get("completion_tokens")
+            elif event["type"] == "conversation_id":
+                conversation_id = event["conversation_id"]
+            elif event["type"] == "error":
+                raise RequestFailed(f"chat error event: {event.get('content')}")
+
+    finished = time.perf_counter()
+
+    ttft_ms = (first_token - started) * 1000 if first_token else None
+    tokens = completion_tokens or token_events
+    generation = finished - first_token if first_token else 0
+    tokens_per_sec = tokens / generation if generation > 0 else None
+
+    return Sample((finished - started) * 1000, ttft_ms, tokens_per_sec), conversation_id
+
+
+async def chat(
+    client: httpx.AsyncClient,
+    user: BenchUser,
+    service: str,
+    turns: int,
+    configuration_id: Optional[str] = None
+) -> list[Sample]:
+    """Hold a multi-turn conversation with AskAT&T or AskDocs."""
+    samples = []
+    conversation_id = None
+
+    for turn in range(turns):
+        body = {"message": f"Benchmark question {turn} from {user.attid}?"}
+        if conversation_id:
+            body["conversation_id"] = conversation_id
+        if configuration_id:
+            body["configuration_id"] = configuration_id
+
+        sample, new_conversation_id = await _chat_turn(client, user, f"/api/v1/chat/{service}", body)
+        conversation_id = conversation_id or new_conversation_id
+        samples.append(sample)
+
+    return samples
+
+
+async def list_conversations(client: httpx.AsyncClient, user: BenchUser, repeats: int) -> list[Sample]:
+    """Load the conversation sidebar, as the frontend does on navigation."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = await client.get("/api/v1/chat/conversations", headers=user.headers)
+        if response.status_code != 200:
+            raise RequestFailed(f"list {response.status_code}: {response.text[:200]}")
+        samples.append(Sample((time.perf_counter() - started) * 1000))
+    return samples
+
+
+async def first_configuration_id(client: httpx.AsyncClient, user: BenchUser) -> Optional[str]:
+    """Get an AskDocs configuration the user can access."""
+    response = await client.get("/api/v1/chat/configurations", headers=user.headers)
+    if response.status_code != 200 or not response.json():
+        return None
+    return response.json()[0]["id"]
@@ -3,18 +3,23 @@ Pytest configuration and fixtures for testing.
 """
 import asyncio
 import pytest
+from contextlib import contextmanager
 from typing import AsyncGenerator
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.database import Base
 from app.api.deps import get_db
 from app.core.security import get_password_hash
+from app.core.access_index import configuration_access
+from app.core.query_profiler import count_queries
+from app.services.configuration_catalog import configuration_catalog
+from app.services.answer_cache import answer_cache
 from app.models.user import User, Role
 
-# Test database URL (use in-memory SQLite for speed)
+# Test database URL (in-memory SQLite for speed; StaticPool keeps one shared connection)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
@@ -32,7 +37,8 @@ async def db_engine():
     """Create test database engine."""
     engine = create_async_engine(
         TEST_DATABASE_URL,
-        poolclass=NullPool,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
     )
 
     async with engine.begin() as conn:
@@ -46,6 +52,26 @@ async def db_engine():
     await engine.dispose()
 
 
+@pytest.fixture(scope="function")
+def assert_max_queries(db_engine):
+    """
+    Fail when a block runs more SQL statements than allowed.
+
+    Usage:
+        with assert_max_queries(3):
+            await authenticated_client.get("/api/v1/chat/conversations")
+    """
+    @contextmanager
+    def check(max_queries: int):
+        with count_queries(db_engine.sync_engine) as queries:
+            yield queries
+        assert queries.count <= max_queries, (
+            f"{queries.count} queries (max {max_queries}):\n" + "\n".join(queries.statements)
+        )
+
+    return check
+
+
 @pytest.fixture(scope="function")
 async def db_session(db_engine) -> AsyncGenerator[AsyncSession, None]:
     """Create test database session."""
@@ -63,7 +89,7 @@ async def db_session(db_engine) -> AsyncGenerator[AsyncSession, None]:
 async def test_user(db_session: AsyncSession) -> User:
     """Create test user with USER role."""
     # Create USER role
-    user_role = Role(name="USER", description="Test user role")
+    user_role = Role(name="USER", display_name="User", description="Test user role")
     db_session.add(user_role)
     await db_session.flush()
 
@@ -72,7 +98,7 @@ async def test_user(db_session: AsyncSession) -> User:
         attid="testuser",
         email="test@example.com",
         password_hash=get_password_hash("Test123!"),
-        full_name="Test User",
+        display_name="Test User",
         is_active=True
     )
     user.roles.append(user_role)
@@ -88,7 +114,7 @@ async def test_user(db_session: AsyncSession) -> User:
 async def admin_user(db_session: AsyncSession) -> User:
     """Create test admin user with ADMIN role."""
     # Create ADMIN role
-    admin_role = Role(name="ADMIN", description="Test admin role")
+    admin_role = Role(name="ADMIN", display_name="Administrator", description="Test admin role")
     db_session.add(admin_role)
     await db_session.flush()
 
@@ -97,7 +123,7 @@ async def admin_user(db_session: AsyncSession) -> User:
         attid="admin",
         email="admin@example.com",
         password_hash=get_password_hash("Admin123!"),
-        full_name="Admin User",
+        display_name="Admin User",
         is_active=True
     )
     admin.roles.append(admin_role)
@@ -117,6 +143,11 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
 
     app.dependency_overrides[get_db] = override_get_db
 
+    # Each test has its own database; don't reuse another test's access index, catalogs or answers
+    configuration_access.invalidate()
+    configuration_catalog.invalidate()
+    answer_cache.clear()
+
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
 
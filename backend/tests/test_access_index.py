@@ -0,0 +1,73 @@
+"""
+Tests for the role -> configuration access index.
+"""
+from uuid import uuid4
+import pytest
+
+from app.core.access_index import ConfigurationAccessIndex
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Returns the current grant rows and counts queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+        self.fail = False
+
+    async def execute(self, stmt):
+        self.queries += 1
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return FakeResult(list(self.rows))
+
+
+@pytest.mark.asyncio
+async def test_access_checks_use_index():
+    """Checks and listings are answered from one rebuild; ADMIN is unrestricted."""
+    shared, docs_only = uuid4(), uuid4()
+    db = FakeSession([("USER", shared), ("DOCS", shared), ("DOCS", docs_only)])
+    index = ConfigurationAccessIndex()
+
+    assert await index.ensure_fresh(db)
+    assert await index.ensure_fresh(db)
+    assert db.queries == 1
+
+    assert index.can_access({"USER"}, shared)
+    assert not index.can_access({"USER"}, docs_only)
+    assert index.can_access({"USER", "DOCS"}, docs_only)
+    assert index.can_access({"ADMIN"}, uuid4())
+
+    assert index.allowed_ids({"USER", "DOCS"}) == {shared, docs_only}
+    assert index.allowed_ids({"NOBODY"}) == frozenset()
+    assert index.allowed_ids({"ADMIN"}) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_rebuilds_and_failures_fall_back():
+    """Invalidation picks up new grants; a failed rebuild reports the index unusable."""
+    configuration_id = uuid4()
+    db = FakeSession([])
+    index = ConfigurationAccessIndex()
+
+    assert await index.ensure_fresh(db)
+    assert not index.can_access({"USER"}, configuration_id)
+
+    db.rows = [("USER", configuration_id)]
+    index.invalidate()
+    assert await index.ensure_fresh(db)
+    assert index.can_access({"USER"}, configuration_id)
+    assert db.queries == 2
+
+    db.fail = True
+    index.invalidate()
+    assert not await index.ensure_fresh(db)
+    assert index.get_stats()["errors"] == 1
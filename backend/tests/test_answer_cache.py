@@ -0,0 +1,98 @@
+"""
+Tests for the AskDocs answer cache.
+"""
+from uuid import uuid4
+import pytest
+
+from app.config import settings
+from app.services.answer_cache import AnswerCache, CachedAnswer, normalize_question, replay_answer, simhash
+from app.services.persistence import PendingMessage
+from app.services.stream_events import EndEvent, MessageAccumulator
+
+
+def test_exact_match_normalizes_and_scopes_by_configuration():
+    """Case, punctuation and spacing don't matter; configurations don't share answers."""
+    cache = AnswerCache()
+    config_id = uuid4()
+    cache.set(config_id, "How do I reset my password?", CachedAnswer(answer="Go to login", sources=[{"title": "Guide"}]))
+
+    assert normalize_question("  HOW do I   reset my password!! ") == "how do i reset my password"
+
+    hit = cache.get(config_id, "how do i reset my PASSWORD")
+    assert hit.match == "exact"
+    assert hit.entry.answer == "Go to login"
+
+    assert cache.get(uuid4(), "How do I reset my password?") is None
+    assert cache.get(config_id, "How do I pay my bill?") is None
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 2
+
+
+def test_ttl_and_size_bound(monkeypatch):
+    """Expired entries are not served and the oldest entries are evicted first."""
+    monkeypatch.setattr(settings, "ANSWER_CACHE_MAX_ENTRIES", 2)
+    cache = AnswerCache()
+    config_id = uuid4()
+
+    for question in ("one", "two", "three"):
+        cache.set(config_id, question, CachedAnswer(answer=question, sources=None))
+
+    assert cache.get(config_id, "one") is None
+    assert cache.get(config_id, "three").entry.answer == "three"
+    assert cache.get_stats()["evictions"] == 1
+
+    monkeypatch.setattr(settings, "ANSWER_CACHE_TTL_SECONDS", 0)
+    cache.set(config_id, "four", CachedAnswer(answer="four", sources=None))
+    assert cache.get(config_id, "four") is None
+
+
+def test_near_duplicates(monkeypatch):
+    """With near-duplicate matching on, a reworded question within the distance is served."""
+    question = "how do i reset the password for my att account online"
+    reworded = "how do i reset the password for my att account online please"
+    distance = (simhash(normalize_question(question)) ^ simhash(normalize_question(reworded))).bit_count()
+
+    cache = AnswerCache()
+    config_id = uuid4()
+    cache.set(config_id, question, CachedAnswer(answer="Go to login", sources=None))
+
+    assert cache.get(config_id, reworded) is None
+
+    monkeypatch.setattr(settings, "ANSWER_CACHE_NEAR_DUPLICATES", True)
+    monkeypatch.setattr(settings, "ANSWER_CACHE_MAX_DISTANCE", distance)
+    cache = AnswerCache()
+    cache.set(config_id, question, CachedAnswer(answer="Go to login", sources=None))
+
+    hit = cache.get(config_id, reworded)
+    assert hit.match == "near"
+    assert hit.distance == distance
+    assert cache.get(config_id, "what is my data plan allowance this month") is None
+
+
+@pytest.mark.asyncio
+async def test_replay_records_hit_in_metadata():
+    """A replayed answer streams like a live one and is saved with cache metadata."""
+    cache = AnswerCache()
+    config_id = uuid4()
+    cache.set(config_id, "billing", CachedAnswer(answer="See your bill", sources=[{"title": "Bill"}]))
+    hit = cache.get(config_id, "Billing")
+
+    accumulator = MessageAccumulator()
+    events = [event async for event in replay_answer(hit)]
+    for event in events:
+        accumulator.add(event)
+
+    assert isinstance(events[-1], EndEvent)
+    assert accumulator.content == "See your bill"
+    assert accumulator.sources == [{"title": "Bill"}]
+    assert accumulator.usage["total_tokens"] == 0
+
+    row = PendingMessage(
+        conversation_id=uuid4(),
+        role="assistant",
+        content=accumulator.content,
+        sources=accumulator.sources,
+        cache=hit.metadata()
+    ).message_row()
+    assert row["metadata_"]["cache"]["hit"] is True
+    assert row["metadata_"]["cache"]["match"] == "exact"
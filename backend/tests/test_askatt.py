@@ -0,0 +1,81 @@
+"""
+Tests for the AskAT&T upstream client (streamed and buffered responses).
+"""
+import json
+import httpx
+import pytest
+
+from app.core.concurrency import AdaptiveLimiter
+from app.core.resilience import UpstreamGuard
+from app.services import askatt
+
+
+def _install_transport(monkeypatch, handler):
+    """Route AskAT&T calls through an in-process mock transport."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def fake_token(use_domain_scope: bool = False) -> str:
+        return "test-token"
+
+    monkeypatch.setattr(askatt, "get_askatt_token", fake_token)
+    monkeypatch.setattr(askatt, "get_upstream_client", lambda url: client)
+    # Fresh limiter/circuit per test, without retry backoff delays
+    monkeypatch.setattr(askatt, "askatt_upstream", UpstreamGuard("AskAT&T", AdaptiveLimiter("AskAT&T", 10)))
+    monkeypatch.setattr(askatt.settings, "UPSTREAM_RETRY_BACKOFF_MS", 0)
+
+
+async def _collect(monkeypatch) -> list[dict]:
+    monkeypatch.setattr(askatt.settings, "ASKATT_STREAMING", True)
+    events = []
+    async for event in askatt.stream_askatt_chat("Hello", []):
+        events.append(event.to_dict())
+    return events
+
+
+@pytest.mark.asyncio
+async def test_streamed_deltas_are_forwarded(monkeypatch):
+    """SSE deltas from the upstream become token events as they arrive."""
+    body = (
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        'data: {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}}\n\n'
+        'data: [DONE]\n\n'
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["modelPayload"]["stream"] is True
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body)
+
+    _install_transport(monkeypatch, handler)
+    events = await _collect(monkeypatch)
+
+    assert [e["content"] for e in events if e["type"] == "token"] == ["Hel", "lo"]
+    assert events[-2] == {"type": "usage", "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}}
+    assert events[-1] == {"type": "end"}
+
+
+@pytest.mark.asyncio
+async def test_buffered_response_falls_back_to_replay(monkeypatch):
+    """A complete JSON body is replayed when the upstream doesn't stream."""
+    result = {"status": "success", "modelResult": {"content": "Hi", "response_metadata": {}}}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=result)
+
+    _install_transport(monkeypatch, handler)
+    events = await _collect(monkeypatch)
+
+    assert "".join(e["content"] for e in events if e["type"] == "token") == "Hi"
+    assert events[-1] == {"type": "end"}
+
+
+@pytest.mark.asyncio
+async def test_upstream_error_status_yields_error_event(monkeypatch):
+    """HTTP errors on the streaming request become a terminal error event."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(502, text="Bad Gateway")
+
+    _install_transport(monkeypatch, handler)
+    events = await _collect(monkeypatch)
+
+    assert events == [{"type": "error", "content": "API error: 502"}]
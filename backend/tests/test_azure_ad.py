@@ -0,0 +1,71 @@
+"""
+Tests for the Azure AD token cache.
+"""
+import asyncio
+import pytest
+
+from app.services.azure_ad import AzureADTokenManager
+
+
+class CountingTokenManager(AzureADTokenManager):
+    """Token manager that fakes the Azure AD call and counts requests."""
+
+    def __init__(self, expires_in: int = 3600):
+        super().__init__()
+        self.calls = 0
+        self.expires_in = expires_in
+
+    async def _request_token(self, scope: str) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {
+            "access_token": f"token-{scope}-{self.calls}",
+            "token_type": "Bearer",
+            "expires_in": self.expires_in,
+        }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_token_call():
+    """A burst of requests for one scope triggers a single token request."""
+    manager = CountingTokenManager()
+
+    tokens = await asyncio.gather(*[manager.get_access_token("scope-a") for _ in range(500)])
+
+    assert manager.calls == 1
+    assert set(tokens) == {"token-scope-a-1"}
+    assert manager.get_stats()["misses"] == 500
+    assert manager.get_stats()["coalesced"] == 499
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_cached_per_scope():
+    """Cached tokens are reused and kept separate per scope."""
+    manager = CountingTokenManager()
+
+    general = await manager.get_access_token("general")
+    domain = await manager.get_access_token("domain")
+
+    assert await manager.get_access_token("general") == general
+    assert await manager.get_access_token("domain") == domain
+    assert general != domain
+    assert manager.calls == 2
+    assert manager.get_stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_token_in_refresh_window_is_refreshed_in_background():
+    """A token near expiry is still served while one refresh runs."""
+    # 40s lifetime minus 30s skew leaves 10s, so the refresh window opens after 5s
+    manager = CountingTokenManager(expires_in=40)
+
+    first = await manager.get_access_token("scope-a")
+    manager._tokens["scope-a"].refresh_at = 0.0
+
+    assert await manager.get_access_token("scope-a") == first
+    assert await manager.get_access_token("scope-a") == first
+    await asyncio.sleep(0.05)
+
+    assert manager.calls == 2
+    assert manager.get_stats()["background_refreshes"] == 1
+    assert await manager.get_access_token("scope-a") == "token-scope-a-2"
@@ -0,0 +1,42 @@
+"""
+Tests for benchmark percentiles and baseline comparison.
+"""
+from benchmarks.stats import WorkloadResult, find_regressions, percentile
+
+
+def test_percentile_interpolates():
+    """Percentiles interpolate between ranks and handle empty input."""
+    values = [40.0, 10.0, 30.0, 20.0]
+
+    assert percentile(values, 0) == 10.0
+    assert percentile(values, 50) == 25.0
+    assert percentile(values, 100) == 40.0
+    assert percentile([], 95) is None
+
+
+def test_summary_reports_queries_per_request():
+    """Summary divides statements by requests, including failed ones."""
+    result = WorkloadResult(name="login", latencies_ms=[10.0, 20.0, 30.0], errors=1, duration_s=2.0, db_queries=8)
+    summary = result.summary()
+
+    assert summary["requests"] == 4
+    assert summary["throughput_rps"] == 2.0
+    assert summary["db_queries_per_request"] == 2.0
+    assert summary["ttft_p50_ms"] is None
+
+
+def test_find_regressions():
+    """Only increases beyond the allowed ratio (and new errors) are reported."""
+    baseline = {"login": {"latency_p95_ms": 100.0, "db_queries_per_request": 4.0, "errors": 0}}
+
+    within = {"login": {"latency_p95_ms": 115.0, "db_queries_per_request": 4.0, "errors": 0}}
+    assert find_regressions(within, baseline, 0.2) == []
+
+    worse = {
+        "login": {"latency_p95_ms": 150.0, "db_queries_per_request": 4.0, "errors": 2},
+        "new_workload": {"latency_p95_ms": 1.0},
+    }
+    regressions = find_regressions(worse, baseline, 0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("login.latency_p95_ms")
+    assert regressions[1].startswith("login.errors")
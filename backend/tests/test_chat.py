@@ -62,3 +62,177 @@ async def test_get_conversations(authenticated_client: AsyncClient):
 
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+@pytest.mark.asyncio
+async def test_get_conversations_keyset_pagination(
+    authenticated_client: AsyncClient,
+    db_session,
+    test_user
+):
+    """Conversation list returns message counts and pages with X-Next-Cursor."""
+    from datetime import datetime, timedelta
+    from app.models.conversation import Conversation, Message
+
+    now = datetime.utcnow()
+    for i in range(5):
+        conversation = Conversation(
+            user_id=test_user.id,
+            service_type="askatt",
+            title=f"Conversation {i}",
+            updated_at=now - timedelta(minutes=i)
+        )
+        db_session.add(conversation)
+        await db_session.flush()
+        for j in range(i):
+            db_session.add(Message(conversation_id=conversation.id, role="user", content=f"m{j}"))
+    await db_session.commit()
+
+    first = await authenticated_client.get("/api/v1/chat/conversations", params={"limit": 3})
+    assert first.status_code == 200
+    assert [item["title"] for item in first.json()] == ["Conversation 0", "Conversation 1", "Conversation 2"]
+    assert [item["message_count"] for item in first.json()] == [0, 1, 2]
+
+    cursor = first.headers["X-Next-Cursor"]
+    second = await authenticated_client.get("/api/v1/chat/conversations", params={"limit": 3, "cursor": cursor})
+    assert [item["title"] for item in second.json()] == ["Conversation 3", "Conversation 4"]
+    assert [item["message_count"] for item in second.json()] == [3, 4]
+    assert "X-Next-Cursor" not in second.headers
+
+    invalid = await authenticated_client.get("/api/v1/chat/conversations", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_load_conversation_history_window(db_session, test_user):
+    """History loader returns only the newest messages, in chronological order."""
+    from datetime import datetime, timedelta
+    from app.models.conversation import Conversation, Message
+    from app.services.history import HistoryLimits, load_conversation_history
+
+    conversation = Conversation(user_id=test_user.id, service_type="askatt")
+    db_session.add(conversation)
+    await db_session.flush()
+
+    start = datetime.utcnow()
+    for i in range(30):
+        db_session.add(Message(
+            conversation_id=conversation.id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"message {i}",
+            created_at=start + timedelta(seconds=i)
+        ))
+    await db_session.commit()
+
+    history = await load_conversation_history(
+        db_session, conversation, "askatt", limits=HistoryLimits(max_messages=4, max_tokens=1000)
+    )
+
+    assert [message["content"] for message in history] == ["message 26", "message 27", "message 28", "message 29"]
+
+
+@pytest.mark.asyncio
+async def test_history_includes_queued_reply_without_cache(db_session, test_user, monkeypatch):
+    """With the history cache off, a reply still in the write-behind queue is part of the context."""
+    import asyncio
+    from contextlib import asynccontextmanager
+    from app.config import settings
+    from app.models.conversation import Conversation, Message
+    from app.services import history, persistence
+    from app.services.history import HistoryLimits, load_conversation_history
+    from app.services.persistence import MessageWriteBehindQueue, PendingMessage
+
+    monkeypatch.setattr(settings, "HISTORY_CACHE_ENABLED", False)
+    conversation = Conversation(user_id=test_user.id, service_type="askatt")
+    db_session.add(conversation)
+    await db_session.flush()
+    db_session.add(Message(conversation_id=conversation.id, role="user", content="question"))
+    await db_session.commit()
+
+    release = asyncio.Event()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    async def blocked_write_messages(db, messages):
+        await release.wait()
+
+    monkeypatch.setattr(persistence, "write_messages", blocked_write_messages)
+    queue = MessageWriteBehindQueue(session_factory=session_factory)
+    monkeypatch.setattr(history, "message_queue", queue)
+    queue.start()
+    try:
+        await queue.enqueue(db_session, PendingMessage(conversation_id=conversation.id, role="assistant", content="answer"))
+
+        context = await load_conversation_history(
+            db_session, conversation, "askatt", limits=HistoryLimits(max_messages=4, max_tokens=1000)
+        )
+    finally:
+        release.set()
+        await queue.stop()
+
+    assert [message["content"] for message in context] == ["question", "answer"]
+
+
+@pytest.mark.asyncio
+async def test_configurations_filtered_by_role_access(authenticated_client: AsyncClient, db_session, test_user):
+    """Users only list and chat with configurations granted to their roles."""
+    from sqlalchemy import select
+    from app.models.domain import Domain, Configuration
+    from app.models.user import Role
+
+    user_role = (await db_session.execute(select(Role).where(Role.name == "USER"))).scalar_one()
+    domain = Domain(domain_key="TEST", display_name="Test Domain")
+    db_session.add(domain)
+    await db_session.flush()
+
+    granted = Configuration(domain_id=domain.id, config_key="granted", display_name="Granted", environment="production")
+    granted.roles = [user_role]
+    hidden = Configuration(domain_id=domain.id, config_key="hidden", display_name="Hidden", environment="production")
+    db_session.add_all([granted, hidden])
+    await db_session.commit()
+
+    response = await authenticated_client.get("/api/v1/chat/configurations")
+    assert response.status_code == 200
+    assert [config["config_key"] for config in response.json()] == ["granted"]
+
+    response = await authenticated_client.post(
+        "/api/v1/chat/askdocs",
+        json={"message": "Hello", "configuration_id": str(hidden.id)}
+    )
+    assert "access denied" in response.text
+
+
+@pytest.mark.asyncio
+async def test_configurations_etag_not_modified(authenticated_client: AsyncClient):
+    """The catalog carries an ETag and answers a matching If-None-Match with 304."""
+    response = await authenticated_client.get("/api/v1/chat/configurations")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await authenticated_client.get("/api/v1/chat/configurations", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_delete_conversation_after_chat_with_foreign_keys(authenticated_client: AsyncClient, db_session):
+    """A conversation with logged token usage can be deleted; its usage rollups remain."""
+    from sqlalchemy import func, select, text
+    from app.models.feedback import TokenUsageLog, UsageDailyRollup
+
+    await db_session.execute(text("PRAGMA foreign_keys=ON"))
+
+    response = await authenticated_client.post("/api/v1/chat/askatt", json={"message": "Hello"})
+    assert response.status_code == 200
+    conversation_id = json.loads(response.text.split("\n\n")[0][len("data: "):])["conversation_id"]
+    assert (await db_session.execute(select(func.count()).select_from(TokenUsageLog))).scalar_one() == 1
+
+    response = await authenticated_client.delete(f"/api/v1/chat/conversations/{conversation_id}")
+
+    assert response.status_code == 204
+    assert (await db_session.execute(select(func.count()).select_from(TokenUsageLog))).scalar_one() == 0
+    rollup_tokens = (await db_session.execute(select(func.sum(UsageDailyRollup.total_tokens)))).scalar_one()
+    assert rollup_tokens > 0
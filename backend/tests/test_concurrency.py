@@ -0,0 +1,106 @@
+"""
+Tests for the adaptive upstream concurrency limiter.
+"""
+import asyncio
+import httpx
+import pytest
+
+from app.config import settings
+from app.core import concurrency
+from app.core.concurrency import AdaptiveLimiter, UpstreamSaturatedError
+from app.core.resilience import UpstreamGuard
+from app.services import askatt
+
+
+@pytest.fixture
+def small_limits(monkeypatch):
+    monkeypatch.setattr(settings, "UPSTREAM_LIMIT_INITIAL", 2)
+    monkeypatch.setattr(settings, "UPSTREAM_LIMIT_MIN", 1)
+    monkeypatch.setattr(settings, "UPSTREAM_LIMIT_MAX", 4)
+    monkeypatch.setattr(settings, "UPSTREAM_MAX_QUEUE", 1)
+    monkeypatch.setattr(settings, "UPSTREAM_QUEUE_TIMEOUT_MS", 50)
+
+
+@pytest.mark.asyncio
+async def test_queue_then_fail_fast(small_limits):
+    """Calls over the limit wait for a slot; a full queue or a timed-out wait is rejected."""
+    limiter = AdaptiveLimiter("Test", latency_target=10)
+    release = asyncio.Event()
+
+    async def call():
+        async with limiter.slot() as slot:
+            await release.wait()
+            slot.record(200)
+
+    running = [asyncio.create_task(call()) for _ in range(2)]
+    queued = asyncio.create_task(call())
+    await asyncio.sleep(0)
+
+    # Queue holds one request; the next is rejected immediately
+    with pytest.raises(UpstreamSaturatedError) as exc_info:
+        await call()
+    assert exc_info.value.retry_after >= 1
+
+    release.set()
+    await asyncio.gather(*running, queued)
+    assert limiter.get_stats()["queued"] == 1
+    assert limiter.get_stats()["in_flight"] == 0
+
+    # With every slot held past the queue timeout, waiting requests are rejected
+    release.clear()
+    running = [asyncio.create_task(call()) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(UpstreamSaturatedError):
+        await call()
+    release.set()
+    await asyncio.gather(*running)
+    assert limiter.get_stats()["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_limit_adapts_aimd(small_limits):
+    """Overload statuses and failures cut the limit; successes at the limit raise it."""
+    limiter = AdaptiveLimiter("Test", latency_target=10)
+
+    async with limiter.slot() as slot:
+        slot.record(429)
+    assert limiter.get_stats()["limit"] == 1
+
+    with pytest.raises(httpx.ConnectError):
+        async with limiter.slot():
+            raise httpx.ConnectError("refused")
+    assert limiter.limit == settings.UPSTREAM_LIMIT_MIN
+
+    async def success():
+        async with limiter.slot() as slot:
+            await asyncio.sleep(0)
+            slot.record(200)
+
+    # One call at a time fills a limit of 1, but no more ...
+    for _ in range(5):
+        await success()
+    assert limiter.get_stats()["limit"] == 2
+
+    # ... a full one does, up to the maximum
+    for _ in range(20):
+        await asyncio.gather(*(success() for _ in range(int(limiter.limit))))
+    assert limiter.get_stats()["limit"] == 4
+
+
+@pytest.mark.asyncio
+async def test_saturated_upstream_returns_error_event_with_retry_after(monkeypatch, small_limits):
+    """A saturated limiter turns into a fast SSE error event carrying retry_after."""
+    limiter = AdaptiveLimiter("AskAT&T", latency_target=10)
+    monkeypatch.setattr(askatt, "askatt_upstream", UpstreamGuard("AskAT&T", limiter))
+    monkeypatch.setattr(concurrency.settings, "UPSTREAM_MAX_QUEUE", 0)
+
+    async def fake_token(use_domain_scope: bool = False) -> str:
+        return "test-token"
+
+    monkeypatch.setattr(askatt, "get_askatt_token", fake_token)
+    monkeypatch.setattr(askatt, "get_upstream_client", lambda url: httpx.AsyncClient())
+
+    limiter.limit = 0
+    events = [event.to_dict() async for event in askatt.stream_askatt_chat("Hello", [])]
+
+    assert events == [{"type": "error", "content": "AskAT&T is busy, please try again shortly", "retry_after": 1}]
@@ -0,0 +1,66 @@
+"""
+Tests for the cached configuration catalog.
+"""
+from uuid import uuid4
+import pytest
+
+from app.schemas.chat import ConfigurationResponse, DomainResponse
+from app.services import configuration_catalog as catalog_module
+from app.services.configuration_catalog import ConfigurationCatalog, etag_matches
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Replace load_catalog with a fake that records calls."""
+    calls = []
+    names = {"value": "First"}
+
+    async def fake_load_catalog(db, roles, environment=None):
+        calls.append((roles, environment))
+        domain_id = uuid4()
+        return [ConfigurationResponse(
+            id=uuid4(),
+            domain_id=domain_id,
+            config_key="config_v1",
+            display_name=names["value"],
+            environment="production",
+            is_active=True,
+            domain=DomainResponse(id=domain_id, domain_key="DOMAIN", display_name="Domain"),
+        )]
+
+    monkeypatch.setattr(catalog_module, "load_catalog", fake_load_catalog)
+    return calls, names
+
+
+@pytest.mark.asyncio
+async def test_catalog_cached_per_role_set_until_invalidated(loads):
+    """Same role set and environment share an entry; invalidation rebuilds with a new ETag."""
+    calls, names = loads
+    catalog = ConfigurationCatalog()
+
+    first = await catalog.get(None, {"USER"})
+    again = await catalog.get(None, ["USER"])
+    assert again is first
+    assert len(calls) == 1
+
+    await catalog.get(None, {"USER"}, "stage")
+    await catalog.get(None, {"USER", "DOCS"})
+    assert len(calls) == 3
+
+    names["value"] = "Renamed"
+    catalog.invalidate()
+    updated = await catalog.get(None, {"USER"})
+    assert b"Renamed" in updated.body
+    assert updated.etag != first.etag
+    assert len(calls) == 4
+
+
+def test_etag_matches():
+    """If-None-Match accepts lists, weak tags and the wildcard."""
+    etag = '"abc"'
+
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"old", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"old"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,132 @@
+"""
+Tests for the streamed, paginated conversation detail endpoint.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.models.conversation import Conversation, Message
+from app.schemas.chat import ConversationResponse
+from app.services import conversation_detail, persistence
+from app.services.persistence import MessageWriteBehindQueue, PendingMessage
+
+
+async def add_conversation(db_session, user, count):
+    conversation = Conversation(user_id=user.id, service_type="askdocs", title="Detail")
+    db_session.add(conversation)
+    await db_session.flush()
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(count):
+        db_session.add(Message(
+            conversation_id=conversation.id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"Message {i}",
+            created_at=start + timedelta(seconds=i),
+            metadata_={"token_usage": {"total_tokens": i}, "sources": [{"title": "Doc", "url": "https://example.com"}]}
+            if i % 2 else None
+        ))
+    await db_session.commit()
+    return conversation
+
+
+@pytest.mark.asyncio
+async def test_detail_matches_response_schema(authenticated_client: AsyncClient, db_session, test_user, assert_max_queries):
+    """The streamed body is a valid ConversationResponse; a repeat read comes from the history cache."""
+    conversation = await add_conversation(db_session, test_user, 4)
+
+    response = await authenticated_client.get(f"/api/v1/chat/conversations/{conversation.id}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    detail = ConversationResponse.model_validate(response.json())
+    assert detail.id == conversation.id
+    assert [message.content for message in detail.messages] == [f"Message {i}" for i in range(4)]
+    assert detail.messages[0].token_usage is None
+    assert detail.messages[1].token_usage == {"total_tokens": 1}
+    assert detail.messages[1].sources == [{"title": "Doc", "url": "https://example.com"}]
+    assert all(message.conversation_id == conversation.id for message in detail.messages)
+
+    # Ownership check only; messages are replayed from the cache
+    with assert_max_queries(1):
+        cached = await authenticated_client.get(f"/api/v1/chat/conversations/{conversation.id}")
+    assert ConversationResponse.model_validate(cached.json()) == detail
+
+
+@pytest.mark.asyncio
+async def test_long_history_is_streamed_not_cached(
+    authenticated_client: AsyncClient, db_session, test_user, monkeypatch, assert_max_queries
+):
+    """Histories longer than the cache window are read from the database every time."""
+    monkeypatch.setattr(settings, "HISTORY_CACHE_MAX_MESSAGES", 3)
+    conversation = await add_conversation(db_session, test_user, 5)
+    url = f"/api/v1/chat/conversations/{conversation.id}"
+
+    first = await authenticated_client.get(url)
+    with assert_max_queries(2) as queries:
+        second = await authenticated_client.get(url)
+
+    assert queries.count == 2
+    assert len(second.json()["messages"]) == 5
+    assert second.json() == first.json()
+
+
+@pytest.mark.asyncio
+async def test_detail_pagination(authenticated_client: AsyncClient, db_session, test_user):
+    """Pages follow X-Next-Cursor in chronological order until a short page."""
+    conversation = await add_conversation(db_session, test_user, 5)
+    url = f"/api/v1/chat/conversations/{conversation.id}"
+
+    contents, params = [], {"limit": 2}
+    while True:
+        response = await authenticated_client.get(url, params=params)
+        assert response.status_code == 200
+        contents.extend(message["content"] for message in response.json()["messages"])
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params = {"limit": 2, "cursor": response.headers["X-Next-Cursor"]}
+
+    assert contents == [f"Message {i}" for i in range(5)]
+
+    response = await authenticated_client.get(url, params={"limit": 2, "cursor": "not-a-cursor"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_queued_reply_is_streamed_and_cached(
+    authenticated_client: AsyncClient, db_session, test_user, monkeypatch, assert_max_queries
+):
+    """A reply still in the write-behind queue is part of the detail and of the window cached on the miss."""
+    conversation = await add_conversation(db_session, test_user, 2)
+    url = f"/api/v1/chat/conversations/{conversation.id}"
+
+    release = asyncio.Event()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    async def blocked_write_messages(db, messages):
+        await release.wait()
+
+    monkeypatch.setattr(persistence, "write_messages", blocked_write_messages)
+    queue = MessageWriteBehindQueue(session_factory=session_factory)
+    monkeypatch.setattr(conversation_detail, "message_queue", queue)
+    queue.start()
+    try:
+        await queue.enqueue(db_session, PendingMessage(
+            conversation_id=conversation.id, role="assistant", content="Queued reply"
+        ))
+
+        first = await authenticated_client.get(url)
+        assert [m["content"] for m in first.json()["messages"]] == ["Message 0", "Message 1", "Queued reply"]
+
+        with assert_max_queries(1):
+            second = await authenticated_client.get(url)
+        assert second.json() == first.json()
+    finally:
+        release.set()
+        await queue.stop()
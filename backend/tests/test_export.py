@@ -0,0 +1,75 @@
+"""
+Tests for streaming NDJSON/CSV exports.
+"""
+from datetime import datetime, timedelta
+import csv
+import io
+import json
+import pytest
+from httpx import AsyncClient
+
+from app.models.conversation import Conversation, Message
+
+
+async def add_conversation(db_session, user, service_type, created_at, contents):
+    conversation = Conversation(user_id=user.id, service_type=service_type, created_at=created_at)
+    db_session.add(conversation)
+    await db_session.flush()
+    for i, content in enumerate(contents):
+        db_session.add(Message(
+            conversation_id=conversation.id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=content,
+            metadata_={"sources": [{"title": "Doc"}]} if i % 2 else None,
+            created_at=created_at + timedelta(seconds=i)
+        ))
+    await db_session.commit()
+    return conversation
+
+
+@pytest.mark.asyncio
+async def test_user_export_messages_ndjson(authenticated_client: AsyncClient, db_session, test_user, admin_user):
+    """Users export only their own messages, filtered by service and time."""
+    now = datetime.utcnow()
+    await add_conversation(db_session, test_user, "askatt", now, ["q1", "a1"])
+    await add_conversation(db_session, test_user, "askdocs", now, ["docs q"])
+    await add_conversation(db_session, test_user, "askatt", now - timedelta(days=10), ["old q"])
+    await add_conversation(db_session, admin_user, "askatt", now, ["not mine"])
+
+    response = await authenticated_client.get(
+        "/api/v1/chat/export/messages",
+        params={"service_type": "askatt", "since": (now - timedelta(days=1)).isoformat()}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "attachment" in response.headers["content-disposition"]
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["content"] for row in rows] == ["q1", "a1"]
+    assert rows[1]["metadata"] == {"sources": [{"title": "Doc"}]}
+    assert rows[0]["user_id"] == str(test_user.id)
+
+    response = await authenticated_client.get("/api/v1/chat/export/token_usage")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_admin_export_conversations_csv(admin_client: AsyncClient, db_session, test_user, admin_user):
+    """Admins export everyone's rows as CSV, optionally for one user."""
+    now = datetime.utcnow()
+    await add_conversation(db_session, test_user, "askatt", now, ["q1"])
+    await add_conversation(db_session, admin_user, "askdocs", now + timedelta(seconds=1), ["q2"])
+
+    response = await admin_client.get("/api/v1/admin/export/conversations", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["service_type"] for row in rows] == ["askatt", "askdocs"]
+
+    response = await admin_client.get(
+        "/api/v1/admin/export/conversations",
+        params={"format": "csv", "user_id": str(test_user.id)}
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["user_id"] for row in rows] == [str(test_user.id)]
@@ -0,0 +1,31 @@
+"""
+Tests for the bounded conversation history window.
+"""
+from app.config import settings
+from app.services.history import estimate_tokens, summarize_messages, trim_history
+
+
+def test_trim_history_keeps_newest_messages_within_budget():
+    """Newest messages are kept up to the token budget, returned oldest first."""
+    recent_first = [
+        {"role": "assistant", "content": "c" * 40},  # 10 tokens
+        {"role": "user", "content": "b" * 40},
+        {"role": "assistant", "content": "a" * 40},
+    ]
+
+    history = trim_history(recent_first, max_tokens=25)
+
+    assert [message["content"][0] for message in history] == ["b", "c"]
+    assert sum(estimate_tokens(message["content"]) for message in history) <= 25
+
+
+def test_summarize_messages_respects_budget():
+    """The summary condenses each older turn and stops at the token budget."""
+    older = [{"role": "user", "content": f"question {i} " + "x" * 500} for i in range(10)]
+
+    summary = summarize_messages(older, max_tokens=settings.HISTORY_SUMMARY_MAX_TOKENS)
+
+    assert summary.startswith("Summary of earlier conversation:")
+    assert "- user: question 0" in summary
+    assert len(summary) <= settings.HISTORY_SUMMARY_MAX_TOKENS * 4
+    assert summarize_messages(older, max_tokens=5) is None
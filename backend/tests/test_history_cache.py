@@ -0,0 +1,135 @@
+"""
+Tests for the conversation history cache.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+
+from app.config import settings
+from app.services.history_cache import (
+    CachedHistory,
+    ConversationHistoryCache,
+    MemoryHistoryBackend,
+    cached_message,
+)
+
+
+def make_message(content: str, role: str = "user") -> dict:
+    return cached_message(uuid4(), role, content, datetime.utcnow())
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used_by_bytes():
+    """The memory backend stays within its byte budget, evicting LRU entries first."""
+    backend = MemoryHistoryBackend(max_bytes=250)
+
+    await backend.set("a", b"x" * 100, ttl=60)
+    await backend.set("b", b"x" * 100, ttl=60)
+    assert await backend.get("a") is not None  # "a" is now most recently used
+
+    await backend.set("c", b"x" * 100, ttl=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") is not None
+    assert await backend.get("c") is not None
+    assert backend.size == 200
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_expires_entries():
+    """Entries are not served after their TTL."""
+    backend = MemoryHistoryBackend(max_bytes=1000)
+
+    await backend.set("a", b"value", ttl=0)
+
+    assert await backend.get("a") is None
+    assert backend.size == 0
+
+
+@pytest.mark.asyncio
+async def test_append_updates_window_in_place(monkeypatch):
+    """Appends extend a cached window and mark it incomplete once trimmed."""
+    monkeypatch.setattr(settings, "HISTORY_CACHE_MAX_MESSAGES", 3)
+    cache = ConversationHistoryCache(MemoryHistoryBackend(max_bytes=1_000_000))
+    conversation_id = uuid4()
+    created = datetime.utcnow()
+
+    # Appending to an uncached conversation is a no-op
+    await cache.append(conversation_id, make_message("ignored"))
+    assert await cache.get(conversation_id, created) is None
+
+    await cache.set(conversation_id, CachedHistory(complete=True, version=created))
+    for content in ("one", "two", "three"):
+        await cache.append(conversation_id, make_message(content))
+
+    cached = await cache.get(conversation_id, created)
+    assert [message["content"] for message in cached.messages] == ["one", "two", "three"]
+    assert cached.complete
+
+    message = make_message("four", role="assistant")
+    await cache.append(conversation_id, message)
+
+    # The window is current as of the write that saved its newest message
+    cached = await cache.get(conversation_id, datetime.fromisoformat(message["created_at"]))
+    assert [message["content"] for message in cached.messages] == ["two", "three", "four"]
+    assert not cached.complete
+
+    await cache.invalidate(conversation_id)
+    assert await cache.get(conversation_id, created) is None
+
+
+@pytest.mark.asyncio
+async def test_outdated_window_is_not_served():
+    """A window older than the conversation's updated_at (e.g. written by another worker) is a miss."""
+    cache = ConversationHistoryCache(MemoryHistoryBackend(max_bytes=1_000_000))
+    conversation_id = uuid4()
+    version = datetime(2026, 1, 1, 12, 0, 0)
+
+    await cache.set(conversation_id, CachedHistory(messages=[make_message("one")], complete=True, version=version))
+
+    assert await cache.get(conversation_id, version) is not None
+    assert await cache.get(conversation_id, version + timedelta(seconds=1)) is None
+    assert cache.get_stats()["stale"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fill_keeps_a_newer_window():
+    """A database snapshot does not replace a window that a later write appended to."""
+    cache = ConversationHistoryCache(MemoryHistoryBackend(max_bytes=1_000_000))
+    conversation_id = uuid4()
+    read_at = datetime(2026, 1, 1, 12, 0, 0)
+
+    await cache.set(conversation_id, CachedHistory(complete=True, version=read_at))
+    reply = make_message("reply", role="assistant")
+    await cache.append(conversation_id, reply)
+
+    await cache.fill(conversation_id, CachedHistory(complete=True, version=read_at))
+
+    cached = await cache.get(conversation_id, read_at)
+    assert [message["content"] for message in cached.messages] == ["reply"]
+
+    # A newer snapshot does replace it
+    newer = datetime.fromisoformat(reply["created_at"]) + timedelta(seconds=1)
+    await cache.fill(conversation_id, CachedHistory(messages=[reply, make_message("next")], complete=True, version=newer))
+    assert len((await cache.get(conversation_id, newer)).messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_message_written_by_another_worker_is_not_missed(authenticated_client, db_session, test_user):
+    """A write that skipped this worker's cache moves updated_at past the cached window."""
+    from app.models.conversation import Conversation
+    from app.services.persistence import PendingMessage, write_messages
+
+    conversation = Conversation(user_id=test_user.id, service_type="askatt", title="Workers")
+    db_session.add(conversation)
+    await db_session.commit()
+    await write_messages(db_session, [PendingMessage(conversation_id=conversation.id, role="user", content="one")])
+
+    url = f"/api/v1/chat/conversations/{conversation.id}"
+    assert [m["content"] for m in (await authenticated_client.get(url)).json()["messages"]] == ["one"]
+
+    # Written as by another worker: the database changes, this worker's cache does not
+    await write_messages(db_session, [PendingMessage(conversation_id=conversation.id, role="assistant", content="two")])
+    db_session.expire_all()  # The app shares this session in tests; a real request reads updated_at afresh
+
+    assert [m["content"] for m in (await authenticated_client.get(url)).json()["messages"]] == ["one", "two"]
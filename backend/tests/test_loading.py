@@ -0,0 +1,99 @@
+"""
+Tests for explicit relationship loading (lazy="raise" models).
+
+Loading a user must not cascade through its roles to every other user
+holding them; these tests pin the statements per request.
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.conversation import Conversation, Message
+from app.models.domain import Domain
+from app.models.user import Role, User
+
+
+async def add_role_members(db_session, role_name: str, count: int) -> Role:
+    role = (await db_session.execute(select(Role).where(Role.name == role_name))).scalar_one()
+    for i in range(count):
+        user = User(attid=f"member{i}", email=f"member{i}@example.com", password_hash="x")
+        user.roles = [role]
+        db_session.add(user)
+    await db_session.commit()
+    return role
+
+
+@pytest.mark.asyncio
+async def test_login_does_not_load_role_members(client: AsyncClient, test_user, db_session, assert_max_queries):
+    """Login loads the user and its roles only, however many users share the role."""
+    await add_role_members(db_session, "USER", 30)
+
+    with assert_max_queries(3):
+        response = await client.post("/api/v1/auth/login", json={"attid": "testuser", "password": "Test123!"})
+
+    assert response.status_code == 200
+    assert response.json()["user"]["roles"] == ["USER"]
+
+
+@pytest.mark.asyncio
+async def test_signup_returns_roles(client: AsyncClient):
+    """A new account's roles come from memory, not a reload."""
+    response = await client.post("/api/v1/auth/signup", json={
+        "attid": "newuser",
+        "email": "new@example.com",
+        "password": "Secure123!",
+        "full_name": "New User"
+    })
+
+    assert response.status_code == 201
+    assert response.json()["roles"] == ["USER"]
+
+
+@pytest.mark.asyncio
+async def test_admin_user_and_configuration_endpoints(
+    admin_client: AsyncClient, test_user, db_session, assert_max_queries
+):
+    """Admin endpoints ask for the relationships they return."""
+    await add_role_members(db_session, "USER", 30)
+
+    admin_role = (await db_session.execute(select(Role).where(Role.name == "ADMIN"))).scalar_one()
+    with assert_max_queries(8):
+        response = await admin_client.post(
+            f"/api/v1/admin/users/{test_user.id}/roles",
+            json={"user_id": str(test_user.id), "role_ids": [str(admin_role.id)]}
+        )
+    assert response.status_code == 200
+    assert response.json()["roles"] == ["ADMIN"]
+
+    domain = Domain(domain_key="LOAD", display_name="Loading")
+    db_session.add(domain)
+    await db_session.commit()
+
+    response = await admin_client.post("/api/v1/admin/configurations", json={
+        "domain_id": str(domain.id),
+        "config_key": "load_v1",
+        "display_name": "Loading v1",
+        "role_ids": [str(admin_role.id)]
+    })
+    assert response.status_code == 201
+    assert response.json()["domain"]["domain_key"] == "LOAD"
+
+
+@pytest.mark.asyncio
+async def test_delete_conversation_does_not_load_messages(
+    authenticated_client: AsyncClient, db_session, test_user, assert_max_queries
+):
+    """Messages are deleted in SQL; none are loaded into the session first."""
+    conversation = Conversation(user_id=test_user.id, service_type="askatt", title="Delete me")
+    db_session.add(conversation)
+    await db_session.flush()
+    db_session.add_all([
+        Message(conversation_id=conversation.id, role="user", content=f"Message {i}") for i in range(20)
+    ])
+    await db_session.commit()
+
+    with assert_max_queries(5) as queries:
+        response = await authenticated_client.delete(f"/api/v1/chat/conversations/{conversation.id}")
+
+    assert response.status_code == 204
+    assert not any(statement.lstrip().upper().startswith("SELECT messages") for statement in queries.statements)
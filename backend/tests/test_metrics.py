@@ -0,0 +1,81 @@
+"""
+Tests for the in-process metrics collectors and GET /metrics.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import Histogram, _Metric, metrics
+from app.core.query_profiler import instrument_engine
+from app.services.stream_events import EndEvent, TokenEvent, serialize_stream
+
+
+def sample(text: str, line_prefix: str) -> float:
+    """Value of the first exposition line starting with line_prefix."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not found")
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Observations land in the first bucket >= value; output is cumulative."""
+    histogram = Histogram("test_seconds", "Test", ("service",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "askatt")
+
+    lines = histogram.render()
+
+    assert lines[:2] == ["# HELP test_seconds Test", "# TYPE test_seconds histogram"]
+    assert lines[2:] == [
+        'test_seconds_bucket{service="askatt",le="0.1"} 2',
+        'test_seconds_bucket{service="askatt",le="1"} 3',
+        'test_seconds_bucket{service="askatt",le="+Inf"} 4',
+        'test_seconds_sum{service="askatt"} 3.65',
+        'test_seconds_count{service="askatt"} 4',
+    ]
+
+
+def test_metric_without_render_hook_fails_on_creation():
+    """A labelled metric must implement both child hooks to be instantiated."""
+    class Incomplete(_Metric):
+        def _new_child(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Incomplete")
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_metrics():
+    """Time to first token and stream duration are recorded per service."""
+    async def events():
+        yield TokenEvent(content="Hi")
+        yield EndEvent()
+
+    frames = [frame async for frame in serialize_stream(events(), "test")]
+
+    assert len(frames) == 2
+    text = metrics.render()
+    assert sample(text, 'sse_stream_duration_seconds_count{service="test"}') == 1
+    assert sample(text, 'sse_time_to_first_token_seconds_count{service="test"}') == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_and_queries(authenticated_client: AsyncClient, db_engine):
+    """Requests are labelled by route template and their SQL statements are counted."""
+    instrument_engine(db_engine.sync_engine)
+
+    response = await authenticated_client.get("/api/v1/chat/conversations")
+    assert response.status_code == 200
+
+    response = await authenticated_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    text = response.text
+    assert sample(
+        text, 'http_request_duration_seconds_count{method="GET",route="/api/v1/chat/conversations",status="200"}'
+    ) >= 1
+    assert sample(text, 'db_queries_per_request_sum{route="/api/v1/chat/conversations"}') >= 1
+    assert "# TYPE azure_token_cache_hit_ratio gauge" in text
+    assert 'upstream_concurrency_limit{service="AskAT&T"}' in text
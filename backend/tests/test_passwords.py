@@ -0,0 +1,72 @@
+"""
+Tests for the bcrypt worker pool.
+"""
+import asyncio
+import time
+import pytest
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.passwords import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_hashing_does_not_block_event_loop():
+    """The event loop keeps running while bcrypt hashes in the pool."""
+    hasher = PasswordHasher(workers=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    hashed = await hasher.hash("Test123!")
+    elapsed = time.perf_counter() - started
+    task.cancel()
+    hasher.shutdown()
+
+    assert hashed.startswith("$2b$")
+    # A blocked loop would record no ticks during the hash
+    assert ticks >= int(elapsed / 0.005) // 2
+
+
+@pytest.mark.asyncio
+async def test_outdated_cost_factor_is_rehashed():
+    """A valid password stored with another cost factor gets a new hash."""
+    hasher = PasswordHasher(workers=1)
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("Test123!")
+
+    valid, new_hash = await hasher.verify_and_update("Test123!", old_hash)
+    invalid, no_hash = await hasher.verify_and_update("wrong", old_hash)
+    hasher.shutdown()
+
+    assert valid and new_hash.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert not invalid and no_hash is None
+    assert hasher.get_stats()["rehashed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_new_requests():
+    """Callers beyond the queue limit get 503 instead of waiting."""
+    hasher = PasswordHasher(workers=1, max_queue=1)
+
+    running = asyncio.create_task(hasher._run(time.sleep, 0.2))
+    await asyncio.sleep(0.01)
+    waiting = asyncio.create_task(hasher._run(time.sleep, 0))
+    await asyncio.sleep(0.01)
+
+    assert hasher.get_stats()["queue_depth"] == 1
+    with pytest.raises(ServiceUnavailableError):
+        await hasher._run(time.sleep, 0)
+
+    await asyncio.gather(running, waiting)
+    hasher.shutdown()
+
+    stats = hasher.get_stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
@@ -0,0 +1,82 @@
+"""
+Tests for the write-behind message queue.
+"""
+from contextlib import asynccontextmanager
+from uuid import uuid4
+import pytest
+
+from app.config import settings
+from app.services import persistence
+from app.services.persistence import MessageWriteBehindQueue, PendingMessage
+
+
+@asynccontextmanager
+async def fake_session_factory():
+    yield "session"
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Replace write_messages with a recorder; returns the list of batches."""
+    batches = []
+
+    async def fake_write_messages(db, messages):
+        if any(message.content == "bad" for message in messages):
+            raise RuntimeError("insert failed")
+        batches.append((db, [message.content for message in messages]))
+
+    monkeypatch.setattr(persistence, "write_messages", fake_write_messages)
+    monkeypatch.setattr(settings, "PERSIST_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "PERSIST_FLUSH_INTERVAL_MS", 50.0)
+    monkeypatch.setattr(settings, "PERSIST_MAX_RETRIES", 0)
+    return batches
+
+
+def make_message(content: str) -> PendingMessage:
+    return PendingMessage(conversation_id=uuid4(), role="assistant", content=content)
+
+
+@pytest.mark.asyncio
+async def test_messages_are_batched_and_drained_on_stop(written):
+    """Queued messages are written in batches of PERSIST_BATCH_SIZE and flushed on stop."""
+    queue = MessageWriteBehindQueue(session_factory=fake_session_factory)
+    queue.start()
+
+    for i in range(7):
+        await queue.enqueue("request-session", make_message(str(i)))
+
+    await queue.stop()
+
+    assert [contents for _, contents in written] == [["0", "1", "2"], ["3", "4", "5"], ["6"]]
+    assert all(db == "session" for db, _ in written)
+    stats = queue.get_stats()
+    assert stats["written"] == 7
+    assert stats["batches"] == 3
+    assert stats["direct_writes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_direct_write_when_queue_not_running(written):
+    """Without a running worker the caller's session writes the message immediately."""
+    queue = MessageWriteBehindQueue(session_factory=fake_session_factory)
+
+    await queue.enqueue("request-session", make_message("hello"))
+
+    assert written == [("request-session", ["hello"])]
+    assert queue.get_stats()["direct_writes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_single_writes(written):
+    """One bad message does not prevent the rest of its batch from being written."""
+    queue = MessageWriteBehindQueue(session_factory=fake_session_factory)
+    queue.start()
+
+    for content in ("a", "bad", "c"):
+        await queue.enqueue("request-session", make_message(content))
+
+    await queue.stop()
+
+    assert [contents for _, contents in written] == [["a"], ["c"]]
+    assert queue.get_stats()["failed"] == 1
+    assert queue.get_stats()["written"] == 2
@@ -0,0 +1,77 @@
+"""
+Tests for the authenticated principal cache.
+"""
+from datetime import datetime
+from uuid import uuid4
+import asyncio
+import pytest
+
+from app.core import principal as principal_module
+from app.core.principal import Principal, PrincipalCache
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Replace load_principal with a fake that records calls."""
+    calls = []
+    roles = {"value": frozenset({"USER"})}
+    gate = {"event": None}
+
+    async def fake_load_principal(db, user_id, version=0):
+        calls.append(user_id)
+        if gate["event"] is not None:
+            await gate["event"].wait()
+        return Principal(
+            id=user_id,
+            attid="testuser",
+            email="test@example.com",
+            display_name="Test User",
+            is_active=True,
+            created_at=datetime.utcnow(),
+            roles=roles["value"],
+            version=version,
+        )
+
+    monkeypatch.setattr(principal_module, "load_principal", fake_load_principal)
+    return calls, roles, gate
+
+
+@pytest.mark.asyncio
+async def test_principal_is_cached_until_invalidated(loads):
+    """Repeated lookups hit the cache; invalidation reloads the new roles."""
+    calls, roles, _ = loads
+    cache = PrincipalCache()
+    user_id = uuid4()
+
+    first = await cache.get(None, user_id)
+    second = await cache.get(None, user_id)
+    assert first is second
+    assert len(calls) == 1
+
+    roles["value"] = frozenset({"USER", "ADMIN"})
+    cache.invalidate(user_id)
+
+    updated = await cache.get(None, user_id)
+    assert updated.has_role("ADMIN")
+    assert updated.version == 1
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_is_not_overwritten(loads):
+    """A load that started before an invalidation does not store its stale result."""
+    calls, _, gate = loads
+    cache = PrincipalCache()
+    user_id = uuid4()
+
+    gate["event"] = asyncio.Event()
+    pending = asyncio.create_task(cache.get(None, user_id))
+    await asyncio.sleep(0)
+
+    cache.invalidate(user_id)
+    gate["event"].set()
+    await pending
+
+    gate["event"] = None
+    await cache.get(None, user_id)
+    assert len(calls) == 2
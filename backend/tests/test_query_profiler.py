@@ -0,0 +1,65 @@
+"""
+Tests for per-request SQL statement counting and the slow-query log.
+"""
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.core.query_profiler import instrument_engine
+from app.models.conversation import Conversation, Message
+
+
+async def add_conversations(db_session, user, count, messages_each=2):
+    for i in range(count):
+        conversation = Conversation(user_id=user.id, service_type="askatt", title=f"Conversation {i}")
+        db_session.add(conversation)
+        await db_session.flush()
+        for j in range(messages_each):
+            db_session.add(Message(conversation_id=conversation.id, role="user", content=f"Message {j}"))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_query_count_headers(authenticated_client: AsyncClient, db_engine):
+    """Responses report the SQL statements run for them."""
+    instrument_engine(db_engine.sync_engine)
+
+    response = await authenticated_client.get("/api/v1/chat/conversations")
+
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Query-Count"]) >= 1
+    assert response.headers["X-DB-Query-Time"].endswith("ms")
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_with_route(
+    authenticated_client: AsyncClient, db_engine, monkeypatch, caplog
+):
+    """Statements over the threshold are logged with the route, never the parameters."""
+    instrument_engine(db_engine.sync_engine)
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_profiler"):
+        await authenticated_client.get("/api/v1/chat/conversations", params={"service_type": "secret-filter"})
+
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Slow query")]
+    assert slow
+    assert any("on /api/v1/chat/conversations:" in message for message in slow)
+    assert not any("secret-filter" in message for message in slow)
+
+
+@pytest.mark.asyncio
+async def test_list_conversations_query_count_is_constant(
+    authenticated_client: AsyncClient, db_session, test_user, assert_max_queries
+):
+    """Message counts come from one grouped query, not one query per conversation."""
+    await add_conversations(db_session, test_user, 10)
+
+    with assert_max_queries(3) as queries:
+        response = await authenticated_client.get("/api/v1/chat/conversations")
+
+    assert len(response.json()) == 10
+    assert all(item["message_count"] == 2 for item in response.json())
+    assert queries.count >= 1
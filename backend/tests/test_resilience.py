@@ -0,0 +1,164 @@
+"""
+Tests for upstream retries, hedging and the circuit breaker.
+"""
+import asyncio
+import httpx
+import pytest
+
+from app.config import settings
+from app.core.concurrency import AdaptiveLimiter
+from app.core.resilience import CircuitOpenError, UpstreamGuard
+from app.services import askdocs
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "UPSTREAM_RETRY_BACKOFF_MS", 1)
+    monkeypatch.setattr(settings, "UPSTREAM_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "UPSTREAM_CIRCUIT_FAILURE_THRESHOLD", 3)
+
+
+def make_guard() -> UpstreamGuard:
+    return UpstreamGuard("Test", AdaptiveLimiter("Test", latency_target=10))
+
+
+def make_sender(handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def send():
+        return client.send(client.build_request("POST", "https://upstream.test/chat", json={}), stream=True)
+
+    return send
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    """A 502 and a refused connection are retried until the upstream answers."""
+    outcomes = ["502", "connect", "ok"]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        outcome = outcomes.pop(0)
+        if outcome == "connect":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(502 if outcome == "502" else 200, json={"answer": "hi"})
+
+    guard = make_guard()
+    async with guard.call(make_sender(handler)) as response:
+        await response.aread()
+
+    assert response.status_code == 200
+    stats = guard.get_stats()
+    assert stats["attempts"] == 3
+    assert stats["retries"] == 2
+    assert stats["circuit"]["state"] == "closed"
+    assert stats["circuit"]["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_recovers(monkeypatch):
+    """Consecutive failures open the circuit; after the open period one probe closes it."""
+    status = {"code": 503}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status["code"], json={})
+
+    guard = make_guard()
+    send = make_sender(handler)
+
+    # Three failed attempts (one call with two retries) reach the threshold
+    async with guard.call(send) as response:
+        assert response.status_code == 503
+    assert guard.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        async with guard.call(send):
+            pass
+    assert exc_info.value.retry_after >= 1
+
+    monkeypatch.setattr(settings, "UPSTREAM_CIRCUIT_OPEN_SECONDS", 0)
+    status["code"] = 200
+    async with guard.call(send) as response:
+        assert response.status_code == 200
+    assert guard.breaker.state == "closed"
+    assert guard.get_stats()["circuit"]["short_circuited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_server_errors_open_the_circuit():
+    """500s are returned without retries but still count as failures."""
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        return httpx.Response(500, json={})
+
+    guard = make_guard()
+    send = make_sender(handler)
+
+    for _ in range(3):
+        async with guard.call(send) as response:
+            assert response.status_code == 500
+
+    assert len(attempts) == 3
+    assert guard.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        async with guard.call(send):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged(monkeypatch):
+    """Once the first attempt exceeds the p95 latency, a hedge is sent and the faster one wins."""
+    monkeypatch.setattr(settings, "UPSTREAM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "UPSTREAM_HEDGE_MIN_SAMPLES", 1)
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 2:
+            await asyncio.sleep(5)  # stuck first attempt of the hedged call
+        return httpx.Response(200, json={"call": len(calls)})
+
+    guard = make_guard()
+    send = make_sender(handler)
+
+    async with guard.call(send) as response:
+        await response.aread()
+    assert guard.hedge_delay() is not None
+
+    async with guard.call(send) as response:
+        await response.aread()
+
+    assert response.json() == {"call": 3}
+    assert guard.get_stats()["hedges"] == 1
+    assert guard.get_stats()["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_askdocs_retries_gateway_error(monkeypatch):
+    """A single 502 from the gateway no longer fails the AskDocs turn."""
+    responses = [httpx.Response(502, json={"detail": "bad gateway"}), httpx.Response(200, json={"answer": "Reset it"})]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def fake_token(use_domain_scope: bool = False) -> str:
+        return "test-token"
+
+    class Domain:
+        domain_key = "TEST"
+
+    class Config:
+        domain = Domain()
+        config_key = "test"
+
+    monkeypatch.setattr(askdocs, "get_askatt_token", fake_token)
+    monkeypatch.setattr(askdocs, "get_upstream_client", lambda url: client)
+    monkeypatch.setattr(askdocs, "askdocs_upstream", make_guard())
+
+    events = [event.to_dict() async for event in askdocs.stream_askdocs_chat(Config(), "Password?", [], "production")]
+
+    assert events[0] == {"type": "token", "content": "Reset it"}
+    assert events[-1] == {"type": "end"}
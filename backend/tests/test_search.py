@@ -0,0 +1,76 @@
+"""
+Tests for full-text search over message history.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.models.conversation import Conversation, Message
+
+
+async def add_conversation(db_session, user, title, contents, service_type="askatt"):
+    conversation = Conversation(user_id=user.id, service_type=service_type, title=title)
+    db_session.add(conversation)
+    await db_session.flush()
+    for i, content in enumerate(contents):
+        db_session.add(Message(
+            conversation_id=conversation.id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=content
+        ))
+    await db_session.commit()
+    return conversation
+
+
+@pytest.mark.asyncio
+async def test_search_messages_and_titles(authenticated_client: AsyncClient, db_session, test_user, admin_user):
+    """Hits come from the caller's messages and titles, with highlighted snippets."""
+    billing = await add_conversation(db_session, test_user, "Billing questions", [
+        "Why did my invoice go up?",
+        "Your billing cycle changed, so the invoice covers extra days.",
+    ])
+    await add_conversation(db_session, test_user, "Roaming", ["How do I enable roaming abroad?"])
+    await add_conversation(db_session, admin_user, "Admin billing", ["billing for everyone"])
+
+    response = await authenticated_client.get("/api/v1/chat/search", params={"q": "billing"})
+    assert response.status_code == 200
+    hits = response.json()
+
+    assert {hit["conversation_id"] for hit in hits} == {str(billing.id)}
+    assert sorted(hit["message_id"] is None for hit in hits) == [False, True]
+    assert all("<mark>" in hit["snippet"] for hit in hits)
+    assert [hit["rank"] for hit in hits] == sorted((hit["rank"] for hit in hits), reverse=True)
+
+    message_hit = next(hit for hit in hits if hit["message_id"])
+    assert message_hit["role"] == "assistant"
+    assert "<mark>billing</mark>" in message_hit["snippet"]
+
+    # Deleted conversations drop out of the index
+    await authenticated_client.delete(f"/api/v1/chat/conversations/{billing.id}")
+    response = await authenticated_client.get("/api/v1/chat/search", params={"q": "billing"})
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_search_keyset_pagination(authenticated_client: AsyncClient, db_session, test_user):
+    """Pages follow X-Next-Cursor without repeating or skipping hits."""
+    for i in range(5):
+        await add_conversation(db_session, test_user, f"Chat {i}", [f"modem reset step {i}", "unrelated"])
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "modem reset", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await authenticated_client.get("/api/v1/chat/search", params=params)
+        assert response.status_code == 200
+        seen.extend(hit["message_id"] for hit in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+    response = await authenticated_client.get("/api/v1/chat/search", params={"q": "modem", "cursor": "bad"})
+    assert response.status_code == 422
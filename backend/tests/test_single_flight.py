@@ -0,0 +1,101 @@
+"""
+Tests for single-flight coalescing of upstream streams.
+"""
+import asyncio
+import pytest
+
+from app.services.single_flight import SingleFlight
+from app.services.stream_events import EndEvent, ErrorEvent, TokenEvent
+
+
+class Upstream:
+    """Upstream stand-in that emits one token each time it is released."""
+
+    def __init__(self, tokens: list[str], fail: bool = False):
+        self.tokens = tokens
+        self.fail = fail
+        self.calls = 0
+        self.finished = False
+        self.release = asyncio.Semaphore(0)
+
+    async def stream(self):
+        self.calls += 1
+        for token in self.tokens:
+            await self.release.acquire()
+            yield TokenEvent(token)
+        if self.fail:
+            raise RuntimeError("upstream broke")
+        yield EndEvent()
+        self.finished = True
+
+
+async def collect(subscription) -> list:
+    return [event async for event in subscription.events()]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_subscribers_share_one_call():
+    """Followers get every event, including those sent before they joined."""
+    flights = SingleFlight("Test")
+    upstream = Upstream(["a", "b", "c"])
+
+    leader = flights.join("key", upstream.stream)
+    first = asyncio.create_task(collect(leader))
+
+    upstream.release.release()
+    await asyncio.sleep(0.01)
+
+    follower = flights.join("key", upstream.stream)
+    second = asyncio.create_task(collect(follower))
+
+    upstream.release.release()
+    upstream.release.release()
+    results = await asyncio.gather(first, second)
+
+    assert leader.leader and not follower.leader
+    assert upstream.calls == 1
+    for events in results:
+        assert [event.content for event in events[:-1]] == ["a", "b", "c"]
+        assert isinstance(events[-1], EndEvent)
+
+    # The finished flight is gone; the next request starts a new call
+    assert flights.get_stats()["in_flight"] == 0
+    flights.join("key", Upstream([]).stream)
+    assert flights.get_stats()["leaders"] == 2
+
+
+@pytest.mark.asyncio
+async def test_subscriber_cancellation_does_not_abort_shared_call():
+    """A disconnected subscriber stops reading; the call completes for the others."""
+    flights = SingleFlight("Test")
+    upstream = Upstream(["a", "b"])
+
+    leader = flights.join("key", upstream.stream)
+    follower = flights.join("key", upstream.stream)
+
+    leader_events = leader.events()
+    upstream.release.release()
+    assert (await leader_events.__anext__()).content == "a"
+    await leader_events.aclose()
+
+    second = asyncio.create_task(collect(follower))
+    upstream.release.release()
+    events = await second
+
+    assert [event.content for event in events[:-1]] == ["a", "b"]
+    assert upstream.finished
+
+
+@pytest.mark.asyncio
+async def test_upstream_failure_reaches_all_subscribers():
+    """An exception in the shared call ends every stream with an error event."""
+    flights = SingleFlight("Test")
+    upstream = Upstream(["a"], fail=True)
+
+    subscriptions = [flights.join("key", upstream.stream) for _ in range(3)]
+    tasks = [asyncio.create_task(collect(subscription)) for subscription in subscriptions]
+    upstream.release.release()
+
+    for events in await asyncio.gather(*tasks):
+        assert isinstance(events[-1], ErrorEvent)
+    assert flights.get_stats()["errors"] == 1
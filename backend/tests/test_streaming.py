@@ -0,0 +1,80 @@
+"""
+Tests for stream events and SSE stream helpers.
+"""
+import asyncio
+import json
+import pytest
+
+from app.services.stream_events import (
+    EndEvent,
+    MessageAccumulator,
+    TokenEvent,
+    UsageEvent,
+    serialize_event,
+)
+from app.services.streaming import CoalesceStats, coalesce_token_frames
+
+
+async def _source(text: str, delay: float = 0.0):
+    for char in text:
+        yield TokenEvent(char)
+        if delay:
+            await asyncio.sleep(delay)
+    yield UsageEvent({"total_tokens": 1})
+    yield EndEvent()
+
+
+async def _collect(stream) -> list:
+    return [event async for event in stream]
+
+
+def test_serialize_event_matches_wire_format():
+    """Events serialize to the SSE frames the frontend parses."""
+    assert serialize_event(TokenEvent("Hi")) == 'data: {"type":"token","content":"Hi"}\n\n'
+    assert json.loads(serialize_event(EndEvent())[6:]) == {"type": "end"}
+
+
+@pytest.mark.asyncio
+async def test_coalescing_preserves_text_and_event_order():
+    """Token events are merged by size; other events keep their position."""
+    text = "x" * 1000
+    stats = CoalesceStats()
+
+    events = await _collect(coalesce_token_frames(_source(text), max_bytes=256, window_ms=1000, stats=stats))
+
+    tokens = [e.content for e in events if isinstance(e, TokenEvent)]
+    assert "".join(tokens) == text
+    assert [len(t) for t in tokens] == [256, 256, 256, 232]
+    assert [type(e) for e in events[-2:]] == [UsageEvent, EndEvent]
+    assert stats.frames_in == 1002
+    assert stats.frames_out == 6
+
+
+@pytest.mark.asyncio
+async def test_coalescing_counts_utf8_bytes():
+    """The size limit applies to encoded bytes, not characters."""
+    events = await _collect(coalesce_token_frames(_source("é" * 10), max_bytes=8, window_ms=1000))
+
+    tokens = [e.content for e in events if isinstance(e, TokenEvent)]
+    assert tokens == ["éééé", "éééé", "éé"]
+
+
+@pytest.mark.asyncio
+async def test_coalescing_flushes_after_time_window():
+    """A slow producer still gets its tokens flushed once the window closes."""
+    events = await _collect(coalesce_token_frames(_source("abcd", delay=0.05), max_bytes=256, window_ms=10))
+
+    tokens = [e.content for e in events if isinstance(e, TokenEvent)]
+    assert tokens == ["a", "b", "c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_accumulator_builds_message_from_events():
+    """The accumulator joins token text and keeps the latest usage."""
+    accumulator = MessageAccumulator()
+
+    for event in await _collect(_source("hello")):
+        accumulator.add(event)
+
+    assert accumulator.content == "hello"
+    assert accumulator.usage == {"total_tokens": 1}
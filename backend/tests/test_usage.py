@@ -0,0 +1,79 @@
+"""
+Tests for token usage logging and daily rollups.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from httpx import AsyncClient
+
+from app.models.conversation import Conversation
+from app.services.persistence import PendingMessage, write_messages
+from app.services.usage import get_usage_totals, rollup_increments
+
+
+def test_rollup_increments_group_by_day_and_key():
+    """Replies with the same key and day share one increment; new conversations count once."""
+    user_id, conversation_id = uuid4(), uuid4()
+    now = datetime(2026, 10, 16, 12, 0)
+
+    def usage_row(created_at, model_name="gpt-4o", tokens=10):
+        return {
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+            "service_type": "askatt",
+            "configuration_id": None,
+            "model_name": model_name,
+            "prompt_tokens": tokens,
+            "completion_tokens": tokens,
+            "total_tokens": 2 * tokens,
+            "created_at": created_at,
+        }
+
+    increments = rollup_increments(
+        [usage_row(now), usage_row(now + timedelta(minutes=1)), usage_row(now, "gpt-4o-mini"), usage_row(now + timedelta(days=1))],
+        new_conversation_ids={conversation_id},
+    )
+
+    assert len(increments) == 3
+    same_day = next(i for i in increments if i["model_name"] == "gpt-4o" and i["day"] == now.date())
+    assert same_day["message_count"] == 4
+    assert same_day["total_tokens"] == 40
+    assert sum(i["conversation_count"] for i in increments) == 1
+
+
+@pytest.mark.asyncio
+async def test_usage_stats_read_rollups(admin_client: AsyncClient, db_session, admin_user):
+    """Every assistant reply is logged and summed into the admin usage stats."""
+    conversation = Conversation(user_id=admin_user.id, service_type="askatt")
+    db_session.add(conversation)
+    await db_session.commit()
+
+    def reply(usage, new_conversation=False):
+        return PendingMessage(
+            conversation_id=conversation.id,
+            role="assistant",
+            content="answer",
+            user_id=admin_user.id,
+            service_type="askatt",
+            model_name="gpt-4o",
+            token_usage=usage,
+            new_conversation=new_conversation,
+        )
+
+    await write_messages(db_session, [
+        reply({"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}, new_conversation=True),
+        reply(None),
+    ])
+    await write_messages(db_session, [reply({"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3})])
+
+    totals = await get_usage_totals(db_session, since=datetime.utcnow().date())
+    assert totals["conversation_count"] == 1
+    assert totals["message_count"] == 6
+
+    response = await admin_client.get("/api/v1/admin/stats/usage", params={"days": 7})
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total_conversations"] == 1
+    assert stats["total_messages"] == 6
+    assert stats["total_prompt_tokens"] == 11
+    assert stats["total_tokens"] == 18